@@ -25,6 +25,9 @@ class Config:
     MAIL_DEBUG = False 
 
     # Rate Limiting Configuration
+    # Keyed by route path with converters written as <id>; each value is
+    # {"limit", "window_seconds"} (or a limits string such as "5 per minute"),
+    # either for every method or per method. Overrides the route's @rate_limit default.
     ROUTE_LIMITS = {
         "/users/login": {"limit": 5, "window_seconds": 60},
         "/users/forgot-password": {"limit": 3, "window_seconds": 3600},
@@ -41,4 +44,85 @@ class Config:
         "/users/refresh": {"limit": 20, "window_seconds": 60},
         "/users/logout": {"limit": 20, "window_seconds": 60},
     }
-    
\ No newline at end of file
+
+    # Optional JSON file with more ROUTE_LIMITS entries, re-read when it changes
+    ROUTE_LIMITS_FILE = os.environ.get("ROUTE_LIMITS_FILE")
+    ROUTE_LIMITS_CHECK_SECONDS = float(os.environ.get("ROUTE_LIMITS_CHECK_SECONDS", 5))
+    # Where route limit counters live: "sqlite" (file shared by the workers on one host),
+    # "redis" (shared by every host) or "memory" (per worker)
+    RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "sqlite")
+    RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "data/rate_limits.db")
+
+    # Concurrency caps (per worker process): at most `limit` requests of a pool run at
+    # once, up to `queue` more wait for at most `timeout_seconds`, the rest get 503 + Retry-After
+    CONCURRENCY_LIMITS = {
+        "password_hashing": {"limit": 4, "queue": 4, "timeout_seconds": 2},
+        "user_listing": {"limit": 2, "queue": 2, "timeout_seconds": 1},
+        "manual_jobs": {"limit": 1, "queue": 0},
+    }
+    CONCURRENCY_RETRY_AFTER = int(os.environ.get("CONCURRENCY_RETRY_AFTER", 1))
+
+    # File uploads
+    # Whole request body cap, enforced by Werkzeug before and while the body is read
+    MAX_CONTENT_LENGTH = int(os.environ.get("MAX_CONTENT_LENGTH", 100 * 1024 * 1024))
+    # Non-file form fields stay in memory, so keep them small (Werkzeug also applies it
+    # to the parser's read buffer, so it must stay well above UPLOAD_CHUNK_SIZE)
+    MAX_FORM_MEMORY_SIZE = int(os.environ.get("MAX_FORM_MEMORY_SIZE", 500 * 1024))
+    UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", "uploads")
+    # Bytes read from the socket and written to disk per step
+    UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", 64 * 1024))
+    # Total stored bytes per user; an upload that would cross it is cut off mid-stream
+    UPLOAD_USER_QUOTA_BYTES = int(os.environ.get("UPLOAD_USER_QUOTA_BYTES", 1024 * 1024 * 1024))
+    # Resumable upload sessions expire this long after their last chunk; the sweeper
+    # then deletes them and their preallocated files
+    UPLOAD_SESSION_TTL_SECONDS = int(os.environ.get("UPLOAD_SESSION_TTL_SECONDS", 24 * 3600))
+
+    # Bulk user operations
+    BULK_USER_MAX_ITEMS = int(os.environ.get("BULK_USER_MAX_ITEMS", 500))
+    BULK_INSERT_BATCH_SIZE = int(os.environ.get("BULK_INSERT_BATCH_SIZE", 100))
+    # Rows touched per UPDATE/DELETE statement (keeps lock times short)
+    BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 1000))
+
+    # Password hashing
+    # Werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000";
+    # stored hashes made with anything else are upgraded on the next successful login
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_HASH_THREADS = int(os.environ.get("PASSWORD_HASH_THREADS", 2))
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get("PASSWORD_HASH_QUEUE_LIMIT", 8))
+    PASSWORD_HASH_TIMEOUT_SECONDS = int(os.environ.get("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1))
+    # How often last_login / rehash writes from logins are flushed (0 = inline, on the request)
+    LAST_LOGIN_FLUSH_SECONDS = float(os.environ.get("LAST_LOGIN_FLUSH_SECONDS", 1.0))
+    # Bulk creation hashing processes (0 = one per CPU)
+    PASSWORD_HASH_PROCESSES = int(os.environ.get("PASSWORD_HASH_PROCESSES", 0))
+
+    # Redis (state shared across gunicorn workers)
+    REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
+    REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+    REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD")
+    REDIS_DB = int(os.environ.get("REDIS_DB", 0))
+
+    # User profile cache: "memory" (per worker), "redis" (shared) or "none".
+    # A write only invalidates the memory cache of the worker that served it, so
+    # other workers may serve the old profile (and ETag) until the TTL: it stays
+    # at a few seconds there, while a shared cache can hold entries longer
+    USER_CACHE_BACKEND = os.environ.get("USER_CACHE_BACKEND", "memory")
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", 10000))
+    USER_CACHE_TTL_SECONDS = int(
+        os.environ.get("USER_CACHE_TTL_SECONDS", 60 if USER_CACHE_BACKEND == "redis" else 5)
+    )
+
+    # Revoked token ids: "sqlite" (file shared by the workers on one host) or "redis"
+    TOKEN_REVOCATION_BACKEND = os.environ.get("TOKEN_REVOCATION_BACKEND", "sqlite")
+    TOKEN_REVOCATION_PATH = os.environ.get("TOKEN_REVOCATION_PATH", "data/revoked_tokens.db")
+    # How often each worker pulls revocations made by other workers (sqlite backend)
+    TOKEN_REVOCATION_REFRESH_SECONDS = float(os.environ.get("TOKEN_REVOCATION_REFRESH_SECONDS", 1))
+    # POST /auth/introspect for the edge gateway; disabled while no key is set
+    GATEWAY_API_KEY = os.environ.get("GATEWAY_API_KEY")
+    INTROSPECTION_MAX_TOKENS = int(os.environ.get("INTROSPECTION_MAX_TOKENS", 100))
+    # Upper bound on how long the gateway may reuse an active verdict (revocation lag)
+    INTROSPECTION_MAX_CACHE_SECONDS = int(os.environ.get("INTROSPECTION_MAX_CACHE_SECONDS", 60))
+    # How often each worker checks cache_versions for role changes made by other workers
+    ROLE_CACHE_CHECK_SECONDS = float(os.environ.get("ROLE_CACHE_CHECK_SECONDS", 5))
+    # Verified JWT payloads kept per worker (0 disables the cache)
+    TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", 10000))
@@ -1,3 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import mysql
 
 db = SQLAlchemy()
+
+# DATETIME(6) on MySQL: microsecond precision so back-to-back writes get distinct versions
+PreciseDateTime = db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
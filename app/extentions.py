@@ -1,4 +1,22 @@
 #E:\backend_structure\app\extentions.py
 from flask_mail import Mail
+from app.utils.cache import ProfileCache, TokenCache
+from app.utils.revocation import TokenRevocations
 
 mail = Mail()
+user_cache = ProfileCache(prefix="user:")
+token_revocations = TokenRevocations()
+token_cache = TokenCache()
+
+
+def redis_client(app):
+    """One shared Redis client (and connection pool) per app, built from REDIS_* config."""
+    if "redis" not in app.extensions:
+        import redis
+        app.extensions["redis"] = redis.Redis(
+            host=app.config["REDIS_HOST"],
+            port=app.config["REDIS_PORT"],
+            password=app.config["REDIS_PASSWORD"],
+            db=app.config["REDIS_DB"],
+        )
+    return app.extensions["redis"]
@@ -0,0 +1,15 @@
+# app/models/cache_version.py
+from app.db import db
+
+class CacheVersion(db.Model):
+    """
+    Version counters for tables mirrored in every worker's memory (e.g. 'roles').
+    Writers bump the counter in the same transaction as the change; workers
+    poll this single row and reload their copy when it moves. The
+    'user_stats_rebuild' row instead holds when the stats were last rebuilt
+    and serializes that job across workers.
+    """
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
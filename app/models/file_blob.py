@@ -0,0 +1,17 @@
+# app/models/file_blob.py
+from datetime import datetime
+from app.db import db
+
+class FileBlob(db.Model):
+    """
+    One stored copy of some file content, keyed by its SHA-256. Every
+    UploadedFile with that sha256 holds one reference; blobs whose refcount
+    drops to zero are deleted, file and row, by the garbage collector.
+    """
+    __tablename__ = "file_blobs"
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    path = db.Column(db.String(512), nullable=False)
+    refcount = db.Column(db.Integer, nullable=False, default=0, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from app.db import db
+from app.db import db, PreciseDateTime
 
 class Role(db.Model):
     __tablename__ = "roles"
@@ -8,6 +8,6 @@ class Role(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     role_name = db.Column(db.Enum("admin", "user", name="role_names"), nullable=False, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(PreciseDateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     users = db.relationship("User", backref="role", lazy=True)
@@ -0,0 +1,37 @@
+# app/models/upload_session.py
+import uuid
+from datetime import datetime
+from app.db import db
+
+class UploadSession(db.Model):
+    """
+    A resumable upload in progress. The data lives in a preallocated file at
+    `path`; chunks may arrive in any order, each one recorded as an UploadChunk.
+    Sessions past `expires_at` are removed, with their file, by the sweeper.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    path = db.Column(db.String(512), nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=True)  # optional, declared at creation
+    description = db.Column(db.String(255), nullable=True)
+    # 'open' while chunks are accepted, 'finalizing' while the checksum is verified
+    status = db.Column(db.String(16), nullable=False, default="open")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class UploadChunk(db.Model):
+    """One received byte range [offset, offset + length) of an upload session."""
+    __tablename__ = "upload_chunks"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    session_id = db.Column(
+        db.String(36), db.ForeignKey("upload_sessions.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    offset = db.Column(db.BigInteger, nullable=False)
+    length = db.Column(db.BigInteger, nullable=False)
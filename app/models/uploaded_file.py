@@ -0,0 +1,33 @@
+# app/models/uploaded_file.py
+import uuid
+from datetime import datetime
+from app.db import db
+
+class UploadedFile(db.Model):
+    """
+    One row per stored upload: the owner's name for a FileBlob. Size and
+    SHA-256 are computed while the body streams in; per-user quotas are
+    checked against the sum of `size`, so duplicates still count for their owner.
+    """
+    __tablename__ = "uploaded_files"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    path = db.Column(db.String(512), nullable=False)  # the blob's path
+    content_type = db.Column(db.String(100), nullable=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)  # -> file_blobs.sha256
+    description = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+            "sha256": self.sha256,
+            "description": self.description,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -2,11 +2,18 @@
 import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import Enum, Date
-from app.db import db
+from app.db import db, PreciseDateTime
 from datetime import datetime
 
 class User(db.Model):
     __tablename__ = "users"
+    # Composite indexes matched to the hot access paths (see test_query_plans.py)
+    __table_args__ = (
+        db.Index("ix_users_created_at_id", "created_at", "id"),                # keyset listing / export
+        db.Index("ix_users_status_created_at", "status", "created_at", "id"),  # listing filtered by status
+        db.Index("ix_users_role_id_created_at", "role_id", "created_at", "id"),  # reports / listing by role
+        db.Index("ix_users_status_last_login", "status", "last_login"),        # inactive-user sweep
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     first_name = db.Column(db.String(50), nullable=False)
@@ -27,6 +34,8 @@ class User(db.Model):
     password = db.Column(db.String(200), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
+    # Row version for ETags; bumped by ORM flushes and Core UPDATE statements alike
+    updated_at = db.Column(PreciseDateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 
     def set_password(self, raw_password):
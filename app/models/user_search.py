@@ -0,0 +1,15 @@
+# app/models/user_search.py
+from app.db import db
+
+class UserSearchGram(db.Model):
+    """
+    N-gram posting list for user search: one row per (gram, user).
+    Trigrams cover substring matches; '^' + the first 1-2 characters of a
+    value cover short prefix queries.
+    """
+    __tablename__ = "user_search_grams"
+
+    gram = db.Column(db.String(4), primary_key=True)
+    user_id = db.Column(
+        db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -0,0 +1,14 @@
+# app/models/user_stats.py
+from app.db import db
+
+class UserStat(db.Model):
+    """
+    Summary counters for GET /users/stats, one row per (dimension, bucket):
+    dimension is 'status', 'role' (role_id) or 'signup_day' (YYYY-MM-DD);
+    '' is the bucket for NULL values.
+    """
+    __tablename__ = "user_stats"
+
+    dimension = db.Column(db.String(16), primary_key=True)
+    bucket = db.Column(db.String(64), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,31 @@
+import hmac
+from flask import Blueprint, request, jsonify, current_app
+from app.services.auth import introspect_tokens
+from app.utils.logger import logger
+
+auth_bp = Blueprint("auth_bp", __name__, url_prefix="/auth")
+
+# ------------------ Token Introspection (Edge Gateway) ------------------
+@auth_bp.route("/introspect", methods=["POST"])
+def introspect_route():
+    """Verify a batch of tokens for the reverse proxy: {"tokens": ["...", ...]}"""
+    expected = current_app.config.get("GATEWAY_API_KEY")
+    provided = request.headers.get("X-Gateway-Key", "")
+    if not expected or not hmac.compare_digest(provided.encode(), expected.encode()):
+        logger.warning(f"Rejected introspection request from IP: {request.remote_addr}")
+        return jsonify({"error": "Invalid gateway key"}), 403
+
+    data = request.get_json(silent=True) or {}
+    tokens = data.get("tokens")
+    if not isinstance(tokens, list) or not tokens or not all(isinstance(t, str) for t in tokens):
+        return jsonify({"error": "tokens must be a non-empty list of strings"}), 400
+
+    max_tokens = current_app.config.get("INTROSPECTION_MAX_TOKENS", 100)
+    if len(tokens) > max_tokens:
+        return jsonify({"error": f"At most {max_tokens} tokens per request"}), 400
+
+    result, status = introspect_tokens(tokens, current_app.config.get("INTROSPECTION_MAX_CACHE_SECONDS", 60))
+    response = jsonify(result)
+    # Verdicts are per token (see cache_until); the batch response itself must not be cached
+    response.headers["Cache-Control"] = "no-store"
+    return response, status
@@ -1,7 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app
-from app.services.file_upload import save_file
+import os
+from flask import Blueprint, request, jsonify, send_file
+from werkzeug.wsgi import wrap_file
+from werkzeug.exceptions import HTTPException
+from app.db import db
+from app.models.uploaded_file import UploadedFile
+from app.services.file_upload import receive_upload, delete_file
+from app.services.upload_sessions import (
+    create_upload_session,
+    get_user_session,
+    session_to_dict,
+    write_chunk,
+    finalize_upload_session,
+    abort_upload_session,
+)
 from app.utils.decorators import token_required
 from app.utils.helpers import rate_limit
+from app.utils.logger import logger
 
 file_bp = Blueprint("file_bp", __name__, url_prefix="/files")
 
@@ -11,18 +25,151 @@ file_bp = Blueprint("file_bp", __name__, url_prefix="/files")
 @rate_limit("10 per minute")
 def upload_file():
     try:
-        # Access uploaded file
-        file = request.files.get('file')  
-        if not file:
-            return jsonify({"error": "No file uploaded"}), 400
+        # The body is parsed by the service, not request.files, so the file
+        # streams to disk as it arrives instead of being spooled first
+        result, status = receive_upload(request, request.user.get("user_id"))
+        return jsonify(result), status
 
-        # Optional: get additional form fields (not JSON)
-        description = request.form.get('description')
+    except HTTPException:
+        raise  # 413 from the size limits
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Save file
-        file.save(f"uploads/{file.filename}")
 
-        return jsonify({"message": "File uploaded successfully"}), 200
+# ----------------- Resumable Uploads -----------------
+# POST creates a session, PUT sends chunks with Content-Range (any order, in
+# parallel), GET reports what has arrived, POST .../complete verifies the
+# SHA-256 and stores the file, DELETE cancels.
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+def _session_or_404(session_id):
+    session = get_user_session(session_id, request.user.get("user_id"))
+    if session is None:
+        return None, (jsonify({"error": "Upload session not found"}), 404)
+    return session, None
+
+
+@file_bp.route("/uploads", methods=["POST"])
+@token_required
+@rate_limit("30 per hour")
+def create_upload_session_route():
+    data = request.get_json() or {}
+    result, status = create_upload_session(data, request.user.get("user_id"))
+    return jsonify(result), status
+
+
+@file_bp.route("/uploads/<string:session_id>", methods=["GET"])
+@token_required
+def upload_session_status_route(session_id):
+    session, error = _session_or_404(session_id)
+    if error:
+        return error
+    return jsonify({"data": session_to_dict(session)}), 200
+
+
+@file_bp.route("/uploads/<string:session_id>", methods=["PUT"])
+@token_required
+@rate_limit("600 per minute")
+def upload_chunk_route(session_id):
+    session, error = _session_or_404(session_id)
+    if error:
+        return error
+    content_range = request.headers.get("Content-Range")
+    if not content_range:
+        return jsonify({"error": "Content-Range header is required"}), 400
+    result, status = write_chunk(session, content_range, request.content_length, request.stream)
+    return jsonify(result), status
+
+
+@file_bp.route("/uploads/<string:session_id>/complete", methods=["POST"])
+@token_required
+@rate_limit("30 per hour")
+def complete_upload_session_route(session_id):
+    session, error = _session_or_404(session_id)
+    if error:
+        return error
+    data = request.get_json(silent=True) or {}
+    result, status = finalize_upload_session(session, data.get("sha256"))
+    return jsonify(result), status
+
+
+@file_bp.route("/uploads/<string:session_id>", methods=["DELETE"])
+@token_required
+def cancel_upload_session_route(session_id):
+    session, error = _session_or_404(session_id)
+    if error:
+        return error
+    result, status = abort_upload_session(session)
+    return jsonify(result), status
+
+
+# ----------------- Stored Files -----------------
+
+def _file_or_error(file_id):
+    """The stored file if the caller owns it or is an admin, else an error response."""
+    record = db.session.get(UploadedFile, file_id)
+    if record is None:
+        return None, (jsonify({"error": "File not found"}), 404)
+    current_user = request.user
+    if record.user_id != current_user.get("user_id") and current_user.get("role_name", "").lower() != "admin":
+        logger.warning(f"Unauthorized file access attempt by {current_user.get('email')}")
+        return None, (jsonify({"error": "Access forbidden"}), 403)
+    return record, None
+
+
+def _zero_copy_range(response, path):
+    """
+    Werkzeug serves a 206 through an iterator that reads the file in Python.
+    When the server offers wsgi.file_wrapper (gunicorn: sendfile), hand it the
+    file positioned at the range start instead; the server stops after
+    Content-Length bytes, so the range still goes out kernel-to-socket.
+    """
+    if response.status_code != 206 or "wsgi.file_wrapper" not in request.environ:
+        return response
+    start = response.content_range.start
+    fh = open(path, "rb")
+    fh.seek(start)
+    response.response.close()
+    response.response = wrap_file(request.environ, fh)
+    response.direct_passthrough = True
+    return response
+
+
+@file_bp.route("/<string:file_id>", methods=["GET"])
+@token_required
+@rate_limit("300 per minute")
+def download_file_route(file_id):
+    """Stream a stored file (owner or admin) with Range, ETag and Last-Modified support"""
+    record, error = _file_or_error(file_id)
+    if error:
+        return error
+    path = os.path.abspath(record.path)
+    if not os.path.exists(path):
+        logger.error(f"Blob {record.sha256} for file {record.id} is missing from disk")
+        return jsonify({"error": "File content is missing"}), 404
+
+    # Blobs never change, so the sha256 is a strong validator for both
+    # If-None-Match and If-Range; conditional=True answers 304/206/416
+    response = send_file(
+        path,
+        mimetype=record.content_type or None,
+        as_attachment=True,
+        download_name=record.filename,
+        conditional=True,
+        etag=record.sha256,
+        last_modified=record.created_at,
+    )
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return _zero_copy_range(response, path)
+
+
+@file_bp.route("/<string:file_id>", methods=["DELETE"])
+@token_required
+@rate_limit("60 per minute")
+def delete_file_route(file_id):
+    record, error = _file_or_error(file_id)
+    if error:
+        return error
+    result, status = delete_file(record)
+    return jsonify(result), status
@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify
+from app.extentions import user_cache, token_cache
+from app.utils.decorators import token_required, roles_allowed
+from app.utils.concurrency import concurrency_limits
+
+metrics_bp = Blueprint("metrics_bp", __name__, url_prefix="/metrics")
+
+# ------------------ Runtime Counters (Admin Only) ------------------
+# Counters are per worker process; scrape each worker or sum them upstream.
+
+@metrics_bp.route("/cache", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+def cache_metrics():
+    return jsonify({"user_profiles": user_cache.stats(), "verified_tokens": token_cache.stats()}), 200
+
+
+@metrics_bp.route("/concurrency", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+def concurrency_metrics():
+    """In-flight caps: rising `queued` means the cap is tight, `rejected`/`timed_out` are shed requests."""
+    return jsonify(concurrency_limits.stats()), 200
@@ -2,12 +2,14 @@ from flask import Blueprint, request, jsonify
 from app.services.role import (
     create_role,
     get_all_roles,
+    get_roles_etag,
     get_role_by_id,
     update_role,
     delete_role,
 )
 from app.utils.decorators import token_required, roles_allowed
 from app.utils.helpers import rate_limit
+from app.utils.etag import not_modified
 from app.utils.logger import logger
 
 # Blueprint setup
@@ -39,8 +41,16 @@ def create_role_route():
 def get_roles_route():
     """Get all roles (admin only)"""
     logger.info("Fetching all roles")
+    etag = get_roles_etag()
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     result, status = get_all_roles()
-    return jsonify(result), status
+    response = jsonify(result)
+    if status == 200:
+        response.set_etag(etag)
+    return response, status
 
 
 # ============================================================
@@ -6,28 +6,63 @@ from app.services.scheduler import (
     send_user_reports,
     backup_users_table
 )
+from app.services.search import rebuild_search_index
+from app.services.stats import rebuild_user_stats
+from app.utils.route_limits import route_limiter
+from app.utils.concurrency import concurrency_limit
 
 manual_bp = Blueprint('manual_bp', __name__, url_prefix='/manual')
+# Manual jobs are slow and rare: one at a time per worker, the rest get a 503.
+# The pool sits below the auth checks so rejected callers never hold the slot.
 
 # ------------------ Manual Scheduler Routes (Admin Only) ------------------
 
 @manual_bp.route("/deactivate-users", methods=["POST"])
 @token_required
 @roles_allowed("admin")
+@concurrency_limit("manual_jobs")
 def manual_deactivate_users():
     result = deactivate_inactive_users()
     return jsonify(result), 200
 
 @manual_bp.route("/send-user-reports", methods=["POST"])
 @token_required
-@roles_allowed("admin") 
+@roles_allowed("admin")
+@concurrency_limit("manual_jobs")
 def manual_send_user_reports():
     send_user_reports(current_app)
     return jsonify({"status": "success", "message": "User reports sent"}), 200
 
 @manual_bp.route("/backup-users", methods=["POST"])
 @token_required
-@roles_allowed("admin")  
+@roles_allowed("admin")
+@concurrency_limit("manual_jobs")
 def manual_backup_users():
     backup_users_table(current_app)
     return jsonify({"status": "success", "message": "Users table backed up"}), 200
+
+@manual_bp.route("/rebuild-search-index", methods=["POST"])
+@token_required
+@roles_allowed("admin")
+@concurrency_limit("manual_jobs")
+def manual_rebuild_search_index():
+    indexed = rebuild_search_index()
+    return jsonify({"status": "success", "message": f"Search index rebuilt for {indexed} users"}), 200
+
+@manual_bp.route("/rebuild-user-stats", methods=["POST"])
+@token_required
+@roles_allowed("admin")
+@concurrency_limit("manual_jobs")
+def manual_rebuild_user_stats():
+    buckets = rebuild_user_stats()
+    return jsonify({"status": "success", "message": f"User stats rebuilt ({buckets} buckets)"}), 200
+
+@manual_bp.route("/reload-rate-limits", methods=["POST"])
+@token_required
+@roles_allowed("admin")
+@concurrency_limit("manual_jobs")
+def manual_reload_rate_limits():
+    # This worker reloads now; the others notice a changed ROUTE_LIMITS_FILE on their next check
+    limits = route_limiter.reload()
+    return jsonify({"status": "success", "message": f"Rate limits reloaded for {len(limits)} routes",
+                    "data": route_limiter.describe()}), 200
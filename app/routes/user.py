@@ -1,14 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from app.services.user import (
     create_user,
     get_user_by_id,
-    get_all_users,
+    fetch_users_page,
+    users_page_response,
     update_user,
     delete_user,
+    export_users,
+    get_user_etag,
+    create_users_bulk,
+    update_users_bulk,
+    delete_users_bulk,
+    parse_user_filters,
+    EXPORT_FORMATS,
 )
+from app.services.search import search_users
+from app.services.stats import get_user_stats
 from app.services.auth import login, refresh, logout, reset_password, forgot_password
 from app.utils.decorators import token_required, roles_allowed
 from app.utils.helpers import rate_limit, response_formatter
+from app.utils.concurrency import concurrency_limit
+from app.utils.etag import not_modified
 from app.utils.logger import logger
 
 user_bp = Blueprint("user_bp", __name__, url_prefix="/users")
@@ -31,29 +43,141 @@ def create_user_route():
     return jsonify(result), status_code
 
 
+@user_bp.route("/bulk", methods=["POST"])
+@rate_limit("10 per hour")
+@token_required
+@roles_allowed("admin")
+def create_users_bulk_route():
+    """Register many users in one request (admin only); reports a result per item"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return jsonify(response_formatter(None, "Expected a non-empty JSON array of users", False)), 400
+
+    max_items = current_app.config["BULK_USER_MAX_ITEMS"]
+    if len(items) > max_items:
+        return jsonify(response_formatter(None, f"At most {max_items} users per request", False)), 400
+
+    results, created = create_users_bulk(items)
+    message = f"{created} of {len(items)} users created"
+    if created == len(items):
+        return jsonify(response_formatter(results, message)), 201
+    return jsonify(response_formatter(results, message, created > 0)), 207 if created else 400
+
+
+@user_bp.route("/bulk", methods=["PATCH"])
+@token_required
+@roles_allowed("admin")
+@rate_limit("20 per hour")
+def update_users_bulk_route():
+    """Update every user matching {"ids": [...]} or {"filter": {...}} with {"data": {...}} (admin only)"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify(response_formatter(None, "No input data provided", False)), 400
+
+    result, status = update_users_bulk(body, current_user_role=request.user["role_name"])
+    return jsonify(result), status
+
+
+@user_bp.route("/bulk", methods=["DELETE"])
+@token_required
+@roles_allowed("admin")
+@rate_limit("5 per hour")
+def delete_users_bulk_route():
+    """Delete every user matching {"ids": [...]} or {"filter": {...}} (admin only)"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify(response_formatter(None, "No input data provided", False)), 400
+
+    result, status = delete_users_bulk(body)
+    return jsonify(result), status
+
+
 @user_bp.route("/", methods=["GET"])
 @token_required
 @roles_allowed("admin")
 @rate_limit("30 per minute")
+@concurrency_limit("user_listing")
 def get_all_users_route():
-    """Admin can view all registered users"""
-    result = get_all_users()  # Already returns response dict
-    return jsonify(result), 200
+    """Admin can view registered users, one keyset page at a time (?limit=&cursor=&fields=)"""
+    page, message = fetch_users_page(request.args)
+    if message:
+        return jsonify(response_formatter(None, message, False)), 400
+
+    # The ETag comes from the fetched page; a match only skips serialization
+    cached = not_modified(page["etag"])
+    if cached:
+        return cached
+
+    response = jsonify(users_page_response(page))
+    response.set_etag(page["etag"])
+    return response, 200
+
+
+@user_bp.route("/search", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+@rate_limit("60 per minute")
+@concurrency_limit("user_listing")
+def search_users_route():
+    """Ranked prefix/substring search on name and email (?q=&limit=&offset=, admin only)"""
+    result, status = search_users(request.args)
+    return jsonify(result), status
+
+
+@user_bp.route("/stats", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+@rate_limit("60 per minute")
+def user_stats_route():
+    """User counts by status, role and signup day from the summary table (admin only)"""
+    result, status = get_user_stats()
+    return jsonify(result), status
+
+
+@user_bp.route("/export", methods=["GET"])
+@token_required
+@roles_allowed("admin")
+@rate_limit("5 per minute")
+def export_users_route():
+    """Stream users as NDJSON or CSV (?format=), honouring the list filters (admin only)"""
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify(response_formatter(None, f"Invalid format. Allowed: {list(EXPORT_FORMATS)}", False)), 400
+
+    criteria, message = parse_user_filters(request.args)
+    if message:
+        return jsonify(response_formatter(None, message, False)), 400
+
+    logger.info(f"Admin {request.user.get('email')} exporting users as {fmt}")
+    return Response(
+        stream_with_context(export_users(criteria, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=users.{fmt}"},
+    )
 
 
 @user_bp.route("/<string:user_id>", methods=["GET"])
 @token_required
 @rate_limit("60 per minute")
 def get_user_route(user_id):
-    """Fetch single user details (self or admin)"""
+    """Fetch single user details (self or admin); ?fields= selects a sparse fieldset"""
     current_user = request.user
 
     if current_user["user_id"] != user_id and current_user["role_name"].lower() != "admin":
         logger.warning(f"Unauthorized access attempt by {current_user['email']}")
         return jsonify(response_formatter(None, "Access forbidden", False)), 403
 
-    result = get_user_by_id(user_id)  # Already returns response dict
-    return jsonify(result), 200 if result["status"] else 404
+    fields = request.args.get("fields")
+    etag = get_user_etag(user_id, fields)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    result, status = get_user_by_id(user_id, fields=fields)
+    response = jsonify(result)
+    if status == 200 and etag:
+        response.set_etag(etag)
+    return response, status
 
 @user_bp.route("/<string:user_id>", methods=["PUT"])
 @token_required
@@ -91,8 +215,8 @@ def update_user_route(user_id):
 @rate_limit("5 per minute")
 def delete_user_route(user_id):
     """Delete user (Admin only)"""
-    result = delete_user(user_id)  # Already returns response dict
-    return jsonify(result), 200 if result["status"] else 404
+    result, status = delete_user(user_id)
+    return jsonify(result), status
 
 
 # ============================================================
@@ -101,6 +225,7 @@ def delete_user_route(user_id):
 
 @user_bp.route("/login", methods=["POST"])
 @rate_limit("5 per minute")
+@concurrency_limit("password_hashing")
 def login_route():
     """User login to get access and refresh tokens"""
     data = request.get_json() or {}
@@ -129,6 +254,7 @@ def forgot_password_route():
 
 @user_bp.route("/reset-password", methods=["POST"])
 @rate_limit("3 per hour")
+@concurrency_limit("password_hashing")
 def reset_password_route():
     data = request.get_json() or {}
     token = data.get("token")
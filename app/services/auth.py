@@ -1,20 +1,33 @@
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy import select
 from app.models.user import User, db
-from app.utils.jwt import create_access_token, create_refresh_token, decode_token, invalidate_token
+from app.utils.passwords import password_hasher, PasswordHasherBusy
+from app.utils.jwt import (
+    create_access_token, create_refresh_token, decode_token, invalidate_token,
+    create_reset_token, decode_reset_token, consume_reset_token, release_reset_token,
+    RESET_TOKEN_EXPIRES_MINUTES,
+)
 from app.utils.email import send_email_async
 from app.utils.helpers import is_valid_password
+from app.utils.login_activity import login_activity
+from app.utils.role import role_registry
 from flask import request
 from app.utils.logger import logger
 
-import uuid
-from datetime import datetime, timedelta
-
-# Temporary in-memory token store
-reset_tokens = {}
+import time
+from datetime import datetime
 
 # ----------------------------
 # LOGIN
 # ----------------------------
+LOGIN_COLUMNS = [
+    User.id, User.first_name, User.middle_name, User.last_name, User.salutation, User.gender,
+    User.date_of_birth, User.email, User.phone, User.role_id, User.status, User.password,
+]
+
+def build_login_query(email):
+    """User columns needed for a login in one round trip; the role name comes from role_registry."""
+    return select(*LOGIN_COLUMNS).where(User.email == email)
+
 def login(email: str, password: str):
     ip = request.remote_addr
     logger.info(f"Login attempt for email: {email}, IP: {ip}")
@@ -23,19 +36,25 @@ def login(email: str, password: str):
         email = email.strip().lower()
         password = password.strip()
 
-        user = User.query.filter_by(email=email).first()
-        if not user or not check_password_hash(user.password, password):
+        user = db.session.execute(build_login_query(email)).first()
+        if not user or not password_hasher.verify(user.password, password):
             logger.warning(f"Failed login attempt for email: {email}, IP: {ip}")
             return {"error": "Invalid email or password"}, 401
 
-        # ✅ Successful login: update last_login
-        user.last_login = datetime.utcnow()
-        db.session.commit()
+        # ✅ Transparently upgrade hashes made with an older algorithm/cost
+        new_hash = None
+        if password_hasher.needs_rehash(user.password):
+            new_hash = password_hasher.hash(password)
+            logger.info(f"Password hash upgraded for user_id: {user.id}")
+
+        # ✅ Successful login: last_login (and any rehash) is written off the response path
+        last_login = datetime.utcnow()
+        login_activity.record(user.id, last_login, password=new_hash, replaces=user.password)
 
         logger.info(f"Successful login for user_id: {user.id}, IP: {ip}")
 
-        # ✅ Include role_name in token identity
-        role_name = user.role.role_name if user.role else "user"
+        # ✅ Include role_name in token identity (in-process role map, no query)
+        role_name = role_registry.role_name(user.role_id, "user")
 
         identity = {
             "user_id": user.id,
@@ -60,7 +79,7 @@ def login(email: str, password: str):
             "role_id": user.role_id,
             "role_name": role_name,  # ✅ Added
             "status": user.status,
-            "last_login": user.last_login.strftime("%Y-%m-%d %H:%M:%S")
+            "last_login": last_login.strftime("%Y-%m-%d %H:%M:%S")
         }
 
         return {
@@ -69,6 +88,10 @@ def login(email: str, password: str):
             "user": user_info
         }, 200
 
+    except PasswordHasherBusy:
+        db.session.rollback()
+        logger.warning(f"Login shed, hashing queue full: {email}, IP: {ip}")
+        raise
     except Exception as e:
         logger.error(f"Login error for email {email}: {str(e)}")
         db.session.rollback()
@@ -91,13 +114,15 @@ def refresh(refresh_token: str):
             return {"error": "Token is not a refresh token"}, 401
 
         user_id = payload.get("sub")
-        user = User.query.get(user_id)
+        user = db.session.execute(
+            select(User.id, User.email, User.role_id).where(User.id == user_id)
+        ).first()
         if not user:
             logger.warning(f"Refresh token used for non-existent user_id: {user_id}")
             return {"error": "User not found"}, 404
 
-        # ✅ Load role_name dynamically
-        role_name = user.role.role_name if user.role else "user"
+        # ✅ Load role_name dynamically from the in-process role map
+        role_name = role_registry.role_name(user.role_id, "user")
 
         identity = {
             "user_id": user.id,
@@ -142,9 +167,8 @@ def forgot_password(email: str):
         logger.warning(f"Forgot password attempt for non-existent email: {email}")
         return {"error": "Email does not exist"}, 404
 
-    token = str(uuid.uuid4())
-    expires = datetime.utcnow() + timedelta(hours=1)
-    reset_tokens[token] = {"user_id": user.id, "expires": expires}
+    # Signed and self-expiring: valid on any worker, no server state until it is used
+    token = create_reset_token(user.id)
 
     reset_link = f"http://localhost:5000/users/reset-password?token={token}"
     subject = "Reset Your Password"
@@ -156,7 +180,7 @@ Click the link below to reset it:
 
 {reset_link}
 
-This link will expire in 1 hour.
+This link will expire in {RESET_TOKEN_EXPIRES_MINUTES} minutes and can be used once.
 If you didn’t request this, please ignore this email.
 
 Regards,
@@ -176,19 +200,14 @@ Your App Team
 # RESET PASSWORD
 # ----------------------------
 def reset_password(token: str, new_password: str):
-    data = reset_tokens.get(token)
-    if not data:
-        logger.warning(f"Invalid or expired password reset token: {token}")
-        return {"error": "Invalid or expired token"}, 400
+    ok, payload_or_err = decode_reset_token(token)
+    if not ok:
+        logger.warning(f"Rejected password reset token: {payload_or_err}")
+        return {"error": payload_or_err}, 400
 
-    if data["expires"] < datetime.utcnow():
-        del reset_tokens[token]
-        logger.warning(f"Expired password reset token used: {token}")
-        return {"error": "Token expired"}, 400
-
-    user = User.query.get(data["user_id"])
+    user = User.query.get(payload_or_err["sub"])
     if not user:
-        logger.warning(f"Password reset attempted for non-existent user_id: {data['user_id']}")
+        logger.warning(f"Password reset attempted for non-existent user_id: {payload_or_err['sub']}")
         return {"error": "User not found"}, 404
 
     valid, message = is_valid_password(new_password)
@@ -196,14 +215,56 @@ def reset_password(token: str, new_password: str):
         logger.warning(f"Password reset validation failed for user_id: {user.id}")
         return {"error": message}, 400
 
+    # ✅ One-time use: only the first request to claim the token id may proceed
+    if not consume_reset_token(payload_or_err):
+        logger.warning(f"Password reset token reused for user_id: {user.id}")
+        return {"error": "Token already used"}, 400
+
+    # Until the new password is committed the claim is given back on any
+    # failure (including a 503 from a full hashing queue), so the link still works
     try:
-        user.password = generate_password_hash(new_password)
+        user.password = password_hasher.hash(new_password)
         db.session.add(user)
         db.session.commit()
         logger.info(f"Password reset successfully for user_id: {user.id}")
-        del reset_tokens[token]
         return {"message": "Password reset successfully"}, 200
+    except PasswordHasherBusy:
+        db.session.rollback()
+        release_reset_token(payload_or_err)
+        raise
     except Exception as e:
         db.session.rollback()
+        release_reset_token(payload_or_err)
         logger.error(f"Password reset error for user_id {user.id}: {str(e)}")
         return {"error": "Internal server error"}, 500
+
+
+# ----------------------------
+# TOKEN INTROSPECTION (edge gateway)
+# ----------------------------
+def introspect_tokens(tokens, max_cache_seconds=60):
+    """
+    Validate a batch of tokens through decode_token (signature, exp, revocation).
+    Active results carry the identity claims plus `cache_until`: the gateway may
+    reuse them until then, i.e. the token's exp capped at max_cache_seconds so a
+    logout is picked up within that window. Inactive results never become valid.
+    """
+    now = int(time.time())
+    verdicts = {}
+    for token in dict.fromkeys(tokens):  # duplicates in a batch are verified once
+        ok, payload_or_err = decode_token(token)
+        if not ok:
+            verdicts[token] = {"active": False, "error": payload_or_err}
+            continue
+        payload = payload_or_err
+        verdicts[token] = {
+            "active": True,
+            "type": payload.get("type"),
+            "sub": payload.get("sub"),
+            "exp": payload["exp"],
+            "iat": payload.get("iat"),
+            "data": payload.get("data"),
+            "cache_until": min(payload["exp"], now + max_cache_seconds),
+        }
+    logger.info(f"Introspected {len(tokens)} tokens ({len(verdicts)} distinct)")
+    return {"results": [verdicts[token] for token in tokens]}, 200
@@ -1,28 +1,378 @@
 import os
+import re
+import time
+import uuid
+import hashlib
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import MultiPartParser
 from werkzeug.utils import secure_filename
+from app.db import db
+from app.models.file_blob import FileBlob
+from app.models.uploaded_file import UploadedFile
+from app.models.upload_session import UploadSession
+from app.models.user import User
 from app.utils.logger import logger
 
 UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "pdf", "txt", "csv"}
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
 
 # Create upload folder if not exists
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+
+class UploadTooLarge(RequestEntityTooLarge):
+    """An upload crossed a size limit while streaming; answered with 413."""
+
+
 def allowed_file(filename: str):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_file(file):
+
+def upload_folder():
+    """Absolute, so stored paths don't depend on the CWD (send_file resolves relative ones against root_path)."""
+    return os.path.abspath(current_app.config.get("UPLOAD_FOLDER", UPLOAD_FOLDER))
+
+
+def blob_path(sha256):
+    """Content-addressed location: uploads/blobs/<first two hex digits>/<sha256>."""
+    return os.path.join(upload_folder(), "blobs", sha256[:2], sha256)
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def staging_folder():
+    """Where partial uploads are written: inside the upload folder, so storing one is a rename."""
+    path = os.path.join(upload_folder(), ".incoming")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class UploadSink:
     """
-    Save the uploaded file to the upload folder
+    Write target handed to the multipart parser for one file part. Each chunk
+    is counted, hashed and written to a file in the staging folder, so storing
+    the upload is a rename rather than a copy. Crossing `limit`
+    aborts the parse. Parts with a disallowed name, and parts whose declared
+    `expected` sha256 is already stored, are counted and hashed but not kept.
     """
-    if not allowed_file(file.filename):
-        logger.warning(f"Attempted to upload invalid file type: {file.filename}")
+
+    def __init__(self, directory, limit, keep=True, expected=None):
+        self.limit = limit
+        self.expected = expected
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self.path = None
+        self._fh = None
+        if keep:
+            self.path = os.path.join(directory, f"{uuid.uuid4().hex}.part")
+            self._fh = open(self.path, "wb")
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.limit:
+            self.discard()
+            raise UploadTooLarge()
+        self._digest.update(data)
+        if self._fh is not None:
+            self._fh.write(data)
+        return len(data)
+
+    def seek(self, offset, whence=0):
+        # The parser rewinds each finished part; nothing is read back from the sink
+        return 0
+
+    def finish(self):
+        """Flush the part to stable storage and hand its path over (None if nothing was kept)."""
+        if self._fh is None:
+            return None
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._fh = None
+        path, self.path = self.path, None
+        return path
+
+    def discard(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self.path is not None:
+            remove_quietly(self.path)
+            self.path = None
+
+
+def used_bytes(user_id):
+    """Stored bytes plus the space reserved by the user's unfinished upload sessions."""
+    stored = db.session.scalar(
+        select(func.coalesce(func.sum(UploadedFile.size), 0)).where(UploadedFile.user_id == user_id)
+    )
+    reserved = db.session.scalar(
+        select(func.coalesce(func.sum(UploadSession.size), 0)).where(UploadSession.user_id == user_id)
+    )
+    return stored + reserved
+
+
+def fits_quota(user_id, size, quota):
+    """
+    Whether `size` more bytes keep the user within quota, checked under a lock
+    on their users row: a second upload finishing at the same time waits here
+    and then sees this one's bytes. Call at the start of the storing transaction.
+    """
+    db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+    return used_bytes(user_id) + size <= quota
+
+
+def clean_filename(name):
+    """Returns (safe filename, None) or (None, error message)."""
+    if not allowed_file(name or ""):
+        logger.warning(f"Attempted to upload invalid file type: {name}")
         return None, "File type not allowed"
+    filename = secure_filename(name)
+    if not allowed_file(filename):
+        return None, "Invalid file name"
+    return filename, None
+
+
+def find_blob(sha256):
+    """The stored blob for this content, if any (it may be awaiting garbage collection)."""
+    return db.session.get(FileBlob, sha256) if sha256 and SHA256_HEX.match(sha256) else None
+
+
+def _reference_blob(sha256, size, temp_path):
+    """
+    Take a reference on the blob for `sha256`. A duplicate only costs the
+    refcount update and the staged copy is dropped; new content is renamed
+    into the blob store. Returns the FileBlob, or None when temp_path is None
+    (content verified against a blob, nothing staged) and that blob is gone.
+    """
+    bumped = db.session.execute(
+        update(FileBlob).where(FileBlob.sha256 == sha256).values(refcount=FileBlob.refcount + 1)
+    ).rowcount
+    if bumped:
+        if temp_path:
+            remove_quietly(temp_path)
+        return db.session.get(FileBlob, sha256, populate_existing=True)
+    if temp_path is None:
+        return None
+
+    path = blob_path(sha256)
+    try:
+        with db.session.begin_nested():
+            blob = FileBlob(sha256=sha256, size=size, path=path, refcount=1)
+            db.session.add(blob)
+    except IntegrityError:
+        # Same content stored concurrently: reference that copy
+        return _reference_blob(sha256, size, temp_path)
+
+    # Renamed only once the row is in: if the transaction still fails, the
+    # file is left for collect_garbage_blobs, which the fresh mtime holds off
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.utime(temp_path)
+    os.replace(temp_path, path)
+    return blob
+
+
+def store_file(temp_path, filename, user_id, size, sha256, content_type=None, description=None, quota=None):
+    """
+    Record an upload against the content-addressed blob for its sha256.
+    `temp_path` is the fully received, fsynced staging file, or None when the
+    bytes were only verified against an existing blob. With `quota`, the
+    user's usage is rechecked first (see fits_quota) and UploadTooLarge raised
+    if the upload no longer fits. Returns (UploadedFile, None) or (None, error
+    message).
+    """
+    if quota is not None and not fits_quota(user_id, size, quota):
+        db.session.rollback()
+        if temp_path:
+            remove_quietly(temp_path)
+        raise UploadTooLarge("Upload would exceed your storage quota")
+
+    blob = _reference_blob(sha256, size, temp_path)
+    if blob is None:
+        db.session.rollback()
+        return None, "The stored copy of this content is gone; upload it again without a declared sha256"
+
+    record = UploadedFile(
+        user_id=user_id,
+        filename=filename,
+        path=blob.path,
+        content_type=content_type or None,
+        size=size,
+        sha256=sha256,
+        description=description,
+    )
+    db.session.add(record)
+    db.session.commit()
+
+    deduplicated = " (deduplicated)" if blob.refcount > 1 else ""
+    logger.info(f"File uploaded successfully: {filename} ({size} bytes, sha256 {sha256}){deduplicated}")
+    return record, None
+
+
+def save_file(file, user_id, description=None, quota=None):
+    """
+    Store an uploaded file in the blob store and record it, within `quota`
+    bytes for the user if given. Returns (UploadedFile, None) or (None, error
+    message).
+    """
+    filename, error = clean_filename(file.filename)
+    if error:
+        return None, error
+
+    if isinstance(file.stream, UploadSink):
+        sink = file.stream
+        if sink.expected and sink.sha256 != sink.expected:
+            return None, "File content does not match X-Content-SHA256"
+        temp_path = sink.finish()
+        size, sha256 = sink.size, sink.sha256
+    else:
+        temp_path = os.path.join(staging_folder(), f"{uuid.uuid4().hex}.part")
+        file.save(temp_path)
+        with open(temp_path, "rb") as fh:
+            sha256 = hashlib.file_digest(fh, "sha256").hexdigest()
+        size = os.path.getsize(temp_path)
+
+    return store_file(temp_path, filename, user_id, size, sha256, file.mimetype, description, quota=quota)
+
+
+def delete_file(record):
+    """Drop one reference; the blob itself goes when the garbage collector finds it unreferenced."""
+    db.session.execute(
+        update(FileBlob).where(FileBlob.sha256 == record.sha256).values(refcount=FileBlob.refcount - 1)
+    )
+    db.session.delete(record)
+    db.session.commit()
+    logger.info(f"File {record.id} ({record.filename}) deleted")
+    return {"message": "File deleted"}, 200
+
+
+def collect_garbage_blobs():
+    """
+    Delete blobs nobody references. Each one is removed in its own transaction
+    and the file unlinked before commit: the row stays locked meanwhile, so an
+    upload of the same content waits and then stores a fresh copy instead of
+    referencing a file that is about to disappear. Files in the blob store
+    without a row (their upload's transaction failed after the rename) are
+    removed once idle for UPLOAD_SESSION_TTL_SECONDS.
+    Returns (blobs removed, bytes reclaimed).
+    """
+    candidates = db.session.execute(
+        select(FileBlob.sha256, FileBlob.path, FileBlob.size).where(FileBlob.refcount <= 0)
+    ).all()
+    db.session.rollback()
+    removed = reclaimed = 0
+    for sha256, path, size in candidates:
+        deleted = db.session.execute(
+            delete(FileBlob).where(FileBlob.sha256 == sha256, FileBlob.refcount <= 0)
+        ).rowcount
+        if deleted:
+            remove_quietly(path)
+            removed += 1
+            reclaimed += size
+        db.session.commit()
+
+    orphans, orphaned_bytes = _collect_orphan_blob_files()
+    removed += orphans
+    reclaimed += orphaned_bytes
+    if removed:
+        logger.info(f"Garbage collected {removed} unreferenced blobs ({reclaimed} bytes)")
+    return removed, reclaimed
+
+
+def _collect_orphan_blob_files():
+    root = os.path.join(upload_folder(), "blobs")
+    if not os.path.isdir(root):
+        return 0, 0
+    cutoff = time.time() - current_app.config["UPLOAD_SESSION_TTL_SECONDS"]
+    removed = reclaimed = 0
+    with os.scandir(root) as shards:
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as entries:
+                idle = {e.name: e for e in entries if e.is_file() and e.stat().st_mtime < cutoff}
+            if not idle:
+                continue
+            known = set(db.session.scalars(select(FileBlob.sha256).where(FileBlob.sha256.in_(idle))))
+            db.session.rollback()
+            for name in idle.keys() - known:
+                reclaimed += idle[name].stat().st_size
+                remove_quietly(idle[name].path)
+                removed += 1
+    return removed, reclaimed
+
+
+def receive_upload(req, user_id):
+    """
+    Parse a multipart upload straight off the request stream, in
+    UPLOAD_CHUNK_SIZE reads. MAX_CONTENT_LENGTH caps the whole body; file parts
+    together may not take the user past UPLOAD_USER_QUOTA_BYTES. Either limit
+    raises a 413 as soon as it is crossed, without reading the rest.
+    A client may declare the file's hash in X-Content-SHA256: if that content
+    is already stored, the body is only hashed to prove it matches, never written.
+    """
+    boundary = req.mimetype_params.get("boundary")
+    if req.mimetype != "multipart/form-data" or not boundary:
+        return {"error": "Expected a multipart/form-data body"}, 400
+
+    declared = (req.headers.get("X-Content-SHA256") or "").lower() or None
+    if declared and not SHA256_HEX.match(declared):
+        return {"error": "X-Content-SHA256 must be 64 hex characters"}, 400
+
+    config = current_app.config
+    remaining = config["UPLOAD_USER_QUOTA_BYTES"] - used_bytes(user_id)
+    if remaining <= 0:
+        raise UploadTooLarge("Upload quota exhausted")
+    duplicate = find_blob(declared) is not None
+    db.session.rollback()  # don't hold the read transaction open while the body streams in
+
+    directory = staging_folder()
+    sinks = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        keep = allowed_file(filename or "") and not duplicate
+        sink = UploadSink(directory, remaining - sum(s.size for s in sinks), keep=keep, expected=declared)
+        sinks.append(sink)
+        return sink
+
+    parser = MultiPartParser(
+        stream_factory,
+        max_form_memory_size=config.get("MAX_FORM_MEMORY_SIZE"),
+        buffer_size=config["UPLOAD_CHUNK_SIZE"],
+    )
+    try:
+        try:
+            form, files = parser.parse(req.stream, boundary.encode("latin-1"), req.content_length)
+        except UploadTooLarge:
+            raise UploadTooLarge("Upload would exceed your storage quota")
+        except ValueError:
+            return {"error": "Malformed multipart body"}, 400
+
+        file = files.get("file")
+        if not file or not file.filename:
+            return {"error": "No file uploaded"}, 400
 
-    filename = secure_filename(file.filename)
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(file_path)
-    
-    logger.info(f"File uploaded successfully: {filename}")
-    return file_path, None
+        # The check above reserved nothing: concurrent uploads may all have
+        # passed it, so the quota is enforced again when the file is stored
+        record, error = save_file(file, user_id, description=form.get("description"),
+                                  quota=config["UPLOAD_USER_QUOTA_BYTES"])
+        if error:
+            return {"error": error}, 400
+        return {"message": "File uploaded successfully", "data": record.to_dict()}, 200
+    finally:
+        for sink in sinks:
+            sink.discard()  # everything but the committed part
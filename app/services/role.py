@@ -1,5 +1,6 @@
 from app.models.role import Role, db
 from app.utils.logger import logger
+from app.utils.role import role_registry
 from datetime import datetime
 import uuid
 
@@ -25,7 +26,9 @@ def create_role(data):
             updated_at=datetime.utcnow(),
         )
         db.session.add(new_role)
+        role_registry.bump()
         db.session.commit()
+        role_registry.reload()
 
         logger.info(f"Role created successfully: {role_name}")
         return {
@@ -43,38 +46,38 @@ def create_role(data):
 # ----------------------------
 # GET ALL ROLES
 # ----------------------------
+def _format_role(role):
+    return {
+        "id": role.id,
+        "role_name": role.role_name,
+        "created_at": role.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "updated_at": role.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
 def get_all_roles():
+    """Served from the in-process role snapshot; no database round trip."""
     try:
-        roles = Role.query.all()
-        return [
-            {
-                "id": role.id,
-                "role_name": role.role_name,
-                "created_at": role.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "updated_at": role.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            for role in roles
-        ], 200
+        return [_format_role(role) for role in role_registry.snapshot().roles], 200
     except Exception as e:
         logger.error(f"Error fetching roles: {str(e)}")
         return {"error": "Internal server error"}, 500
 
 
+def get_roles_etag():
+    """ETag for the roles list (count + max(updated_at)) of the current snapshot."""
+    return role_registry.snapshot().etag
+
+
 # ----------------------------
 # GET ROLE BY ID
 # ----------------------------
 def get_role_by_id(role_id):
     try:
-        role = Role.query.get(role_id)
+        role = role_registry.get(role_id)
         if not role:
             return {"error": "Role not found"}, 404
 
-        return {
-            "id": role.id,
-            "role_name": role.role_name,
-            "created_at": role.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            "updated_at": role.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
-        }, 200
+        return _format_role(role), 200
     except Exception as e:
         logger.error(f"Error fetching role {role_id}: {str(e)}")
         return {"error": "Internal server error"}, 500
@@ -94,7 +97,9 @@ def update_role(role_id, data):
             role.role_name = role_name.strip().lower()
         role.updated_at = datetime.utcnow()
 
+        role_registry.bump()
         db.session.commit()
+        role_registry.reload()
         logger.info(f"Role updated successfully: {role.role_name}")
         return {
             "status": True,
@@ -117,7 +122,9 @@ def delete_role(role_id):
             return {"error": "Role not found"}, 404
 
         db.session.delete(role)
+        role_registry.bump()
         db.session.commit()
+        role_registry.reload()
         logger.info(f"Role deleted successfully: {role.role_name}")
         return {"status": True, "message": "Role deleted successfully"}, 200
     except Exception as e:
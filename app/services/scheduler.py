@@ -2,14 +2,32 @@
 from datetime import datetime, timedelta
 from app.models.user import User, db
 from app.utils.email import send_email_async
+from app.extentions import user_cache
+from app.services.stats import apply_stat_deltas, change_deltas
 import os
 import csv
+from collections import Counter
+
+from sqlalchemy import select
+from app.models.role import Role
 
 # 1️⃣ Deactivate inactive users
 from app.models.user import User
 from app.db import db
 from datetime import datetime, timedelta
 
+def inactive_users_query(threshold_date):
+    """Active users whose last login is older than threshold_date (ix_users_status_last_login)."""
+    return select(User).where(
+        User.status == 'Active',
+        User.last_login != None,  # Ignore users who never logged in (optional)
+        User.last_login < threshold_date
+    )
+
+def admin_users_query():
+    """Users holding the admin role (ix_users_role_id_created_at)."""
+    return select(User).where(User.role_id.in_(select(Role.id).where(Role.role_name == "admin")))
+
 def deactivate_inactive_users():
     """
     Deactivate users who haven't logged in for the last 30 days
@@ -18,21 +36,21 @@ def deactivate_inactive_users():
     threshold_date = datetime.utcnow() - timedelta(days=30)
 
     # Select users who are "Active" but haven't logged in recently
-    inactive_users = User.query.filter(
-        User.status == 'Active',
-        User.last_login != None,  # Ignore users who never logged in (optional)
-        User.last_login < threshold_date
-    ).all()
+    inactive_users = db.session.execute(inactive_users_query(threshold_date)).scalars().all()
 
     if not inactive_users:
         return {"status": "success", "message": "No inactive users to deactivate", "deactivated_users": []}
 
     deactivated_ids = []
+    deltas = Counter()
     for user in inactive_users:
+        deltas.update(change_deltas(user.status, user.role_id, 'Inactive', user.role_id))
         user.status = 'Inactive'
         deactivated_ids.append(user.id)
 
+    apply_stat_deltas(deltas)
     db.session.commit()
+    user_cache.invalidate(*deactivated_ids)
 
     return {"status": "success", "message": f"Deactivated {len(deactivated_ids)} users", "deactivated_users": deactivated_ids}
 
@@ -40,7 +58,7 @@ def deactivate_inactive_users():
 def send_user_reports(app):
     with app.app_context():
         users = User.query.all()
-        admins = User.query.filter(User.role_id.startswith("admin")).all()
+        admins = db.session.execute(admin_users_query()).scalars().all()
         report = "\n".join([f"{u.id} - {u.email} - {u.status}" for u in users])
         for admin in admins:
             send_email_async(admin.email, "Daily User Report", report)
@@ -0,0 +1,158 @@
+from sqlalchemy import select, insert, delete, func, case, and_, or_
+
+from app.models.user import User, db
+from app.models.user_search import UserSearchGram
+from app.utils.helpers import format_user, response_formatter, USER_FIELDS
+from app.utils.logger import logger
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_OFFSET = 1000
+REBUILD_BATCH_SIZE = 1000
+
+
+# ----------------------------
+# GRAMS
+# ----------------------------
+def _searchable_values(first_name, last_name, email):
+    # Only the local part of the email: domains are shared by most users and
+    # their grams would make every posting list huge.
+    local_part = (email or "").split("@")[0]
+    return [v.lower() for v in (first_name, last_name, local_part) if v]
+
+def user_grams(first_name, last_name, email):
+    grams = set()
+    for value in _searchable_values(first_name, last_name, email):
+        grams.add("^" + value[:1])
+        grams.add("^" + value[:2])
+        grams.update(value[i:i + 3] for i in range(len(value) - 2))
+    return grams
+
+def query_grams(token):
+    """
+    Grams a token must match: its trigrams, or a prefix gram when shorter than
+    3 chars. Only what precedes an "@" is indexed, so a token like
+    "asmith@example.com" is narrowed by "asmith" alone and the rest is left to
+    the LIKE check. A token needs at least 3 characters before the "@" (or to
+    be a short prefix like "a@") to be looked up; anything less matches no one.
+    """
+    local_part = token.split("@")[0]
+    if len(token) < 3:
+        return {"^" + local_part} if local_part else set()
+    return {local_part[i:i + 3] for i in range(len(local_part) - 2)}
+
+
+# ----------------------------
+# INDEX MAINTENANCE (called inside the writer's transaction)
+# ----------------------------
+def gram_rows(user_id, first_name, last_name, email):
+    return [{"gram": g, "user_id": user_id} for g in user_grams(first_name, last_name, email)]
+
+def index_users(users):
+    """(Re)index users given as objects or rows with id/first_name/last_name/email."""
+    users = list(users)
+    if not users:
+        return
+    unindex_users([u.id for u in users])
+    rows = [r for u in users for r in gram_rows(u.id, u.first_name, u.last_name, u.email)]
+    if rows:
+        db.session.execute(insert(UserSearchGram), rows)
+
+def reindex_user_ids(user_ids):
+    users = db.session.execute(
+        select(User.id, User.first_name, User.last_name, User.email).where(User.id.in_(user_ids))
+    ).all()
+    index_users(users)
+
+def unindex_users(user_ids):
+    if user_ids:
+        db.session.execute(delete(UserSearchGram).where(UserSearchGram.user_id.in_(user_ids)))
+
+def rebuild_search_index():
+    """Rebuild every posting list in id order, one committed batch at a time."""
+    last_id, indexed = "", 0
+    while True:
+        batch = db.session.execute(
+            select(User.id, User.first_name, User.last_name, User.email)
+            .where(User.id > last_id).order_by(User.id).limit(REBUILD_BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+        index_users(batch)
+        db.session.commit()
+        indexed += len(batch)
+        last_id = batch[-1].id
+    logger.info(f"Search index rebuilt for {indexed} users")
+    return indexed
+
+
+# ----------------------------
+# SEARCH
+# ----------------------------
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _paging(params):
+    try:
+        limit = int(params.get("limit") or SEARCH_DEFAULT_LIMIT)
+        offset = int(params.get("offset") or 0)
+    except (TypeError, ValueError):
+        return None, None, "limit and offset must be integers"
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return None, None, f"limit must be between 1 and {SEARCH_MAX_LIMIT}"
+    if not 0 <= offset <= SEARCH_MAX_OFFSET:
+        return None, None, f"offset must be between 0 and {SEARCH_MAX_OFFSET}"
+    return limit, offset, ""
+
+def build_search_query(tokens, limit, offset):
+    """
+    Candidates are users whose posting lists contain every query gram; the
+    (small) candidate set is then verified with LIKE and ranked: prefix
+    matches of the first token before plain substring matches.
+    """
+    grams = set().union(*(query_grams(t) for t in tokens))
+    candidates = (
+        select(UserSearchGram.user_id)
+        .where(UserSearchGram.gram.in_(grams))
+        .group_by(UserSearchGram.user_id)
+        .having(func.count(UserSearchGram.gram) == len(grams))
+        .subquery()
+    )
+
+    fields = [func.lower(User.first_name), func.lower(User.last_name), func.lower(User.email)]
+    matches = [
+        or_(*[f.like(f"{'' if len(t) < 3 else '%'}{_escape_like(t)}%", escape="\\") for f in fields])
+        for t in tokens
+    ]
+    prefix = _escape_like(tokens[0]) + "%"
+    rank = case((or_(*[f.like(prefix, escape="\\") for f in fields]), 0), else_=1)
+
+    columns = [getattr(User, field) for field in USER_FIELDS]
+    return (
+        select(*columns)
+        .join(candidates, User.id == candidates.c.user_id)
+        .where(and_(*matches))
+        .order_by(rank, User.last_name, User.first_name, User.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+
+def search_users(params):
+    q = (params.get("q") or "").strip().lower()
+    if not q:
+        return response_formatter(None, "Query parameter q is required", False), 400
+    tokens = q.split()[:5]
+
+    limit, offset, message = _paging(params)
+    if message:
+        return response_formatter(None, message, False), 400
+
+    rows = db.session.execute(build_search_query(tokens, limit, offset)).all()
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    result = response_formatter([format_user(r) for r in rows], "Search results")
+    result["next_offset"] = next_offset
+    return result, 200
@@ -0,0 +1,165 @@
+import time
+from collections import Counter
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError
+
+from app.models.user import User, db
+from app.utils.role import role_registry
+from app.models.user_stats import UserStat
+from app.models.cache_version import CacheVersion
+from app.utils.helpers import response_formatter
+from app.utils.logger import logger
+
+
+# ----------------------------
+# DELTAS
+# ----------------------------
+def _day(value):
+    # DATE() comes back as a date on MySQL and as a string on SQLite
+    return str(value)[:10] if value else ""
+
+def user_deltas(status, role_id, created_at, count=1):
+    """Counter of (dimension, bucket) -> delta for `count` users with these values."""
+    return Counter({
+        ("status", status or ""): count,
+        ("role", role_id or ""): count,
+        ("signup_day", _day(created_at)): count,
+    })
+
+def change_deltas(old_status, old_role_id, new_status, new_role_id, count=1):
+    """Deltas for `count` users moving between status/role buckets (signup day never changes)."""
+    deltas = Counter()
+    if old_status != new_status:
+        deltas[("status", old_status or "")] -= count
+        deltas[("status", new_status or "")] += count
+    if old_role_id != new_role_id:
+        deltas[("role", old_role_id or "")] -= count
+        deltas[("role", new_role_id or "")] += count
+    return deltas
+
+def grouped_user_deltas(criteria, sign=-1):
+    """Deltas for every user matching criteria, computed with GROUP BY instead of loading rows."""
+    deltas = Counter()
+    day = func.date(User.created_at)
+    for status, role_id, created_on, count in db.session.execute(
+        select(User.status, User.role_id, day, func.count()).where(*criteria)
+        .group_by(User.status, User.role_id, day)
+    ):
+        for key, value in user_deltas(status, role_id, created_on, count).items():
+            deltas[key] += sign * value
+    return deltas
+
+def grouped_change_deltas(criteria, values):
+    """Deltas for an UPDATE setting `values` on every user matching criteria."""
+    deltas = Counter()
+    if "status" not in values and "role_id" not in values:
+        return deltas
+    for status, role_id, count in db.session.execute(
+        select(User.status, User.role_id, func.count()).where(*criteria)
+        .group_by(User.status, User.role_id)
+    ):
+        deltas.update(change_deltas(
+            status, role_id, values.get("status", status), values.get("role_id", role_id), count
+        ))
+    return deltas
+
+
+# ----------------------------
+# APPLY (inside the writer's transaction)
+# ----------------------------
+def apply_stat_deltas(deltas):
+    """Add deltas to the summary rows; creates missing buckets. Does not commit."""
+    for (dimension, bucket), delta in deltas.items():
+        if not delta:
+            continue
+        result = db.session.execute(
+            update(UserStat)
+            .where(UserStat.dimension == dimension, UserStat.bucket == bucket)
+            .values(count=UserStat.count + delta)
+        )
+        if result.rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(UserStat).values(dimension=dimension, bucket=bucket, count=delta))
+        except IntegrityError:
+            # Another writer created the bucket first
+            db.session.execute(
+                update(UserStat)
+                .where(UserStat.dimension == dimension, UserStat.bucket == bucket)
+                .values(count=UserStat.count + delta)
+            )
+
+
+# ----------------------------
+# REBUILD (drift correction)
+# ----------------------------
+REBUILD_GUARD = "user_stats_rebuild"
+
+def _claim_rebuild():
+    """Lock the guard row in cache_versions; returns when the last rebuild ran (epoch seconds, 0 if never)."""
+    query = select(CacheVersion.version).where(CacheVersion.name == REBUILD_GUARD).with_for_update()
+    last = db.session.execute(query).scalar()
+    if last is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(CacheVersion(name=REBUILD_GUARD, version=0))
+            last = 0
+        except IntegrityError:
+            # Another worker created it first: wait for its rebuild, then look again
+            last = db.session.execute(query).scalar()
+    return last
+
+def rebuild_user_stats(skip_if_rebuilt_within=None):
+    """
+    Recompute every bucket from the users table in one transaction.
+
+    The stats rows are locked before the users are read (on InnoDB the
+    locking read also blocks new buckets), so a writer's deltas either
+    committed before that read and are counted, or wait and land on top of
+    the rebuilt rows. The scheduler runs this in every worker: the guard row
+    serializes them, and the ones that find a rebuild less than
+    skip_if_rebuilt_within seconds old return None without doing it again.
+    """
+    # Start from a fresh transaction so the read below sees every commit so far
+    db.session.rollback()
+    now = int(time.time())
+    last = _claim_rebuild()
+    if skip_if_rebuilt_within is not None and now - last < skip_if_rebuilt_within:
+        db.session.rollback()
+        logger.info("User stats rebuild skipped: another worker just ran it")
+        return None
+
+    db.session.execute(select(UserStat.dimension).with_for_update()).all()
+    deltas = grouped_user_deltas([], sign=1)
+    db.session.execute(delete(UserStat))
+    rows = [{"dimension": d, "bucket": b, "count": c} for (d, b), c in deltas.items() if c]
+    if rows:
+        db.session.execute(insert(UserStat), rows)
+    db.session.execute(update(CacheVersion).where(CacheVersion.name == REBUILD_GUARD).values(version=now))
+    db.session.commit()
+    logger.info(f"User stats rebuilt: {len(rows)} buckets")
+    return len(rows)
+
+
+# ----------------------------
+# READ
+# ----------------------------
+def get_user_stats():
+    role_names = {role.id: role.role_name for role in role_registry.snapshot().roles}
+    stats = {"total": 0, "by_status": {}, "by_role": {}, "by_signup_day": {}}
+
+    for dimension, bucket, count in db.session.execute(
+        select(UserStat.dimension, UserStat.bucket, UserStat.count).where(UserStat.count != 0)
+    ):
+        if dimension == "status":
+            stats["by_status"][bucket or "none"] = count
+            stats["total"] += count
+        elif dimension == "role":
+            name = role_names.get(bucket, bucket) if bucket else "none"
+            stats["by_role"][name] = stats["by_role"].get(name, 0) + count
+        elif dimension == "signup_day":
+            stats["by_signup_day"][bucket or "unknown"] = count
+
+    stats["by_signup_day"] = dict(sorted(stats["by_signup_day"].items()))
+    return response_formatter(stats, "User statistics retrieved"), 200
@@ -0,0 +1,286 @@
+# app/services/upload_sessions.py
+import os
+import time
+import fcntl
+import uuid
+import hashlib
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, select, update
+from werkzeug.http import parse_content_range_header
+from app.db import db
+from app.models.upload_session import UploadSession, UploadChunk
+from app.services.file_upload import (
+    SHA256_HEX, UploadTooLarge, clean_filename, remove_quietly, staging_folder, store_file, used_bytes,
+)
+from app.utils.logger import logger
+
+
+def _expiry():
+    return datetime.utcnow() + timedelta(seconds=current_app.config["UPLOAD_SESSION_TTL_SECONDS"])
+
+
+def _preallocate(path, size):
+    """Reserve the whole file up front so chunks are positioned writes into existing space."""
+    fd = os.open(path, os.O_CREAT | os.O_WRONLY, 0o600)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)  # no fallocate (macOS, some filesystems): sparse file of the right size
+    finally:
+        os.close(fd)
+
+
+def received_ranges(session_id):
+    """Received chunks merged into sorted, non-overlapping [start, end) ranges."""
+    rows = db.session.execute(
+        select(UploadChunk.offset, UploadChunk.length)
+        .where(UploadChunk.session_id == session_id)
+        .order_by(UploadChunk.offset)
+    ).all()
+    ranges = []
+    for offset, length in rows:
+        end = offset + length
+        if ranges and offset <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], end)
+        else:
+            ranges.append([offset, end])
+    return ranges
+
+
+def session_to_dict(session):
+    ranges = received_ranges(session.id)
+    return {
+        "id": session.id,
+        "filename": session.filename,
+        "size": session.size,
+        # Bytes received contiguously from the start: where a sequential client resumes
+        "offset": ranges[0][1] if ranges and ranges[0][0] == 0 else 0,
+        "received": sum(end - start for start, end in ranges),
+        "ranges": ranges,
+        "status": session.status,
+        "expires_at": session.expires_at.isoformat(),
+    }
+
+
+def get_user_session(session_id, user_id):
+    session = db.session.get(UploadSession, session_id)
+    if not session or session.user_id != user_id:
+        return None
+    return session
+
+
+# ---------------- Create ----------------
+def create_upload_session(data, user_id):
+    filename, error = clean_filename(data.get("filename"))
+    if error:
+        return {"error": error}, 400
+
+    size = data.get("size")
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        return {"error": "size must be a positive integer"}, 400
+    sha256 = (data.get("sha256") or "").lower() or None
+    if sha256 and not SHA256_HEX.match(sha256):
+        return {"error": "sha256 must be 64 hex characters"}, 400
+
+    if used_bytes(user_id) + size > current_app.config["UPLOAD_USER_QUOTA_BYTES"]:
+        raise UploadTooLarge("Upload would exceed your storage quota")
+
+    session_id = str(uuid.uuid4())
+    session = UploadSession(
+        id=session_id,
+        user_id=user_id,
+        filename=filename,
+        content_type=data.get("content_type"),
+        size=size,
+        sha256=sha256,
+        description=data.get("description"),
+        path=os.path.join(staging_folder(), f"{session_id}.upload"),
+        expires_at=_expiry(),
+    )
+    _preallocate(session.path, size)
+    db.session.add(session)
+    db.session.commit()
+
+    logger.info(f"Upload session {session.id} opened for {filename} ({size} bytes)")
+    return {"message": "Upload session created", "data": session_to_dict(session)}, 201
+
+
+# ---------------- Chunks ----------------
+def write_chunk(session, content_range, content_length, stream):
+    """
+    Write one chunk at the offset given by its Content-Range ("bytes start-end/size")
+    with positioned writes, so chunks can arrive in parallel and in any order.
+    """
+    chunk_range = parse_content_range_header(content_range)
+    if chunk_range is None or chunk_range.units != "bytes":
+        return {"error": "Content-Range must be 'bytes <start>-<end>/<size>'"}, 400
+    if chunk_range.length not in (None, session.size) or chunk_range.stop > session.size:
+        return {"error": f"Chunk lies outside the {session.size}-byte upload"}, 416
+    if session.status != "open":
+        return {"error": "Upload is being finalized"}, 409
+
+    length = chunk_range.stop - chunk_range.start
+    if content_length is not None and content_length != length:
+        return {"error": "Content-Length does not match Content-Range"}, 400
+
+    session_id = session.id
+    try:
+        fd = os.open(session.path, os.O_WRONLY)
+    except FileNotFoundError:
+        return {"error": "Upload is being finalized"}, 409
+    try:
+        # A shared lock for as long as the file is open; finalize takes it
+        # exclusively before hashing. The kernel drops it if this worker dies.
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return {"error": "Upload is being finalized"}, 409
+        # Re-read the status under the lock: a finalize that claimed the session
+        # before it was taken must not get bytes written after its hash
+        db.session.rollback()
+        status = db.session.scalar(select(UploadSession.status).where(UploadSession.id == session_id))
+        db.session.rollback()  # don't hold the read transaction open while the body streams in
+        if status != "open":
+            return {"error": "Upload is being finalized"}, 409
+        return _receive_chunk(session_id, fd, chunk_range.start, length, stream)
+    finally:
+        os.close(fd)
+
+
+def _receive_chunk(session_id, fd, start, length, stream):
+    chunk_size = current_app.config["UPLOAD_CHUNK_SIZE"]
+    position, remaining = start, length
+    while remaining:
+        data = stream.read(min(chunk_size, remaining))
+        if not data:
+            break
+        os.pwrite(fd, data, position)
+        position += len(data)
+        remaining -= len(data)
+    if remaining:
+        return {"error": f"Chunk body ended {remaining} bytes short of its Content-Range"}, 400
+
+    db.session.execute(
+        update(UploadSession).where(UploadSession.id == session_id).values(expires_at=_expiry())
+    )
+    db.session.add(UploadChunk(session_id=session_id, offset=start, length=length))
+    db.session.commit()
+    return {"message": "Chunk stored", "data": session_to_dict(db.session.get(UploadSession, session_id))}, 200
+
+
+# ---------------- Finalize ----------------
+def finalize_upload_session(session, sha256=None):
+    """Check every byte arrived and matches the client's SHA-256, then store the file."""
+    expected = (sha256 or session.sha256 or "").lower()
+    if not SHA256_HEX.match(expected):
+        return {"error": "sha256 of the whole file is required"}, 400
+    if session.sha256 and expected != session.sha256:
+        return {"error": "sha256 differs from the one declared when the upload was created"}, 400
+
+    # Only one finalize runs per session; chunks that start from here on are refused
+    claimed = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == session.id, UploadSession.status == "open")
+        .values(status="finalizing")
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        return {"error": "Upload is already being finalized"}, 409
+
+    session_id, path = session.id, session.path
+    try:
+        return _finalize_claimed(session, expected)
+    except Exception:
+        _release_claim(session_id, path)
+        raise
+
+
+def _finalize_claimed(session, expected):
+    status = session_to_dict(session)
+    if status["received"] != session.size:
+        _release_claim(session.id, session.path)
+        return {"error": "Upload is incomplete", "data": session_to_dict(session)}, 409
+
+    with open(session.path, "rb+") as fh:
+        # Chunk writers hold a shared lock while their file descriptor is open
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            _release_claim(session.id, session.path)
+            return {"error": "Chunks are still being written; retry once they finish"}, 409
+
+        os.fsync(fh.fileno())
+        actual = hashlib.file_digest(fh, "sha256").hexdigest()
+        if actual != expected:
+            # No way to tell which chunk is bad: the client has to send the file again
+            db.session.execute(delete(UploadChunk).where(UploadChunk.session_id == session.id))
+            session.status = "open"
+            db.session.commit()
+            logger.warning(f"Upload session {session.id} failed checksum verification")
+            return {"error": "Checksum mismatch; upload the file again", "data": session_to_dict(session)}, 400
+
+        # Content that is already stored only takes a reference; the staged copy is dropped
+        fields = (session.filename, session.user_id, session.size, actual, session.content_type, session.description)
+        db.session.execute(delete(UploadChunk).where(UploadChunk.session_id == session.id))
+        db.session.delete(session)
+        record, _ = store_file(session.path, *fields)
+    return {"message": "File uploaded successfully", "data": record.to_dict()}, 200
+
+
+def _release_claim(session_id, path):
+    """Hand a claimed session back to its client, or drop it when a failed store already took its file."""
+    db.session.rollback()
+    if os.path.exists(path):
+        db.session.execute(update(UploadSession).where(UploadSession.id == session_id).values(status="open"))
+    else:
+        db.session.execute(delete(UploadChunk).where(UploadChunk.session_id == session_id))
+        db.session.execute(delete(UploadSession).where(UploadSession.id == session_id))
+    db.session.commit()
+
+
+def abort_upload_session(session):
+    path = session.path
+    db.session.execute(delete(UploadChunk).where(UploadChunk.session_id == session.id))
+    db.session.delete(session)
+    db.session.commit()
+    remove_quietly(path)
+    return {"message": "Upload session cancelled"}, 200
+
+
+# ---------------- Sweeper ----------------
+def sweep_upload_sessions(now=None):
+    """
+    Drop expired sessions with their files, plus staging files that no live
+    session owns and that have been idle for a full TTL (e.g. a worker died
+    mid-upload). Returns (sessions removed, bytes reclaimed).
+    """
+    now = now or datetime.utcnow()
+    expired = db.session.execute(
+        select(UploadSession.id, UploadSession.path).where(UploadSession.expires_at < now)
+    ).all()
+    ids = [session_id for session_id, _ in expired]
+    if ids:
+        db.session.execute(delete(UploadChunk).where(UploadChunk.session_id.in_(ids)))
+        db.session.execute(delete(UploadSession).where(UploadSession.id.in_(ids)))
+        db.session.commit()
+
+    reclaimed = 0
+    for _, path in expired:
+        if os.path.exists(path):
+            reclaimed += os.path.getsize(path)
+            remove_quietly(path)
+
+    live = set(db.session.scalars(select(UploadSession.path)))
+    db.session.rollback()
+    cutoff = time.time() - current_app.config["UPLOAD_SESSION_TTL_SECONDS"]
+    with os.scandir(staging_folder()) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.path not in live and entry.stat().st_mtime < cutoff:
+                reclaimed += entry.stat().st_size
+                remove_quietly(entry.path)
+
+    if ids or reclaimed:
+        logger.info(f"Swept {len(ids)} expired upload sessions, reclaimed {reclaimed} bytes")
+    return len(ids), reclaimed
@@ -1,11 +1,40 @@
 import re
+import io
+import csv
+import json
+import uuid
+from collections import Counter
 from datetime import datetime
-from werkzeug.security import generate_password_hash
-from sqlalchemy.exc import IntegrityError
+from flask import current_app
+from sqlalchemy import and_, or_, select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.models.user import User, db
-from app.utils.helpers import validate_user_data, format_user, response_formatter
+from app.extentions import user_cache
+from app.utils.helpers import (
+    validate_user_data,
+    format_user,
+    response_formatter,
+    parse_datetime,
+    encode_cursor,
+    decode_cursor,
+    parse_fields,
+    format_user_fields,
+    ALLOWED_STATUSES,
+    USER_FIELDS,
+)
 from app.utils.logger import logger
+from app.utils.passwords import hash_passwords, password_hasher
+from app.utils.etag import make_etag
+from app.services.search import index_users, reindex_user_ids, unindex_users, gram_rows
+from app.models.user_search import UserSearchGram
+from app.services.stats import (
+    apply_stat_deltas,
+    user_deltas,
+    change_deltas,
+    grouped_user_deltas,
+    grouped_change_deltas,
+)
 
 # ---------------- Create User ----------------
 def create_user(data):
@@ -22,7 +51,7 @@ def create_user(data):
         logger.warning(f"User creation failed: password not provided for email {data.get('email')}")
         return response_formatter(None, "Password is required", False), 400
 
-    hashed_password = generate_password_hash(raw_password)
+    hashed_password = password_hasher.hash(raw_password)
 
     new_user = User(
         first_name=data['first_name'],
@@ -40,6 +69,9 @@ def create_user(data):
 
     try:
         db.session.add(new_user)
+        db.session.flush()
+        index_users([new_user])
+        apply_stat_deltas(user_deltas(new_user.status, new_user.role_id, new_user.created_at))
         db.session.commit()
         logger.info(f"User created successfully: user_id {new_user.id}, email {new_user.email}")
     except IntegrityError as e:
@@ -51,21 +83,492 @@ def create_user(data):
 
     return response_formatter(format_user(new_user), "User created successfully"), 201
 
+# ---------------- Bulk Create Users ----------------
+def _item_result(index, ok, message, data=None):
+    return {"index": index, "status": ok, "message": message, "data": data}
+
+def _batch_gram_rows(batch):
+    return [g for _, row in batch
+            for g in gram_rows(row["id"], row["first_name"], row["last_name"], row["email"])]
+
+def _batch_stat_deltas(batch):
+    deltas = Counter()
+    for _, row in batch:
+        deltas.update(user_deltas(row["status"], row["role_id"], row["created_at"]))
+    return deltas
+
+def create_users_bulk(items):
+    """
+    Create many users at once. Emails are checked against the database in one
+    query, passwords are hashed across a process pool and rows are inserted in
+    multi-row batches. Returns a per-item result list; a failing item never
+    rolls back the others.
+    """
+    logger.info(f"Bulk creating {len(items)} users")
+    results = [None] * len(items)
+    candidates = []  # (index, data, date_of_birth)
+    batch_emails = set()
+
+    for index, data in enumerate(items):
+        if not isinstance(data, dict):
+            results[index] = _item_result(index, False, "Each item must be an object")
+            continue
+        is_valid, message = validate_user_data(data, check_unique=False)
+        if not is_valid:
+            results[index] = _item_result(index, False, message)
+            continue
+        for key in ("first_name", "last_name", "email"):
+            if not data.get(key):
+                message = f"{key} is required"
+                break
+        if message:
+            results[index] = _item_result(index, False, message)
+            continue
+
+        date_of_birth = data.get("date_of_birth")
+        if isinstance(date_of_birth, str):
+            try:
+                date_of_birth = datetime.strptime(date_of_birth, "%Y-%m-%d").date()
+            except ValueError:
+                results[index] = _item_result(index, False, "Invalid date_of_birth format. Use YYYY-MM-DD.")
+                continue
+
+        email = data["email"].lower()
+        if email in batch_emails:
+            results[index] = _item_result(index, False, "Duplicate email in request")
+            continue
+        batch_emails.add(email)
+        candidates.append((index, data, date_of_birth))
+
+    # One round trip for email uniqueness instead of one per item
+    if candidates:
+        existing = {
+            email.lower() for email in db.session.execute(
+                select(User.email).where(User.email.in_([data["email"] for _, data, _ in candidates]))
+            ).scalars()
+        }
+        for index, data, _ in candidates:
+            if data["email"].lower() in existing:
+                results[index] = _item_result(index, False, "Email already exists")
+        candidates = [c for c in candidates if results[c[0]] is None]
+
+    hashes = hash_passwords([data["password"] for _, data, _ in candidates])
+    now = datetime.utcnow()
+    rows = [
+        (index, {
+            "id": str(uuid.uuid4()),
+            "first_name": data["first_name"],
+            "middle_name": data.get("middle_name"),
+            "last_name": data["last_name"],
+            "salutation": data.get("salutation"),
+            "gender": data.get("gender"),
+            "date_of_birth": date_of_birth,
+            "email": data["email"],
+            "phone": data.get("phone"),
+            "role_id": data.get("role_id"),
+            "status": data.get("status", "Active"),
+            "password": password_hash,
+            "created_at": now,
+        })
+        for (index, data, date_of_birth), password_hash in zip(candidates, hashes)
+    ]
+
+    batch_size = current_app.config.get("BULK_INSERT_BATCH_SIZE", 100)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            db.session.execute(insert(User), [row for _, row in batch])
+            db.session.execute(insert(UserSearchGram), _batch_gram_rows(batch))
+            apply_stat_deltas(_batch_stat_deltas(batch))
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # Lost a race on a unique key or hit a bad value: retry this batch
+            # row by row so only the offending items fail
+            db.session.rollback()
+            logger.warning(f"Bulk insert batch failed, retrying row by row: {str(getattr(e, 'orig', e))}")
+            for index, row in batch:
+                try:
+                    db.session.execute(insert(User), [row])
+                    db.session.execute(insert(UserSearchGram), _batch_gram_rows([(index, row)]))
+                    apply_stat_deltas(_batch_stat_deltas([(index, row)]))
+                    db.session.commit()
+                except SQLAlchemyError as row_error:
+                    db.session.rollback()
+                    results[index] = _item_result(index, False,
+                                                  f"Database error: {str(getattr(row_error, 'orig', row_error))}")
+        for index, row in batch:
+            if results[index] is None:
+                results[index] = _item_result(index, True, "User created successfully",
+                                              {"id": row["id"], "email": row["email"]})
+
+    created = sum(1 for r in results if r["status"])
+    logger.info(f"Bulk create finished: {created}/{len(items)} users created")
+    return results, created
+
+# ---------------- Bulk Update / Delete Users ----------------
+BULK_UPDATABLE_FIELDS = ["first_name", "middle_name", "last_name", "salutation", "gender", "status"]
+
+def resolve_bulk_target(body):
+    """
+    A bulk target is either {"ids": [...]} or {"filter": {...list filters...}}.
+    Returns (ids, criteria, error_message); exactly one of ids/criteria is set.
+    """
+    ids, filters = body.get("ids"), body.get("filter")
+    if (ids is None) == (filters is None):
+        return None, None, "Provide either 'ids' or 'filter'"
+
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+            return None, None, "'ids' must be a non-empty list of user ids"
+        return list(dict.fromkeys(ids)), None, ""
+
+    if not isinstance(filters, dict):
+        return None, None, "'filter' must be an object"
+    criteria, message = parse_user_filters(filters)
+    if message:
+        return None, None, message
+    if not criteria:
+        return None, None, "'filter' must contain at least one condition"
+    return None, criteria, ""
+
+def build_target_id_query(criteria, last_id, chunk_size):
+    """Next chunk of ids matching a bulk filter, after last_id in primary-key order."""
+    return select(User.id).where(*criteria, User.id > last_id).order_by(User.id).limit(chunk_size)
+
+def iter_target_id_chunks(ids, criteria):
+    """Yield id chunks of BULK_CHUNK_SIZE, walking filter matches in primary-key order."""
+    chunk_size = current_app.config.get("BULK_CHUNK_SIZE", 1000)
+    if ids is not None:
+        for start in range(0, len(ids), chunk_size):
+            yield ids[start:start + chunk_size]
+        return
+
+    last_id = ""
+    while True:
+        chunk = db.session.execute(build_target_id_query(criteria, last_id, chunk_size)).scalars().all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+def build_bulk_update_values(data, current_user_role="user"):
+    """Same validation and role_id rule as update_user. Returns (values, error_message)"""
+    if "password" in data:
+        return None, "Password cannot be updated here. Use /forgot-password or /reset-password."
+
+    is_valid, message = validate_user_data(data, update=True)
+    if not is_valid:
+        return None, message
+
+    values = {key: data[key] for key in BULK_UPDATABLE_FIELDS if key in data and data[key] is not None}
+
+    if "role_id" in data:
+        if current_user_role.lower() != "admin":
+            return None, "You cannot update role_id."
+        values["role_id"] = data["role_id"]
+
+    if "date_of_birth" in data and data["date_of_birth"]:
+        try:
+            values["date_of_birth"] = datetime.strptime(data["date_of_birth"], "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None, "Invalid date_of_birth format. Use YYYY-MM-DD."
+
+    if not values:
+        return None, f"No updatable fields. Allowed: {BULK_UPDATABLE_FIELDS + ['role_id', 'date_of_birth']}"
+    return values, ""
+
+def update_users_bulk(body, current_user_role="user"):
+    """Set-based update: one UPDATE ... WHERE per id chunk, committed per chunk."""
+    ids, criteria, message = resolve_bulk_target(body)
+    if message:
+        return response_formatter(None, message, False), 400
+
+    values, message = build_bulk_update_values(body.get("data") or {}, current_user_role)
+    if message:
+        return response_formatter(None, message, False), 400
+
+    affected = 0
+    try:
+        for chunk in iter_target_id_chunks(ids, criteria):
+            apply_stat_deltas(grouped_change_deltas([User.id.in_(chunk), *(criteria or [])], values))
+            result = db.session.execute(
+                update(User)
+                .where(User.id.in_(chunk), *(criteria or []))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if "first_name" in values or "last_name" in values:
+                reindex_user_ids(chunk)
+            db.session.commit()
+            user_cache.invalidate(*chunk)
+            affected += result.rowcount
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Bulk update failed after {affected} rows: {str(e)}")
+        return response_formatter({"affected": affected}, f"Database error: {str(e)}", False), 500
+
+    logger.info(f"Bulk updated {affected} users with fields {list(values)}")
+    return response_formatter({"affected": affected}, f"{affected} users updated"), 200
+
+def delete_users_bulk(body):
+    """Set-based delete: one DELETE ... WHERE per id chunk, committed per chunk."""
+    ids, criteria, message = resolve_bulk_target(body)
+    if message:
+        return response_formatter(None, message, False), 400
+
+    affected = 0
+    try:
+        for chunk in iter_target_id_chunks(ids, criteria):
+            apply_stat_deltas(grouped_user_deltas([User.id.in_(chunk), *(criteria or [])]))
+            db.session.execute(
+                delete(UserSearchGram).where(UserSearchGram.user_id.in_(
+                    select(User.id).where(User.id.in_(chunk), *(criteria or []))
+                ))
+            )
+            result = db.session.execute(
+                delete(User)
+                .where(User.id.in_(chunk), *(criteria or []))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            user_cache.invalidate(*chunk)
+            affected += result.rowcount
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Bulk delete failed after {affected} rows: {str(e)}")
+        return response_formatter({"affected": affected}, f"Database error: {str(e)}", False), 500
+
+    logger.info(f"Bulk deleted {affected} users")
+    return response_formatter({"affected": affected}, f"{affected} users deleted"), 200
+
 # ---------------- Get All Users ----------------
-def get_all_users():
-    logger.info("Fetching all users")
-    users = User.query.all()
-    serialized_users = [format_user(u) for u in users]
-    return response_formatter(serialized_users, "All users retrieved")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def parse_user_filters(params):
+    """
+    Translate list filters (status, role_id, last_login_after, last_login_before)
+    into SQL criteria. Returns (criteria: list, error_message: str)
+    """
+    criteria = []
+
+    status = params.get("status")
+    if status:
+        if status not in ALLOWED_STATUSES:
+            return None, f"Invalid status. Allowed: {ALLOWED_STATUSES}"
+        criteria.append(User.status == status)
+
+    role_id = params.get("role_id")
+    if role_id:
+        criteria.append(User.role_id == role_id)
+
+    for key in ("last_login_after", "last_login_before"):
+        value = params.get(key)
+        if not value:
+            continue
+        moment = parse_datetime(value)
+        if moment is None:
+            return None, f"Invalid {key}. Use YYYY-MM-DD or an ISO-8601 datetime."
+        if key == "last_login_after":
+            criteria.append(User.last_login >= moment)
+        else:
+            criteria.append(User.last_login < moment)
+
+    return criteria, ""
+
+def parse_page_size(value):
+    """Returns (limit: int, error_message: str)"""
+    if value in (None, ""):
+        return DEFAULT_PAGE_SIZE, ""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return None, "limit must be an integer"
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return None, f"limit must be between 1 and {MAX_PAGE_SIZE}"
+    return limit, ""
+
+def build_user_page_query(criteria, position=None, limit=DEFAULT_PAGE_SIZE, columns=None):
+    """
+    Keyset page over (created_at, id). `position` is the (created_at, id)
+    of the last row already returned; one extra row is fetched to detect a next page.
+    With `columns`, selects only those columns (plus the cursor keys and the row
+    version) instead of User entities.
+    """
+    if columns:
+        query = select(
+            *columns,
+            User.created_at.label("cursor_created_at"),
+            User.id.label("cursor_id"),
+            User.updated_at.label("row_updated_at"),
+        )
+    else:
+        query = select(User)
+    query = query.where(*criteria)
+    if position:
+        created_at, last_id = position
+        query = query.where(or_(
+            User.created_at > created_at,
+            and_(User.created_at == created_at, User.id > last_id),
+        ))
+    return query.order_by(User.created_at, User.id).limit(limit + 1)
+
+def users_page_etag(params, versions, next_cursor):
+    """
+    ETag of one page from what was fetched for it anyway: the (id, updated_at)
+    of its rows, the next cursor and the query params. No aggregate over the
+    filtered set, so it costs nothing beyond the page itself.
+    """
+    rows = ",".join(f"{user_id}@{_version(updated_at)}" for user_id, updated_at in versions)
+    return make_etag("users", rows, next_cursor or "", sorted(params.items()))
+
+def fetch_users_page(params):
+    """
+    Run the keyset page query for `params`. Returns ({"rows", "fields",
+    "next_cursor", "etag"}, None) or (None, error message). Rows are not
+    serialized yet, so a 304 on the ETag skips that work.
+    """
+    logger.info(f"Fetching users page: {dict(params)}")
+
+    limit, message = parse_page_size(params.get("limit"))
+    if message:
+        return None, message
+
+    criteria, message = parse_user_filters(params)
+    if message:
+        return None, message
+
+    fields, message = parse_fields(params.get("fields"))
+    if message:
+        return None, message
+
+    position = None
+    if params.get("cursor"):
+        position = decode_cursor(params["cursor"])
+        if not position:
+            return None, "Invalid cursor"
+
+    next_cursor = None
+    if fields:
+        # Column-only SELECT: plain rows, no ORM identity map or object construction
+        columns = [getattr(User, field) for field in fields]
+        rows = db.session.execute(build_user_page_query(criteria, position, limit, columns)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].cursor_created_at, rows[-1].cursor_id)
+        versions = [(row.cursor_id, row.row_updated_at) for row in rows]
+    else:
+        rows = db.session.execute(build_user_page_query(criteria, position, limit)).scalars().all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        versions = [(user.id, user.updated_at) for user in rows]
+
+    page = {
+        "rows": rows,
+        "fields": fields,
+        "next_cursor": next_cursor,
+        "etag": users_page_etag(params, versions, next_cursor),
+    }
+    return page, None
+
+def users_page_response(page):
+    if page["fields"]:
+        users = [format_user_fields(row, page["fields"]) for row in page["rows"]]
+    else:
+        users = [format_user(u) for u in page["rows"]]
+    result = response_formatter(users, "Users retrieved")
+    result["next_cursor"] = page["next_cursor"]
+    return result
+
+def get_all_users(params=None):
+    page, message = fetch_users_page(params or {})
+    if message:
+        return response_formatter(None, message, False), 400
+    return users_page_response(page), 200
+
+# ---------------- Export Users ----------------
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_BATCH_SIZE = 1000
+
+def export_users(criteria, fmt="ndjson"):
+    """
+    Generator yielding the users matching `criteria` as NDJSON or CSV text chunks.
+    Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE, so memory
+    stays bounded regardless of table size.
+    """
+    columns = [getattr(User, field) for field in USER_FIELDS]
+    query = (
+        select(*columns)
+        .where(*criteria)
+        .order_by(User.created_at, User.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(USER_FIELDS)
+
+    exported = 0
+    for batch in db.session.execute(query).partitions():
+        for row in batch:
+            user = format_user(row)
+            if fmt == "csv":
+                writer.writerow([user[field] for field in USER_FIELDS])
+            else:
+                buffer.write(json.dumps(user))
+                buffer.write("\n")
+        exported += len(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if fmt == "csv" and not exported:
+        yield buffer.getvalue()
+    logger.info(f"Exported {exported} users as {fmt}")
 
 # ---------------- Get User By ID ----------------
-def get_user_by_id(user_id):
+def _version(updated_at):
+    return updated_at.isoformat() if updated_at else ""
+
+def load_user_profile(user_id):
+    """
+    Cache entry for a user: {"version": updated_at, "profile": serialized user},
+    straight from a column-only SELECT, or None if missing.
+    """
+    columns = [getattr(User, field) for field in USER_FIELDS]
+    row = db.session.execute(select(*columns, User.updated_at).where(User.id == user_id)).first()
+    if not row:
+        return None
+    return {"version": _version(row.updated_at), "profile": format_user(row)}
+
+def get_user_etag(user_id, fields=None):
+    """ETag of a user's current row version; read from the cache or a single-column PK lookup."""
+    entry = user_cache.peek(user_id)
+    if entry:
+        version = entry["version"]
+    else:
+        row = db.session.execute(select(User.updated_at).where(User.id == user_id)).first()
+        if not row:
+            return None
+        version = _version(row.updated_at)
+    return make_etag("user", user_id, version, fields or "")
+
+def get_user_by_id(user_id, fields=None):
     logger.info(f"Fetching user by id: {user_id}")
-    user = User.query.get(user_id)
-    if not user:
+    fields, message = parse_fields(fields)
+    if message:
+        return response_formatter(None, message, False), 400
+
+    entry = user_cache.get_or_load(user_id, lambda: load_user_profile(user_id))
+    if not entry:
         logger.warning(f"User not found: user_id {user_id}")
         return response_formatter(None, "User not found", False), 404
-    return response_formatter(format_user(user), "User retrieved successfully")
+
+    profile = entry["profile"]
+    data = {field: profile[field] for field in fields} if fields else profile
+    return response_formatter(data, "User retrieved successfully"), 200
 
 # ---------------- Update User ----------------
 def update_user(user_id, data, current_user_role="user"):
@@ -79,6 +582,8 @@ def update_user(user_id, data, current_user_role="user"):
     if not is_valid:
         return response_formatter(None, message, False), 400
 
+    old_status, old_role_id = user.status, user.role_id
+
     # Update allowed fields for all
     for key in ["first_name", "middle_name", "last_name", "salutation", "gender", "status"]:
         if key in data and data[key] is not None:
@@ -99,11 +604,15 @@ def update_user(user_id, data, current_user_role="user"):
             return response_formatter(None, "Invalid date_of_birth format. Use YYYY-MM-DD.", False), 400
 
     try:
+        if "first_name" in data or "last_name" in data:
+            index_users([user])
+        apply_stat_deltas(change_deltas(old_status, old_role_id, user.status, user.role_id))
         db.session.commit()
         db.session.refresh(user)
     except Exception as e:
         db.session.rollback()
         return response_formatter(None, f"Database error: {str(e)}", False), 500
+    user_cache.invalidate(user_id)
 
     return response_formatter(format_user(user), "User updated successfully"), 200
 
@@ -114,7 +623,10 @@ def delete_user(user_id):
     if not user:
         logger.warning(f"Delete failed: user not found {user_id}")
         return response_formatter(None, "User not found", False), 404
+    unindex_users([user_id])
+    apply_stat_deltas(user_deltas(user.status, user.role_id, user.created_at, count=-1))
     db.session.delete(user)
     db.session.commit()
+    user_cache.invalidate(user_id)
     logger.info(f"User deleted successfully: user_id {user_id}")
-    return response_formatter(None, "User deleted successfully")
+    return response_formatter(None, "User deleted successfully"), 200
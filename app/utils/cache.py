@@ -0,0 +1,261 @@
+# app/utils/cache.py
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """In-process backend: size-bounded LRU where every entry also expires after a TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._loading = {}  # key -> token of the newest load not yet invalidated
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def begin_load(self, key):
+        """Token for a read-through load of key; see finish_load."""
+        with self._lock:
+            self._tokens += 1
+            self._loading[key] = self._tokens
+            return self._tokens
+
+    def finish_load(self, key, token, value):
+        """Store a loaded value unless key was invalidated (or reloaded) since begin_load."""
+        with self._lock:
+            if self._loading.get(key) != token:
+                return False
+            del self._loading[key]
+        if value is not None:
+            self.set(key, value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._loading.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._loading.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """
+    Shared backend on any Redis-compatible client exposing get/set(ex=)/delete
+    and register_script. Size bounding is left to the server's
+    maxmemory-policy (e.g. allkeys-lru). Every delete bumps a per-key
+    generation, and a read-through load only stores its value if the
+    generation it started from is still current, so a load that read the old
+    row cannot overwrite an invalidation made by another worker.
+    """
+
+    name = "redis"
+
+    SET_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+    INVALIDATE = """
+for i = 1, #KEYS, 2 do
+    redis.call('DEL', KEYS[i])
+    redis.call('INCR', KEYS[i + 1])
+    redis.call('EXPIRE', KEYS[i + 1], ARGV[1])
+end
+return 1
+"""
+
+    def __init__(self, client, prefix="cache:", ttl=300, generation_ttl=3600):
+        self.client = client
+        self.prefix = prefix
+        # Outside prefix* so generations never show up in clear() or len()
+        self.generation_prefix = prefix.rstrip(":") + "-gen:"
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl  # must outlive any single load
+        self.evictions = 0
+        self._set_if_current = client.register_script(self.SET_IF_CURRENT)
+        self._invalidate = client.register_script(self.INVALIDATE)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl if ttl is not None else self.ttl)
+
+    def begin_load(self, key):
+        return self.client.get(self.generation_prefix + key) or "0"
+
+    def finish_load(self, key, token, value):
+        if value is None:
+            return True
+        stored = self._set_if_current(
+            keys=[self.prefix + key, self.generation_prefix + key],
+            args=[token, json.dumps(value), self.ttl],
+        )
+        return bool(int(stored))
+
+    def delete(self, *keys):
+        if keys:
+            pairs = [k for key in keys for k in (self.prefix + key, self.generation_prefix + key)]
+            self._invalidate(keys=pairs, args=[self.generation_ttl])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*"))
+
+
+class ProfileCache:
+    """Read-through cache of serialized user profiles with hit/miss counters."""
+
+    def __init__(self, prefix="user:"):
+        self.prefix = prefix
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        backend = app.config.get("USER_CACHE_BACKEND", "memory")
+        ttl = app.config.get("USER_CACHE_TTL_SECONDS", 60)
+        if backend == "redis":
+            from app.extentions import redis_client
+            self.use_backend(RedisCache(redis_client(app), prefix=self.prefix, ttl=ttl))
+        elif backend == "memory":
+            self.use_backend(LRUCache(app.config.get("USER_CACHE_MAX_ENTRIES", 10000), ttl))
+        else:
+            self.use_backend(None)
+
+    def use_backend(self, backend):
+        self.backend = backend
+        self.hits = self.misses = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for key, or call loader() and cache a non-None
+        result unless the key was invalidated while it was loading.
+        """
+        if self.backend is None:
+            return loader()
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        token = self.backend.begin_load(key)
+        value = None
+        try:
+            value = loader()
+        finally:
+            self.backend.finish_load(key, token, value)
+        return value
+
+    def peek(self, key):
+        """Cached value or None, without loading or touching the hit/miss counters."""
+        return self.backend.get(key) if self.backend is not None else None
+
+    def invalidate(self, *keys):
+        if self.backend is not None and keys:
+            self.backend.delete(*keys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else None,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions if self.backend is not None else 0,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class TokenCache:
+    """
+    Verified JWT payloads keyed by a digest of the token, so a token sent on
+    every request is only signature-checked once per worker. Entries expire at
+    the token's own exp; revocation is still checked by the caller on each hit.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        max_entries = app.config.get("TOKEN_CACHE_MAX_ENTRIES", 10000)
+        self.backend = LRUCache(max_entries, ttl=0) if max_entries > 0 else None
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        if self.backend is None:
+            return None
+        payload = self.backend.get(self.key(token))
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    def put(self, token, payload):
+        ttl = payload.get("exp", 0) - time.time()
+        if self.backend is not None and ttl > 0:
+            self.backend.set(self.key(token), payload, ttl=ttl)
+
+    def discard(self, token):
+        if self.backend is not None:
+            self.backend.delete(self.key(token))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions if self.backend is not None else 0,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
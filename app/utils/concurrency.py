@@ -0,0 +1,140 @@
+# app/utils/concurrency.py
+import time
+import threading
+from functools import wraps
+
+
+class Overloaded(Exception):
+    """A concurrency pool and its wait queue are full; answered with 503 + Retry-After."""
+
+    def __init__(self, pool, retry_after):
+        super().__init__(f"Concurrency limit reached for {pool}")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class ConcurrencyPool:
+    """
+    At most `limit` requests run at once; up to `queue` more wait for at most
+    `timeout` seconds; anything beyond that is shed immediately. Counters are
+    kept for tuning (see /metrics/concurrency).
+    """
+
+    def __init__(self, name, limit, queue=0, timeout=1.0, retry_after=1):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            if self.in_flight >= self.limit:
+                if self.waiting >= self.queue:
+                    self.rejected += 1
+                    raise Overloaded(self.name, self.retry_after)
+                self.queued += 1
+                self.waiting += 1
+                self.peak_waiting = max(self.peak_waiting, self.waiting)
+                deadline = time.monotonic() + self.timeout
+                try:
+                    while self.in_flight >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timed_out += 1
+                            raise Overloaded(self.name, self.retry_after)
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "timeout_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "peak_waiting": self.peak_waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class ConcurrencyLimits:
+    """
+    Named pools, sized from CONCURRENCY_LIMITS; a name missing from config gets
+    the defaults passed where it is used. Pools are per worker process, so they
+    bound how many of a worker's threads one kind of request can occupy and
+    leave the rest free for cheap requests.
+    """
+
+    def __init__(self):
+        self.config = {}
+        self.pools = {}
+        self.retry_after = 1
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.config = app.config.get("CONCURRENCY_LIMITS") or {}
+        self.retry_after = app.config.get("CONCURRENCY_RETRY_AFTER", 1)
+        self.pools = {}
+        for name in self.config:
+            self.pool(name)  # configured pools show up in the metrics before first use
+
+    def pool(self, name, limit=4, queue=8, timeout=1.0):
+        pool = self.pools.get(name)
+        if pool is None:
+            with self._lock:
+                pool = self.pools.get(name)
+                if pool is None:
+                    spec = self.config.get(name, {})
+                    pool = ConcurrencyPool(
+                        name,
+                        spec.get("limit", limit),
+                        spec.get("queue", queue),
+                        spec.get("timeout_seconds", timeout),
+                        spec.get("retry_after", self.retry_after),
+                    )
+                    self.pools[name] = pool
+        return pool
+
+    def stats(self):
+        return {name: pool.stats() for name, pool in sorted(self.pools.items())}
+
+
+concurrency_limits = ConcurrencyLimits()
+
+
+def concurrency_limit(name, limit=4, queue=8, timeout=1.0):
+    """Run the view inside the named pool; place it below @token_required / @rate_limit."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            pool = concurrency_limits.pool(name, limit, queue, timeout)
+            pool.acquire()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                pool.release()
+        return wrapper
+    return decorator
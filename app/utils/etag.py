@@ -0,0 +1,20 @@
+# app/utils/etag.py
+import hashlib
+from flask import request, Response
+
+
+def make_etag(*parts):
+    """Strong ETag from version parts (ids, timestamps, counts, query params)."""
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def not_modified(etag):
+    """
+    Return a 304 response when the request's If-None-Match matches etag, else None.
+    Call before building the payload so a match skips serialization entirely.
+    """
+    if etag and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
@@ -1,6 +1,8 @@
 # app/utils/helper.py
 import re
-from flask import current_app
+import json
+import base64
+from datetime import datetime, timezone
 from app.models.user import User, db
 from app.models.role import Role
 
@@ -11,6 +13,8 @@ ALLOWED_STATUSES = [
     'KYC Pending', 'Under Review', 'Terminated'
 ]
 
+LENGTH_CHECKED_FIELDS = ['first_name', 'middle_name', 'last_name', 'email', 'phone', 'role_id']
+
 def is_valid_email(email):
     pattern = r'^[A-Za-z0-9]+([._-]?[A-Za-z0-9]+)*@[A-Za-z0-9-]+(\.[A-Za-z]{2,6})+$'
     return re.match(pattern, email) is not None
@@ -40,11 +44,23 @@ def is_valid_password(password):
         return False, "Password must contain at least one special character"
     return True, ""
 
-def validate_user_data(data, update=False):
+def validate_user_data(data, update=False, check_unique=True):
     """
     Validates user data before creating or updating.
+    check_unique=False skips the per-row email lookup (bulk callers check in one query).
     Returns (is_valid: bool, error_message: str)
     """
+    # Free-text columns must fit before they reach the database
+    for field in LENGTH_CHECKED_FIELDS:
+        value = data.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            return False, f"{field} must be a string"
+        limit = User.__table__.c[field].type.length
+        if len(value) > limit:
+            return False, f"{field} must be at most {limit} characters"
+
     # Salutation
     if 'salutation' in data and data['salutation'] not in ALLOWED_SALUTATIONS:
         return False, f"Invalid salutation. Allowed: {ALLOWED_SALUTATIONS}"
@@ -61,7 +77,7 @@ def validate_user_data(data, update=False):
     if 'email' in data:
         if not is_valid_email(data['email']):
             return False, "Invalid email format"
-        if not update and User.query.filter_by(email=data['email']).first():
+        if not update and check_unique and User.query.filter_by(email=data['email']).first():
             return False, "Email already exists"
     
     # Phone
@@ -85,6 +101,12 @@ def validate_user_data(data, update=False):
 
     return True, ""
 
+# Public user columns, in the order format_user emits them
+USER_FIELDS = [
+    "id", "first_name", "middle_name", "last_name", "salutation", "gender",
+    "date_of_birth", "email", "phone", "role_id", "status"
+]
+
 def format_user(user):
     """
     Converts SQLAlchemy model object to dict and formats date fields,
@@ -105,6 +127,59 @@ def format_user(user):
     }
     return data
 
+def parse_datetime(value):
+    """
+    Parse 'YYYY-MM-DD' or an ISO-8601 datetime string.
+    Returns a naive UTC datetime, or None if the value is not a valid date.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def encode_cursor(created_at, user_id):
+    """Opaque keyset cursor for the (created_at, id) position of the last row of a page."""
+    raw = json.dumps([created_at.isoformat() if created_at else None, user_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    Reverse of encode_cursor.
+    Returns (created_at, user_id) or None if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(user_id, str):
+        return None
+    return created_at, user_id
+
+def parse_fields(value):
+    """
+    Parse a sparse fieldset such as 'id,email,status'.
+    Returns (fields: list | None, error_message: str); None means all fields.
+    """
+    if not value:
+        return None, ""
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in USER_FIELDS]
+    if unknown or not fields:
+        return None, f"Invalid fields {unknown}. Allowed: {USER_FIELDS}"
+    return list(dict.fromkeys(fields)), ""
+
+def format_user_fields(row, fields):
+    """Like format_user, but only for the requested fields of a column-only row."""
+    data = {field: getattr(row, field) for field in fields}
+    if data.get("date_of_birth"):
+        data["date_of_birth"] = data["date_of_birth"].strftime('%Y-%m-%d')
+    return data
+
 def response_formatter(data=None, message="", status=True):
     """
     Standardized API response structure.
@@ -117,13 +192,23 @@ def response_formatter(data=None, message="", status=True):
 
 # ----------------- Helper -----------------
 def rate_limit(limit: str):
-    """Fetch current limiter at runtime"""
+    """
+    Mark a view as rate limited. `limit` is parsed once, here, and is the route's
+    default; a ROUTE_LIMITS entry for the same path/method overrides it (see
+    app.utils.route_limits). Place it below @token_required so limits are per user.
+    """
+    from functools import wraps
+    from limits import parse_many
+    from app.utils.route_limits import route_limiter
+
+    default_limits = tuple(parse_many(limit))
+
     def decorator(f):
-        from functools import wraps
         @wraps(f)
         def wrapper(*args, **kwargs):
-            limiter = current_app.limiter  # access limiter inside app context
-            return limiter.limit(limit)(f)(*args, **kwargs)
+            route_limiter.check()
+            return f(*args, **kwargs)
+        wrapper.default_limits = default_limits
         return wrapper
     return decorator
 
@@ -1,14 +1,23 @@
 import jwt
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from flask import current_app, request
+from app.extentions import token_revocations, token_cache
 
 # JWT settings
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRES_MINUTES = 15
 REFRESH_TOKEN_EXPIRES_DAYS = 7
+RESET_TOKEN_EXPIRES_MINUTES = 60
 
-# ✅ In-memory blacklist for invalidated tokens
-TOKEN_BLACKLIST = set()
+def new_jti():
+    """Compact unique token id; revocation is keyed on this, not on the token string."""
+    return secrets.token_urlsafe(12)
+
+def token_id(payload: dict, token: str):
+    # Tokens issued before jti existed are identified by a digest of the token itself
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()[:32]
 
 def create_access_token(identity: dict):
     now = datetime.utcnow()
@@ -17,6 +26,7 @@ def create_access_token(identity: dict):
         "nbf": now,
         "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRES_MINUTES),
         "type": "access",
+        "jti": new_jti(),
         "sub": identity["user_id"],
         "data": identity
     }
@@ -30,45 +40,72 @@ def create_refresh_token(identity: dict):
         "nbf": now,
         "exp": now + timedelta(days=REFRESH_TOKEN_EXPIRES_DAYS),
         "type": "refresh",
+        "jti": new_jti(),
         "sub": identity["user_id"]
     }
     token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm=ALGORITHM)
     return token
 
 def decode_token(token: str):
-    # ✅ Check blacklist before decoding
-    if token in TOKEN_BLACKLIST:
-        return False, "Token invalidated. Please log in again."
+    # Signature/claims are verified once per worker; repeats of the same token hit the cache
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            return False, "Token expired"
+        except jwt.InvalidTokenError as e:
+            return False, f"Invalid token: {str(e)}"
+        token_cache.put(token, payload)
 
-    try:
-        payload = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=[ALGORITHM])
-        return True, payload
-    except jwt.ExpiredSignatureError:
-        return False, "Token expired"
-    except jwt.InvalidTokenError as e:
-        return False, f"Invalid token: {str(e)}"
+    # ✅ Revocation check on the token id (shared by all workers)
+    if token_revocations.is_revoked(token_id(payload, token)):
+        token_cache.discard(token)
+        return False, "Token invalidated. Please log in again."
+    return True, payload
 
-def create_reset_token(user_id: str, expires_in_minutes: int = 15):
+def create_reset_token(user_id: str, expires_in_minutes: int = RESET_TOKEN_EXPIRES_MINUTES):
+    """Signed, self-expiring password-reset token; nothing is stored until it is used."""
+    now = datetime.utcnow()
     payload = {
         "sub": user_id,
         "type": "reset",
-        "exp": datetime.utcnow() + timedelta(minutes=expires_in_minutes),
-        "iat": datetime.utcnow()
+        "jti": new_jti(),
+        "exp": now + timedelta(minutes=expires_in_minutes),
+        "iat": now
     }
-    token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
+    token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm=ALGORITHM)
     return token
 
 def decode_reset_token(token: str):
     try:
-        payload = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
-        if payload.get("type") != "reset":
-            return False, "Invalid token type"
-        return True, payload
+        payload = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         return False, "Token expired"
     except jwt.InvalidTokenError:
         return False, "Invalid token"
+    if payload.get("type") != "reset" or not payload.get("jti"):
+        return False, "Invalid token type"
+    # Whether it was used is settled by consume_reset_token: a released claim
+    # may linger in other workers' revocation mirrors
+    return True, payload
+
+def consume_reset_token(payload: dict):
+    """Mark a decoded reset token used (until its exp); False if another request got there first."""
+    return token_revocations.claim(payload["jti"], payload["exp"])
+
+def release_reset_token(payload: dict):
+    """Make a consumed reset token usable again after the reset it guarded failed."""
+    token_revocations.release(payload["jti"])
 
 # ✅ Function to invalidate current token on logout
 def invalidate_token(token: str):
-    TOKEN_BLACKLIST.add(token)
+    """Revoke a token until its own exp; tokens that fail signature checks are ignored."""
+    try:
+        payload = jwt.decode(
+            token, current_app.config["SECRET_KEY"], algorithms=[ALGORITHM], options={"verify_exp": False}
+        )
+    except jwt.InvalidTokenError:
+        return
+    token_revocations.revoke(token_id(payload, token), payload["exp"])
+    token_cache.discard(token)
@@ -0,0 +1,108 @@
+# app/utils/login_activity.py
+import os
+import atexit
+import threading
+from contextlib import nullcontext
+from flask import has_app_context
+from sqlalchemy import update
+from app.utils.logger import logger
+
+MAX_FLUSH_ATTEMPTS = 5
+
+
+class LoginActivityWriter:
+    """
+    Takes last_login (and upgraded password hash) writes off the login response
+    path. Pending writes are coalesced per user and flushed by a background thread
+    every LAST_LOGIN_FLUSH_SECONDS as one executemany UPDATE; 0 writes inline.
+    A flush that fails is retried on the next one, up to MAX_FLUSH_ATTEMPTS.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 1.0
+        self.flushed = 0
+        self._pending = {}  # user_id -> {"last_login": ..., "rehash": (verified hash, new hash)}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("LAST_LOGIN_FLUSH_SECONDS", 1.0)
+        atexit.register(self.flush)
+
+    def record(self, user_id, last_login, password=None, replaces=None):
+        """`password` is an upgraded hash for the login that verified against `replaces`."""
+        with self._lock:
+            entry = self._pending.setdefault(user_id, {})
+            entry["last_login"] = last_login
+            if password is not None:
+                entry["rehash"] = (replaces, password)
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        # One flusher per worker process; a thread does not survive fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="login-activity", daemon=True).start()
+
+    def _run(self):
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        """Write all pending activity now; returns the number of users updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self.app is None:
+            return 0
+
+        from app.db import db
+        from app.models.user import User
+        from app.extentions import user_cache
+
+        logins = [{"id": user_id, "last_login": values["last_login"]} for user_id, values in pending.items()]
+        rehashes = [(user_id, *values["rehash"]) for user_id, values in pending.items() if "rehash" in values]
+
+        # Inline flushes reuse the request's session; the flusher thread gets its own context
+        with nullcontext() if has_app_context() else self.app.app_context():
+            try:
+                db.session.execute(update(User), logins)
+                for user_id, verified, new_hash in rehashes:
+                    # Only over the hash the login verified: a password reset or change
+                    # committed since then must not be replaced by the old password
+                    db.session.execute(
+                        update(User).where(User.id == user_id, User.password == verified).values(password=new_hash)
+                    )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Failed to record login activity for {len(pending)} users: {str(e)}")
+                self._requeue(pending)
+                return 0
+            user_cache.invalidate(*pending)
+        self.flushed += len(pending)
+        return len(pending)
+
+    def _requeue(self, pending):
+        """Put a failed flush back for the next one; activity recorded since then wins."""
+        dropped = 0
+        with self._lock:
+            for user_id, values in pending.items():
+                attempts = values.get("attempts", 0) + 1
+                if attempts >= MAX_FLUSH_ATTEMPTS:
+                    dropped += 1
+                    continue
+                self._pending[user_id] = {**values, **self._pending.get(user_id, {}), "attempts": attempts}
+        if dropped:
+            logger.error(f"Dropped login activity for {dropped} users after {MAX_FLUSH_ATTEMPTS} failed flushes")
+
+
+login_activity = LoginActivityWriter()
@@ -0,0 +1,102 @@
+# app/utils/passwords.py
+import os
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+_pool = None
+_pool_workers = 1
+_pool_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """Hashing queue is full (or a job outwaited its timeout); answered with 503 + Retry-After."""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after = retry_after
+
+
+class BoundedHasher:
+    """
+    Runs password hashing/verification on a small thread pool (hashlib's scrypt
+    and pbkdf2 release the GIL) behind an admission limit of
+    threads + queue_limit in-flight jobs. Callers beyond that are rejected
+    immediately instead of piling up on the worker.
+    """
+
+    def __init__(self):
+        self.method = "scrypt"
+        self.prefix = None
+        self.retry_after = 1
+        self.timeout = None
+        self.rejected = 0
+        self._executor = None
+        self._slots = None
+
+    def init_app(self, app):
+        self.method = app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+        # Normalised "$"-prefix of hashes made with the configured method, e.g. "scrypt:32768:8:1"
+        self.prefix = generate_password_hash("calibration", method=self.method).split("$", 1)[0]
+        self.retry_after = app.config.get("PASSWORD_HASH_RETRY_AFTER", 1)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT_SECONDS", 10)
+        threads = app.config.get("PASSWORD_HASH_THREADS", 2)
+        queue_limit = app.config.get("PASSWORD_HASH_QUEUE_LIMIT", 8)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(threads + queue_limit)
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy(self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The job keeps its slot until it finishes; the caller is shed like a full queue
+            self.rejected += 1
+            raise PasswordHasherBusy(self.retry_after)
+
+    def hash(self, raw_password):
+        return self._run(partial(generate_password_hash, method=self.method), raw_password)
+
+    def verify(self, password_hash, raw_password):
+        return self._run(check_password_hash, password_hash, raw_password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different algorithm or cost than configured."""
+        return self.prefix is not None and password_hash.split("$", 1)[0] != self.prefix
+
+
+password_hasher = BoundedHasher()
+
+
+def _get_pool():
+    """Lazily create one hashing pool per worker process."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = current_app.config.get("PASSWORD_HASH_PROCESSES") or os.cpu_count() or 1
+            # spawn, not fork: the app process already runs scheduler/mail threads
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def hash_passwords(passwords):
+    """Hash many passwords across a process pool; results keep the input order."""
+    hash_one = partial(generate_password_hash, method=password_hasher.method)
+    if len(passwords) < 2:
+        return [hash_one(p) for p in passwords]
+    pool = _get_pool()
+    chunksize = max(1, len(passwords) // (_pool_workers * 4))
+    return list(pool.map(hash_one, passwords, chunksize=chunksize))
@@ -0,0 +1,157 @@
+# app/utils/rate_limit_store.py
+import os
+import time
+import sqlite3
+import threading
+
+
+def gcra(tat, now, limit, period):
+    """
+    Generic cell rate algorithm. The only state per key is its theoretical
+    arrival time (TAT). Each request pushes the TAT one emission interval
+    (period / limit) further; it is allowed while the TAT stays within `period`
+    of now, so up to `limit` requests may burst and the budget then refills
+    smoothly instead of resetting at window edges.
+    Returns (allowed, new_tat, retry_after_seconds).
+    """
+    interval = period / limit
+    new_tat = max(tat or now, now) + interval
+    if new_tat - now > period:
+        return False, tat, new_tat - period - now
+    return True, new_tat, 0.0
+
+
+class MemoryRateLimitStore:
+    """Counters in this process only: fine for one worker and for tests."""
+
+    name = "memory"
+
+    def __init__(self, purge_interval=60):
+        self.purge_interval = purge_interval
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        with self._lock:
+            allowed, tat, retry_after = gcra(self._tats.get(key), now, limit, period)
+            self._tats[key] = tat
+            if now >= self._next_purge:
+                # A TAT in the past means the key is back to a full budget
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+                self._next_purge = now + self.purge_interval
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class SQLiteRateLimitStore:
+    """
+    Counters in a SQLite file shared by every worker on the host. Each hit is a
+    single UPSERT ... RETURNING, so the read-modify-write is atomic across
+    processes without holding a lock between statements.
+    """
+
+    name = "sqlite"
+
+    _HIT = (
+        "INSERT INTO rate_limits (key, tat) VALUES (:key, :now + :interval) "
+        "ON CONFLICT(key) DO UPDATE SET tat = MAX(tat, :now) + :interval "
+        "WHERE MAX(tat, :now) + :interval - :now <= :period "
+        "RETURNING tat"
+    )
+
+    def __init__(self, path, purge_interval=300):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn = None
+        self._next_purge = 0
+
+    def _connect(self):
+        # One connection per process: never reuse a handle inherited across fork
+        if self._pid == os.getpid():
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._pid = os.getpid()
+        return self._conn
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        params = {"key": key, "now": now, "interval": period / limit, "period": period}
+        with self._lock:
+            conn = self._connect()
+            if conn.execute(self._HIT, params).fetchone() is not None:
+                allowed, retry_after = True, 0.0
+            else:
+                tat = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()[0]
+                allowed, _, retry_after = gcra(tat, now, limit, period)
+            if now >= self._next_purge:
+                conn.execute("DELETE FROM rate_limits WHERE tat < ?", (now,))
+                self._next_purge = now + self.purge_interval
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM rate_limits")
+
+
+class RedisRateLimitStore:
+    """
+    Counters on any Redis-compatible server (or stand-in) that supports
+    register_script. The GCRA step runs as one Lua script, so it is atomic, and
+    each key expires as soon as its budget has fully refilled.
+    """
+
+    name = "redis"
+
+    SCRIPT = """
+local tat = tonumber(redis.call('GET', KEYS[1]))
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[3])
+local interval = period / tonumber(ARGV[2])
+if tat == nil or tat < now then tat = now end
+local new_tat = tat + interval
+if new_tat - now > period then
+    return {0, tostring(new_tat - period - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+    def __init__(self, client, prefix="ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    def hit(self, key, limit, period):
+        allowed, retry_after = self._script(keys=[self.prefix + key], args=[repr(time.time()), limit, period])
+        return bool(int(allowed)), float(retry_after)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_rate_limit_store(app):
+    """Store for RATE_LIMIT_BACKEND: "sqlite" (default, shared per host), "redis" or "memory"."""
+    backend = app.config.get("RATE_LIMIT_BACKEND", "sqlite")
+    if backend == "redis":
+        from app.extentions import redis_client
+        return RedisRateLimitStore(redis_client(app))
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    return SQLiteRateLimitStore(app.config["RATE_LIMIT_SQLITE_PATH"])
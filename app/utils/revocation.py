@@ -0,0 +1,158 @@
+# app/utils/revocation.py
+import os
+import time
+import sqlite3
+import threading
+
+
+class SQLiteRevocationStore:
+    """
+    Revoked token ids in a SQLite file shared by every worker on the host.
+    Each process mirrors the table in a dict, so lookups are a dict probe.
+    At most once per refresh_interval, `PRAGMA data_version` tells us whether
+    another worker has written and only rows newer than the last one seen
+    are pulled in; revocations made in this worker apply at once.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, purge_interval=300, refresh_interval=1):
+        self.path = path
+        self.purge_interval = purge_interval
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn = None
+        self._revoked = {}  # jti -> exp (epoch seconds)
+        self._last_id = 0
+        self._data_version = None
+        self._next_purge = 0
+        self._next_refresh = 0
+
+    def _connect(self):
+        # One connection per process: never reuse a handle inherited across fork
+        if self._pid == os.getpid():
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, jti TEXT NOT NULL UNIQUE, exp INTEGER NOT NULL)"
+        )
+        self._pid = os.getpid()
+        self._revoked, self._last_id, self._data_version = {}, 0, None
+        self._pull()
+        return self._conn
+
+    def _pull(self):
+        rows = self._conn.execute(
+            "SELECT id, jti, exp FROM revoked_tokens WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        for row_id, jti, exp in rows:
+            self._revoked[jti] = exp
+            self._last_id = row_id
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def claim(self, jti, exp):
+        """Revoke jti; True only for the single caller (in any worker) whose insert created it."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute("INSERT OR IGNORE INTO revoked_tokens (jti, exp) VALUES (?, ?)", (jti, int(exp)))
+            self._revoked[jti] = int(exp)
+            if time.time() >= self._next_purge:
+                self._purge(conn)
+            return cursor.rowcount == 1
+
+    def revoke(self, jti, exp):
+        self.claim(jti, exp)
+
+    def release(self, jti):
+        """Undo a claim whose use failed. Other workers' mirrors may keep it; claim() reads the table."""
+        with self._lock:
+            self._connect().execute("DELETE FROM revoked_tokens WHERE jti = ?", (jti,))
+            self._revoked.pop(jti, None)
+
+    def refresh(self):
+        """Pull in revocations other workers have written and purge expired ones if due."""
+        with self._lock:
+            conn = self._connect()
+            if conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                self._pull()
+            if time.time() >= self._next_purge:
+                self._purge(conn)
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_refresh:
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            self.refresh()
+        return jti in self._revoked
+
+    def _purge(self, conn):
+        """Drop entries whose token has expired anyway; runs at most once per purge_interval."""
+        now = int(time.time())
+        conn.execute("DELETE FROM revoked_tokens WHERE exp < ?", (now,))
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp >= now}
+        self._next_purge = now + self.purge_interval
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+class RedisRevocationStore:
+    """Revoked token ids as Redis keys that expire together with the token."""
+
+    name = "redis"
+
+    def __init__(self, client, prefix="revoked:"):
+        self.client = client
+        self.prefix = prefix
+
+    def claim(self, jti, exp):
+        ttl = int(exp - time.time())
+        if ttl <= 0:
+            return False  # already expired; nothing left to use
+        return bool(self.client.set(self.prefix + jti, 1, ex=ttl, nx=True))
+
+    def revoke(self, jti, exp):
+        self.claim(jti, exp)
+
+    def release(self, jti):
+        self.client.delete(self.prefix + jti)
+
+    def is_revoked(self, jti):
+        return bool(self.client.exists(self.prefix + jti))
+
+
+class TokenRevocations:
+    """Front for the configured revocation backend (TOKEN_REVOCATION_BACKEND)."""
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        if app.config.get("TOKEN_REVOCATION_BACKEND", "sqlite") == "redis":
+            from app.extentions import redis_client
+            self.backend = RedisRevocationStore(redis_client(app))
+        else:
+            self.backend = SQLiteRevocationStore(
+                app.config["TOKEN_REVOCATION_PATH"],
+                refresh_interval=app.config.get("TOKEN_REVOCATION_REFRESH_SECONDS", 1),
+            )
+
+    def revoke(self, jti, exp):
+        self.backend.revoke(jti, exp)
+
+    def claim(self, jti, exp):
+        """Atomic first use of a one-time token id: True for exactly one caller."""
+        return self.backend is None or self.backend.claim(jti, exp)
+
+    def release(self, jti):
+        """Give a claimed one-time token id back, e.g. when the work it guarded failed."""
+        if self.backend is not None:
+            self.backend.release(jti)
+
+    def is_revoked(self, jti):
+        return self.backend is not None and self.backend.is_revoked(jti)
@@ -1,4 +1,14 @@
 # app/utils/role_utils.py
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from app.db import db
+from app.models.role import Role
+from app.models.cache_version import CacheVersion
+from app.utils.etag import make_etag
 
 def is_admin(role_name: str) -> bool:
     """Return True if the given role_name is admin."""
@@ -7,3 +17,96 @@ def is_admin(role_name: str) -> bool:
 def is_user(role_name: str) -> bool:
     """Return True if the given role_name is user."""
     return role_name and role_name.lower() == "user"
+
+
+# ---------------- Role Registry ----------------
+RoleEntry = namedtuple("RoleEntry", "id role_name created_at updated_at")
+
+
+class RoleSnapshot:
+    """Immutable copy of the roles table at one cache version."""
+
+    __slots__ = ("version", "roles", "by_id", "by_name", "etag")
+
+    def __init__(self, version, roles):
+        self.version = version
+        self.roles = tuple(roles)  # ordered by created_at, id
+        self.by_id = MappingProxyType({role.id: role for role in self.roles})
+        self.by_name = MappingProxyType({role.role_name: role for role in self.roles})
+        last_updated = max((role.updated_at for role in self.roles if role.updated_at), default=None)
+        self.etag = make_etag("roles", len(self.roles), last_updated.isoformat() if last_updated else "")
+
+
+class RoleRegistry:
+    """
+    Every worker keeps the roles table as an immutable snapshot, replaced
+    wholesale (a single reference swap) after local role writes. Writes in
+    other workers are noticed through the 'roles' row of cache_versions,
+    polled at most once per ROLE_CACHE_CHECK_SECONDS; in between, role lookups
+    never touch the database.
+    """
+
+    name = "roles"
+
+    def __init__(self):
+        self.check_interval = 5
+        self._snapshot = None
+        self._next_check = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.check_interval = app.config.get("ROLE_CACHE_CHECK_SECONDS", 5)
+
+    def _stored_version(self):
+        version = db.session.execute(
+            select(CacheVersion.version).where(CacheVersion.name == self.name)
+        ).scalar()
+        return version or 0
+
+    def reload(self):
+        """Read the version first, then the rows: a write racing the load only causes one extra reload."""
+        with self._lock:
+            version = self._stored_version()
+            rows = db.session.execute(
+                select(Role.id, Role.role_name, Role.created_at, Role.updated_at).order_by(Role.created_at, Role.id)
+            )
+            self._snapshot = RoleSnapshot(version, [RoleEntry(*row) for row in rows])
+            self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.reload()
+        if time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            if self._stored_version() != snapshot.version:
+                return self.reload()
+        return snapshot
+
+    def bump(self):
+        """Advance the shared version inside the caller's transaction; commit, then reload()."""
+        if self._increment():
+            return
+        # No row yet (fresh create_all database). Another worker may be inserting
+        # it too: the loser's savepoint rolls back and it bumps the winner's row.
+        try:
+            with db.session.begin_nested():
+                db.session.add(CacheVersion(name=self.name, version=1))
+        except IntegrityError:
+            self._increment()
+
+    def _increment(self):
+        return db.session.execute(
+            update(CacheVersion).where(CacheVersion.name == self.name).values(version=CacheVersion.version + 1)
+        ).rowcount
+
+    def get(self, role_id):
+        return self.snapshot().by_id.get(role_id) if role_id else None
+
+    def role_name(self, role_id, default=None):
+        role = self.get(role_id)
+        return role.role_name if role else default
+
+
+role_registry = RoleRegistry()
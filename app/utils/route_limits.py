@@ -0,0 +1,142 @@
+# app/utils/route_limits.py
+import os
+import re
+import json
+import math
+import time
+from flask import current_app, request
+from limits import parse_many, RateLimitItemPerSecond
+from app.utils.logger import logger
+from app.utils.rate_limit_store import create_rate_limit_store
+
+# "/users/<string:user_id>" -> "/users/<id>", the form ROUTE_LIMITS is keyed by
+_CONVERTER = re.compile(r"<[^>]+>")
+
+
+class RateLimited(Exception):
+    """A route limit was hit; answered with 429 + Retry-After."""
+
+    def __init__(self, limit, retry_after):
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def normalize_rule(rule):
+    return _CONVERTER.sub("<id>", rule)
+
+
+def parse_limit(spec):
+    """ROUTE_LIMITS value -> tuple of RateLimitItems: {"limit", "window_seconds"} or "5 per minute"."""
+    if isinstance(spec, str):
+        return tuple(parse_many(spec))
+    return (RateLimitItemPerSecond(int(spec["limit"]), int(spec["window_seconds"])),)
+
+
+def _is_per_method(entry):
+    return isinstance(entry, dict) and "limit" not in entry
+
+
+class RouteLimiter:
+    """
+    Per-route limits resolved once into a {(endpoint, method): (RateLimitItem, ...)}
+    table instead of being parsed on every request. A route's @rate_limit string
+    is its default; a matching ROUTE_LIMITS entry (optionally per method) wins.
+    ROUTE_LIMITS_FILE, if set, is a JSON file of further overrides that each worker
+    re-reads when its mtime changes (checked every ROUTE_LIMITS_CHECK_SECONDS), so
+    limits can be changed without a restart. Hits are counted with GCRA in the
+    RATE_LIMIT_BACKEND store, which all workers share.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.table = {}
+        self.store = None
+        self.check_interval = 5
+        self._file_mtime = None
+        self._last_check = 0
+
+    def init_app(self, app):
+        """Call after all blueprints are registered."""
+        from app.utils.decorators import get_user_id_for_limiter
+        self.app = app
+        self.key_func = get_user_id_for_limiter
+        self.check_interval = app.config.get("ROUTE_LIMITS_CHECK_SECONDS", 5)
+        self.store = create_rate_limit_store(app)
+        app.extensions["route_limiter"] = self
+        self.reload()
+
+    # ---------------- Compile ----------------
+    def _load_overrides(self):
+        limits = dict(self.app.config.get("ROUTE_LIMITS") or {})
+        path = self.app.config.get("ROUTE_LIMITS_FILE")
+        self._file_mtime = None
+        if path and os.path.exists(path):
+            self._file_mtime = os.path.getmtime(path)
+            with open(path) as fh:
+                limits.update(json.load(fh))
+        return limits
+
+    def compile(self, limits):
+        table = {}
+        used = set()
+        for rule in self.app.url_map.iter_rules():
+            view = self.app.view_functions.get(rule.endpoint)
+            if view is None or not hasattr(view, "default_limits"):
+                continue
+            path = normalize_rule(rule.rule)
+            entry = limits.get(path)
+            for method in rule.methods - {"OPTIONS"}:
+                spec = entry
+                if _is_per_method(entry):
+                    spec = entry.get(method) or (entry.get("GET") if method == "HEAD" else None)
+                if spec:
+                    used.add(path)
+                    table[(rule.endpoint, method)] = parse_limit(spec)
+                elif view.default_limits:
+                    table[(rule.endpoint, method)] = view.default_limits
+
+        for path in limits.keys() - used:
+            logger.warning(f"ROUTE_LIMITS entry {path} matches no @rate_limit route; not enforced")
+        return table
+
+    def reload(self):
+        """Rebuild the table from config + ROUTE_LIMITS_FILE and swap it in; returns it."""
+        self.table = self.compile(self._load_overrides())
+        self._last_check = time.monotonic()
+        logger.info(f"Route limits compiled for {len(self.table)} endpoint/method pairs")
+        return self.table
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        path = self.app.config.get("ROUTE_LIMITS_FILE")
+        mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+        if mtime != self._file_mtime:
+            self.reload()
+
+    def describe(self):
+        return {f"{method} {endpoint}": [str(item) for item in items]
+                for (endpoint, method), items in sorted(self.table.items())}
+
+    # ---------------- Enforce ----------------
+    def check(self):
+        """Count this request against its route's limits; raises RateLimited when one is exhausted."""
+        limiter = current_app.limiter
+        if not limiter.enabled:
+            return
+        self._maybe_reload()
+        items = self.table.get((request.endpoint, request.method))
+        if not items:
+            return
+        identity = f"{request.endpoint}:{request.method}:{self.key_func()}"
+        for item in items:
+            period = item.get_expiry()
+            allowed, retry_after = self.store.hit(f"{item.amount}/{period}:{identity}", item.amount, period)
+            if not allowed:
+                raise RateLimited(item, max(1, math.ceil(retry_after)))
+
+
+route_limiter = RouteLimiter()
@@ -4,12 +4,19 @@ from flask import current_app
 from datetime import datetime, timedelta
 from app.models.user import User, db
 from app.utils.email import send_email_async
+from app.extentions import user_cache
+from app.services.stats import apply_stat_deltas, change_deltas, rebuild_user_stats
+from app.services.scheduler import inactive_users_query, admin_users_query
+from app.services.upload_sessions import sweep_upload_sessions
+from app.services.file_upload import collect_garbage_blobs
 import os
 import csv
 import atexit
 import traceback
+from collections import Counter
 
 scheduler = BackgroundScheduler()
+STATS_REBUILD_HOURS = 6
 
 
 # ---------------- JOB FUNCTIONS ----------------
@@ -19,13 +26,17 @@ def deactivate_inactive_users(app):
     with app.app_context():
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=30)
-            users = User.query.filter(User.status == "Active").all()
-            deactivated_count = 0
+            users = db.session.execute(inactive_users_query(cutoff_date)).scalars().all()
+            deactivated_ids = []
+            deltas = Counter()
             for user in users:
-                if hasattr(user, "last_login") and user.last_login and user.last_login < cutoff_date:
-                    user.status = "Inactive"
-                    deactivated_count += 1
+                deltas.update(change_deltas(user.status, user.role_id, "Inactive", user.role_id))
+                user.status = "Inactive"
+                deactivated_ids.append(user.id)
+            apply_stat_deltas(deltas)
             db.session.commit()
+            user_cache.invalidate(*deactivated_ids)
+            deactivated_count = len(deactivated_ids)
             app.logger.info(f"✅ Deactivated {deactivated_count} inactive users")
         except Exception as e:
             app.logger.error(f"⚠️ deactivate_inactive_users error: {e}")
@@ -37,7 +48,7 @@ def send_user_reports(app):
     with app.app_context():
         try:
             users = User.query.all()
-            admins = User.query.filter(User.role_id.startswith("admin")).all()
+            admins = db.session.execute(admin_users_query()).scalars().all()
             report = "\n".join(
                 [f"{u.id} - {u.email} - {u.status}" for u in users]
             )
@@ -67,6 +78,41 @@ def send_password_reminders(app):
             app.logger.error(traceback.format_exc())
 
 
+def rebuild_stats(app):
+    """Recompute the user_stats summary table to correct any drift from incremental updates."""
+    with app.app_context():
+        try:
+            # Every worker schedules this; only the first one each round rebuilds
+            buckets = rebuild_user_stats(skip_if_rebuilt_within=STATS_REBUILD_HOURS * 3600 / 2)
+            if buckets is not None:
+                app.logger.info(f"📊 User stats rebuilt ({buckets} buckets)")
+        except Exception as e:
+            app.logger.error(f"⚠️ rebuild_stats error: {e}")
+            app.logger.error(traceback.format_exc())
+
+
+def sweep_uploads(app):
+    """Delete expired resumable upload sessions and reclaim their disk space."""
+    with app.app_context():
+        try:
+            sessions, reclaimed = sweep_upload_sessions()
+            app.logger.info(f"🧹 Swept {sessions} expired upload sessions ({reclaimed} bytes reclaimed)")
+        except Exception as e:
+            app.logger.error(f"⚠️ sweep_uploads error: {e}")
+            app.logger.error(traceback.format_exc())
+
+
+def collect_blobs(app):
+    """Delete stored file contents that no upload references any more."""
+    with app.app_context():
+        try:
+            removed, reclaimed = collect_garbage_blobs()
+            app.logger.info(f"🗑️ Collected {removed} unreferenced blobs ({reclaimed} bytes reclaimed)")
+        except Exception as e:
+            app.logger.error(f"⚠️ collect_blobs error: {e}")
+            app.logger.error(traceback.format_exc())
+
+
 def backup_users_table(app):
     """Backup the users table to CSV daily."""
     with app.app_context():
@@ -111,6 +157,9 @@ def start_scheduler(app):
     scheduler.add_job(lambda: safe_run(send_user_reports), 'interval', hours=24, id="send_reports")
     scheduler.add_job(lambda: safe_run(send_password_reminders), 'interval', hours=6, id="password_reminders")
     scheduler.add_job(lambda: safe_run(backup_users_table), 'interval', hours=24, id="backup_users")
+    scheduler.add_job(lambda: safe_run(rebuild_stats), 'interval', hours=STATS_REBUILD_HOURS, id="rebuild_user_stats")
+    scheduler.add_job(lambda: safe_run(sweep_uploads), 'interval', minutes=30, id="sweep_uploads")
+    scheduler.add_job(lambda: safe_run(collect_blobs), 'interval', hours=1, id="collect_blobs")
 
     scheduler.start()
     app.logger.info("🕒 Scheduler started")
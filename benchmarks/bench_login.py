@@ -0,0 +1,96 @@
+# benchmarks/bench_login.py
+"""
+Login latency: the previous ORM path (lookup, lazy role load, synchronous
+last_login commit) against the joined single-query path with deferred
+last_login writes. Runs on a file-backed SQLite database so commits cost a
+real fsync; --rtt-ms adds a simulated network round trip per statement and
+per commit to approximate a remote MySQL server.
+
+    python -m benchmarks.bench_login [--rtt-ms 0.5] [--count 2000]
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_login.db')}")
+# Matches the seeded hash, so no rehash happens and only the database path is compared
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1")
+
+from sqlalchemy import event
+
+from benchmarks.common import create_bench_app, seed_users, sample_latencies, report_percentiles
+
+PASSWORD = "Passw0rd!"
+
+
+def legacy_login(email, password):
+    """The login service as it was before the joined query / deferred write."""
+    from app.db import db
+    from app.models.user import User
+    from app.utils.passwords import password_hasher
+    from app.utils.jwt import create_access_token, create_refresh_token
+
+    user = User.query.filter_by(email=email).first()
+    if not user or not password_hasher.verify(user.password, password):
+        return {"error": "Invalid email or password"}, 401
+    user.last_login = datetime.utcnow()
+    db.session.commit()
+    role_name = user.role.role_name if user.role else "user"
+    identity = {"user_id": user.id, "email": user.email, "role_id": user.role_id, "role_name": role_name}
+    return {
+        "access_token": create_access_token(identity),
+        "refresh_token": create_refresh_token(identity),
+        "user": {"id": user.id, "role_name": role_name, "status": user.status,
+                 "last_login": user.last_login.strftime("%Y-%m-%d %H:%M:%S")},
+    }, 200
+
+
+def simulate_round_trips(engine, rtt):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _statement(*args):
+        time.sleep(rtt)
+
+    @event.listens_for(engine, "commit")
+    def _commit(*args):
+        time.sleep(rtt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    app = create_bench_app()
+    from app.db import db
+    from app.models.role import Role
+    from app.services.auth import login
+    from app.utils.login_activity import login_activity
+
+    with app.app_context():
+        role = Role(role_name="user")
+        db.session.add(role)
+        db.session.commit()
+        seed_users(10000, role_id=role.id)
+        if args.rtt_ms:
+            simulate_round_trips(db.engine, args.rtt_ms / 1000)
+
+    def call(fn):
+        def run():
+            with app.test_request_context("/users/login", method="POST"):
+                result, status = fn("bench4242@example.com", PASSWORD)
+                assert status == 200, result
+        return run
+
+    print(f"login, 10000 users seeded, simulated RTT {args.rtt_ms} ms, {args.count} calls each")
+    old = report_percentiles("ORM lookup + lazy role + sync commit", sample_latencies(call(legacy_login), args.count))
+    new = report_percentiles("joined query + deferred last_login", sample_latencies(call(login), args.count))
+    login_activity.flush()
+    print(f"p50 speed-up {old[0] / new[0]:.1f}x, p99 speed-up {old[1] / new[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
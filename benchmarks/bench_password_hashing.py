@@ -0,0 +1,46 @@
+# benchmarks/bench_password_hashing.py
+"""
+Password hashing throughput per algorithm/cost, single-threaded and on a
+thread pool (hashlib releases the GIL, so PASSWORD_HASH_THREADS scales
+until the cores run out). Use it to pick PASSWORD_HASH_METHOD and size
+PASSWORD_HASH_THREADS / PASSWORD_HASH_QUEUE_LIMIT.
+
+    python -m benchmarks.bench_password_hashing [threads]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+METHODS = [
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",   # werkzeug default ("scrypt")
+    "pbkdf2:sha256:260000",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:1000000",
+]
+
+
+def throughput(method, threads, duration=2.0):
+    stored = generate_password_hash("Passw0rd!", method=method)
+    done = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while time.perf_counter() - start < duration:
+            done += sum(pool.map(lambda _: check_password_hash(stored, "Passw0rd!"), range(threads)))
+    elapsed = time.perf_counter() - start
+    return done / elapsed, elapsed / done * threads
+
+
+def main(threads=None):
+    threads = threads or min(4, os.cpu_count() or 1)
+    print(f"{'method':<24}{'1 thread':>14}{f'{threads} threads':>14}{'latency':>12}")
+    for method in METHODS:
+        single, latency = throughput(method, 1)
+        pooled, _ = throughput(method, threads)
+        print(f"{method:<24}{single:>10.1f} /s{pooled:>10.1f} /s{latency * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,59 @@
+# benchmarks/bench_rate_limit.py
+"""
+Per-request cost of the rate_limit decorator: the previous wrapper, which
+called limiter.limit(limit)(f) (parse + re-decorate) on every request,
+against the precompiled route table, with a limit high enough never to trip.
+The legacy path counts in Flask-Limiter's memory storage; the compiled path
+in RATE_LIMIT_BACKEND (default: the shared SQLite file).
+
+    python -m benchmarks.bench_rate_limit
+    RATE_LIMIT_BACKEND=memory python -m benchmarks.bench_rate_limit
+"""
+from functools import wraps
+from flask import current_app
+
+from benchmarks.common import create_bench_app, measure, report
+
+LIMIT = "1000000 per minute"
+
+
+def legacy_rate_limit(limit):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.limiter
+            return limiter.limit(limit)(f)(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def main():
+    app = create_bench_app()
+    from app.utils.helpers import rate_limit
+    from app.utils.route_limits import route_limiter
+
+    def view():
+        return "ok"
+
+    legacy = legacy_rate_limit(LIMIT)(view)
+    app.add_url_rule("/bench/legacy", "bench_legacy", legacy)
+    compiled = rate_limit(LIMIT)(view)
+    app.add_url_rule("/bench/compiled", "bench_compiled", compiled)
+    route_limiter.reload()
+    app.limiter.enabled = True
+
+    client = app.test_client()
+    print("full request through the test client (includes routing and limiter hooks)")
+    old = report("legacy: limiter.limit(limit)(f) per request", measure(lambda: client.get("/bench/legacy"), number=500))
+    new = report("compiled ROUTE_LIMITS table", measure(lambda: client.get("/bench/compiled"), number=500))
+    print(f"speed-up: {old / new:.2f}x")
+
+    print("\ndecorated view call only, inside a routed request context")
+    with app.test_request_context("/bench/legacy"):
+        old = report("legacy: limiter.limit(limit)(f) per request", measure(legacy, number=5000))
+    with app.test_request_context("/bench/compiled"):
+        new = report("compiled ROUTE_LIMITS table", measure(compiled, number=5000))
+    print(f"speed-up: {old / new:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_token_auth.py
+"""
+Per-request cost of bearer-token authentication: decode_token and a
+@token_required no-op view, with the verified-token cache off and on.
+The cached path still includes the revocation lookup.
+
+    python -m benchmarks.bench_token_auth
+"""
+import jwt
+from flask import current_app
+
+from benchmarks.common import create_bench_app, measure, report
+
+
+def main():
+    app = create_bench_app()
+    from app.extentions import token_cache
+    from app.utils.cache import LRUCache
+    from app.utils.jwt import create_access_token, decode_token, ALGORITHM
+    from app.utils.decorators import token_required
+
+    @token_required
+    def noop():
+        return "ok"
+
+    with app.app_context():
+        token = create_access_token(
+            {"user_id": "bench-user", "email": "bench@example.com", "role_id": "r1", "role_name": "user"}
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        max_entries = token_cache.backend.max_entries
+
+        report("jwt.decode alone", measure(
+            lambda: jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=[ALGORITHM]), number=5000
+        ))
+
+        for label, cached in (("uncached", False), ("cached", True)):
+            token_cache.backend = LRUCache(max_entries, ttl=0) if cached else None
+            report(f"decode_token ({label})", measure(lambda: decode_token(token), number=5000))
+            with app.test_request_context("/", headers=headers):
+                report(f"@token_required no-op view ({label})", measure(noop, number=5000))
+
+        print(f"cache stats: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
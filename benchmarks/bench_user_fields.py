@@ -0,0 +1,37 @@
+# benchmarks/bench_user_fields.py
+"""
+Compare a full-entity user page (ORM objects + format_user) against a
+sparse fieldset page (column-only SELECT + format_user_fields).
+
+    python -m benchmarks.bench_user_fields [rows]
+"""
+import sys
+import tracemalloc
+
+from benchmarks.common import create_bench_app, seed_users, measure, report
+
+
+def main(rows=5000):
+    app = create_bench_app()
+    with app.test_request_context():
+        from app.services.user import get_all_users
+
+        seed_users(rows)
+        page = {"limit": 500}
+        sparse = {"limit": 500, "fields": "id,email,status"}
+
+        print(f"GET /users/ service path, {rows} users seeded, 500 rows per page")
+        full = report("full entities + format_user", measure(lambda: get_all_users(page), number=5))
+        cols = report("fields=id,email,status (column-only)", measure(lambda: get_all_users(sparse), number=5))
+        print(f"speed-up: {full / cols:.1f}x")
+
+        for label, params in (("full entities", page), ("column-only", sparse)):
+            tracemalloc.start()
+            get_all_users(params)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"peak allocation, {label:<14} {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
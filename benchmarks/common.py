@@ -0,0 +1,98 @@
+# benchmarks/common.py
+"""
+Shared setup for the offline benchmarks: an in-memory SQLite app,
+bulk seeding and a small timing helper.
+
+Run any benchmark from the project root, e.g.
+    python -m benchmarks.bench_user_fields
+"""
+import os
+import time
+import uuid
+import logging
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("TOKEN_REVOCATION_PATH", os.path.join(tempfile.mkdtemp(), "revoked_tokens.db"))
+os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "rate_limits.db"))
+
+from werkzeug.security import generate_password_hash
+
+SEED_PASSWORD_HASH = generate_password_hash("Passw0rd!", method="pbkdf2:sha256:1")
+
+
+def create_bench_app():
+    """Build the real app against SQLite with request logging and rate limits turned down."""
+    from main import create_app
+    from app.utils.logger import logger
+
+    app = create_app()
+    app.limiter.enabled = False
+    logger.setLevel(logging.WARNING)
+    app.logger.setLevel(logging.WARNING)
+    return app
+
+
+def seed_users(count, batch_size=5000, role_id=None):
+    """Insert `count` users with multi-row INSERTs; returns nothing."""
+    from sqlalchemy import insert
+    from app.db import db
+    from app.models.user import User
+
+    start = datetime.utcnow() - timedelta(minutes=count)
+    for offset in range(0, count, batch_size):
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"bench{i}@example.com",
+                "phone": "9876543210",
+                "role_id": role_id,
+                "status": "Active",
+                "password": SEED_PASSWORD_HASH,
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(offset, min(offset + batch_size, count))
+        ]
+        db.session.execute(insert(User), rows)
+    db.session.commit()
+
+
+def measure(fn, repeat=7, number=1):
+    """Run fn `number` times per sample, `repeat` samples; returns per-call seconds."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def report(name, samples):
+    median = statistics.median(samples)
+    spread = statistics.stdev(samples) if len(samples) > 1 else 0.0
+    print(f"{name:<45} median {median * 1e3:9.3f} ms   stdev {spread * 1e3:7.3f} ms")
+    return median
+
+
+def sample_latencies(fn, count=2000):
+    """Time `count` individual calls after a warm-up; returns per-call seconds."""
+    fn()
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report_percentiles(name, samples):
+    cuts = statistics.quantiles(samples, n=100)
+    p50, p99 = cuts[49], cuts[98]
+    print(f"{name:<45} p50 {p50 * 1e3:9.3f} ms   p99 {p99 * 1e3:9.3f} ms")
+    return p50, p99
@@ -0,0 +1,200 @@
+# benchmarks/run.py
+"""
+Microbenchmark suite for the per-request hot paths (see benchmarks/suite.py),
+with a regression check against a committed baseline.
+
+Every case is warmed up and its loop count calibrated so one sample takes
+about --min-sample-ms. The suite then makes --rounds passes over all cases,
+taking --repeat samples per case per pass with the garbage collector off (as
+timeit does); interleaving the passes spreads slow drift on the machine over
+every case instead of whichever happened to run during it.
+
+Absolute timings depend on the machine, so cases are compared as multiples of
+the reference case's median from the same run (suite.REFERENCE_CASE). A case
+only counts as a regression when both its relative median and its relative
+fastest sample are more than --threshold slower AND the interquartile ranges
+of the two runs do not overlap, so scheduler noise on a shared machine does
+not fail the build.
+
+    python -m benchmarks.run                              # run, compare with baseline.json
+    python -m benchmarks.run --output results.json        # also write this run
+    python -m benchmarks.run --threshold 0.25 -k jwt      # looser check, subset of cases
+    python -m benchmarks.run --update-baseline            # accept the current numbers
+
+Exit status is 1 when any case regressed.
+"""
+import gc
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+from pathlib import Path
+
+from benchmarks.common import create_bench_app, seed_users
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+def calibrate(fn, min_sample_seconds):
+    """Smallest loop count (1, 2, 5, 10, 20, ...) whose sample takes at least min_sample_seconds."""
+    number = 1
+    while True:
+        for step in (1, 2, 5):
+            loops = number * step
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            if time.perf_counter() - start >= min_sample_seconds:
+                return loops
+        number *= 10
+
+
+def take_samples(fn, number, repeat):
+    samples = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def summarize(samples, number):
+    p25, median, p75 = statistics.quantiles(samples, n=4, method="inclusive")
+    to_us = 1e6
+    return {
+        "median_us": median * to_us,
+        "mean_us": statistics.fmean(samples) * to_us,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * to_us,
+        "min_us": min(samples) * to_us,
+        "p25_us": p25 * to_us,
+        "p75_us": p75 * to_us,
+        "samples": len(samples),
+        "loops_per_sample": number,
+    }
+
+
+def run_suite(repeat=10, rounds=3, min_sample_ms=20, keyword=None):
+    from benchmarks.suite import CASES, REFERENCE_CASE, Fixture
+    from app.utils.jwt import create_access_token
+
+    app = create_bench_app()
+    identity = {"user_id": "bench-admin", "email": "admin@example.com", "role_id": "r-admin", "role_name": "admin"}
+    results = {}
+    with app.app_context():
+        seed_users(10000)
+        token = create_access_token(identity)
+    with app.test_request_context("/", headers={"Authorization": f"Bearer {token}"}):
+        fixture = Fixture(token, identity)
+        cases = {}
+        for name, setup in CASES.items():
+            if keyword and keyword.lower() not in name.lower() and name != REFERENCE_CASE:
+                continue
+            fn = setup(fixture)
+            for _ in range(3):
+                fn()  # warm-up: lazy imports, caches, first-call costs
+            cases[name] = (fn, calibrate(fn, min_sample_ms / 1000), [])
+
+        for _ in range(rounds):
+            for fn, number, samples in cases.values():
+                samples.extend(take_samples(fn, number, repeat))
+
+        for name, (fn, number, samples) in cases.items():
+            results[name] = stats = summarize(samples, number)
+            print(f"{name:<52} median {stats['median_us']:10.2f} us   IQR "
+                  f"{stats['p25_us']:9.2f}-{stats['p75_us']:<9.2f} ({stats['samples']}x{stats['loops_per_sample']})")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "repeat": repeat,
+            "rounds": rounds,
+            "min_sample_ms": min_sample_ms,
+        },
+        "results": results,
+    }
+
+
+def relative(results, reference):
+    """Each case's timings as multiples of the reference case's median."""
+    unit = results[reference]["median_us"]
+    return {
+        name: {key: stats[key] / unit for key in ("median_us", "min_us", "p25_us", "p75_us")}
+        for name, stats in results.items() if name != reference
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print a comparison table; returns the names of regressed cases."""
+    from benchmarks.suite import REFERENCE_CASE
+
+    if REFERENCE_CASE not in baseline.get("results", {}):
+        print(f"\nbaseline has no '{REFERENCE_CASE}' case; regenerate it with --update-baseline")
+        return []
+    now_rel = relative(current["results"], REFERENCE_CASE)
+    before_rel = relative(baseline["results"], REFERENCE_CASE)
+
+    regressions = []
+    print(f"\n{'case (x reference median)':<52}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, now in now_rel.items():
+        before = before_rel.get(name)
+        if before is None:
+            print(f"{name:<52}{'-':>12}{now['median_us']:>11.3f}x{'new':>9}")
+            continue
+        change = now["median_us"] / before["median_us"] - 1
+        best_change = now["min_us"] / before["min_us"] - 1
+        verdict = ""
+        if change > threshold and best_change > threshold and now["p25_us"] > before["p75_us"]:
+            verdict = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold and best_change < -threshold and now["p75_us"] < before["p25_us"]:
+            verdict = "  faster"
+        print(f"{name:<52}{before['median_us']:>11.3f}x{now['median_us']:>11.3f}x{change:>+8.1%}{verdict}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="samples per case per round (default 10)")
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved passes over all cases (default 3)")
+    parser.add_argument("--min-sample-ms", type=float, default=20, help="target duration of one sample")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed median slowdown (default 0.10 = 10%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--output", type=Path, help="write this run's results as JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("-k", dest="keyword", help="only run cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.repeat, args.rounds, args.min_sample_ms, args.keyword)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(current, json.loads(args.baseline.read_text()), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nno regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
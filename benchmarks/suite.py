@@ -0,0 +1,162 @@
+# benchmarks/suite.py
+"""
+Per-request hot paths measured by `python -m benchmarks.run`.
+
+Each case is a setup function registered with @case; it receives the shared
+Fixture and returns the zero-argument callable to time. Setups run inside
+one app + request context carrying a valid bearer token, against SQLite.
+"""
+import json
+import uuid
+from datetime import date, datetime
+
+CASES = {}
+# Fixed pure-Python workload that no app change touches. Cases are compared as
+# multiples of it, so a faster or slower machine moves both sides alike.
+REFERENCE_CASE = "reference: pure-Python workload"
+
+USER_COUNT_SMALL = 500
+USER_COUNT_LARGE = 5000
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+class Fixture:
+    """Data shared by the cases: an access token for an admin and in-memory users."""
+
+    def __init__(self, token, identity):
+        self.token = token
+        self.identity = identity
+        self.users = [make_user(i) for i in range(USER_COUNT_LARGE)]
+
+
+def make_user(i):
+    from app.models.user import User
+
+    return User(
+        id=str(uuid.UUID(int=i)),
+        first_name=f"First{i}",
+        middle_name=None,
+        last_name=f"Last{i}",
+        salutation="Mr.",
+        gender="Male",
+        date_of_birth=date(1990, 1, 1 + i % 28),
+        email=f"bench{i}@example.com",
+        phone="9876543210",
+        role_id=None,
+        status="Active",
+        created_at=datetime(2024, 1, 1),
+        last_login=datetime(2024, 6, 1),
+    )
+
+
+USER_PAYLOAD = {
+    "first_name": "Bench",
+    "last_name": "User",
+    "salutation": "Mr.",
+    "gender": "Male",
+    "status": "Active",
+    "email": "new.bench.user@example.com",
+    "phone": "9876543210",
+    "password": "Passw0rd!",
+}
+
+
+# ---------------- Reference ----------------
+@case(REFERENCE_CASE)
+def _reference(fx):
+    records = [{"id": i, "name": f"user{i}", "tags": ["a", "b", str(i)]} for i in range(200)]
+    return lambda: json.loads(json.dumps(sorted(records, key=lambda r: r["name"])))
+
+
+# ---------------- Tokens ----------------
+@case("jwt.create_access_token")
+def _create_access_token(fx):
+    from app.utils.jwt import create_access_token
+    return lambda: create_access_token(fx.identity)
+
+
+@case("jwt.decode_token (verified-token cache off)")
+def _decode_token_uncached(fx):
+    from app.extentions import token_cache
+    from app.utils.jwt import decode_token
+
+    def run():
+        backend, token_cache.backend = token_cache.backend, None
+        try:
+            decode_token(fx.token)
+        finally:
+            token_cache.backend = backend
+    return run
+
+
+@case("jwt.decode_token (cached)")
+def _decode_token_cached(fx):
+    from app.utils.jwt import decode_token
+    return lambda: decode_token(fx.token)
+
+
+@case("decorators: token_required + roles_allowed")
+def _decorator_stack(fx):
+    from app.utils.decorators import token_required, roles_allowed
+
+    @token_required
+    @roles_allowed("admin")
+    def view():
+        return "ok"
+    return view
+
+
+# ---------------- Validation ----------------
+@case("helpers.is_valid_password")
+def _is_valid_password(fx):
+    from app.utils.helpers import is_valid_password
+    return lambda: is_valid_password("Sup3r-Secret!")
+
+
+@case("helpers.validate_user_data (update, no lookup)")
+def _validate_update(fx):
+    from app.utils.helpers import validate_user_data
+    return lambda: validate_user_data(USER_PAYLOAD, update=True)
+
+
+@case("helpers.validate_user_data (create, email lookup)")
+def _validate_create(fx):
+    from app.utils.helpers import validate_user_data
+    return lambda: validate_user_data(USER_PAYLOAD)
+
+
+# ---------------- Serialization ----------------
+@case(f"helpers.format_user x{USER_COUNT_SMALL}")
+def _format_user(fx):
+    from app.utils.helpers import format_user
+    users = fx.users[:USER_COUNT_SMALL]
+    return lambda: [format_user(user) for user in users]
+
+
+@case(f"helpers.serialize_user x{USER_COUNT_SMALL}")
+def _serialize_user(fx):
+    from app.utils.helpers import serialize_user
+    users = fx.users[:USER_COUNT_SMALL]
+    return lambda: [serialize_user(user) for user in users]
+
+
+@case(f"jsonify {USER_COUNT_SMALL} users")
+def _jsonify_small(fx):
+    from flask import jsonify
+    from app.utils.helpers import format_user, response_formatter
+    payload = response_formatter([format_user(user) for user in fx.users[:USER_COUNT_SMALL]], "Users fetched")
+    return lambda: jsonify(payload).get_data()
+
+
+@case(f"jsonify {USER_COUNT_LARGE} users")
+def _jsonify_large(fx):
+    from flask import jsonify
+    from app.utils.helpers import format_user, response_formatter
+    payload = response_formatter([format_user(user) for user in fx.users], "Users fetched")
+    return lambda: jsonify(payload).get_data()
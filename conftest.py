@@ -0,0 +1,168 @@
+# conftest.py
+import io
+import os
+import time
+import uuid
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Tests run against an in-memory SQLite database instead of MySQL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Keep hashing cheap; production uses the scrypt default
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+# Write last_login inline so tests never race the background flusher on the shared connection
+os.environ.setdefault("LAST_LOGIN_FLUSH_SECONDS", "0")
+os.environ.setdefault("TOKEN_REVOCATION_PATH", os.path.join(tempfile.mkdtemp(), "revoked_tokens.db"))
+os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "rate_limits.db"))
+os.environ.setdefault("UPLOAD_FOLDER", tempfile.mkdtemp())
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from main import create_app
+from app.db import db
+from app.extentions import user_cache
+from app.models.role import Role
+from app.models.user import User
+from app.utils.jwt import create_access_token
+from app.utils.role import role_registry
+
+TEST_PASSWORD = "Passw0rd!"
+# Cheap hash so seeding hundreds of users stays fast
+TEST_PASSWORD_HASH = generate_password_hash(TEST_PASSWORD, method="pbkdf2:sha256:1")
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    app.limiter.enabled = False
+    return app
+
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        yield app.test_client()
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        if user_cache.backend is not None:
+            user_cache.backend.clear()
+        role_registry.reload()
+
+
+def make_role(role_name):
+    role = Role(id=str(uuid.uuid4()), role_name=role_name)
+    db.session.add(role)
+    role_registry.bump()
+    db.session.commit()
+    role_registry.reload()
+    return role
+
+
+def make_users(count, role=None, **overrides):
+    """Insert `count` users with increasing created_at; returns their ids in order."""
+    start = datetime.utcnow() - timedelta(days=count)
+    users = []
+    for i in range(count):
+        fields = {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"user{i}-{uuid.uuid4().hex[:6]}@example.com",
+            "role_id": role.id if role else None,
+            "status": "Active",
+            "password": TEST_PASSWORD_HASH,
+            "created_at": start + timedelta(days=i),
+        }
+        fields.update(overrides)
+        users.append(User(**fields))
+    db.session.add_all(users)
+    db.session.commit()
+    return [u.id for u in users]
+
+
+def auth_headers(user_id, role):
+    identity = {
+        "user_id": user_id,
+        "email": f"{role.role_name}@example.com",
+        "role_id": role.id,
+        "role_name": role.role_name,
+    }
+    return {"Authorization": f"Bearer {create_access_token(identity)}"}
+
+
+@pytest.fixture
+def admin_headers(client):
+    admin_role = make_role("admin")
+    return auth_headers(str(uuid.uuid4()), admin_role)
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements run inside the block."""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+
+def upload_file(client, headers, content, filename="report.csv", sha256=None, **fields):
+    """POST content to /files/upload as the multipart "file" part; sha256 is sent as X-Content-SHA256."""
+    if sha256:
+        headers = {**headers, "X-Content-SHA256": sha256}
+    data = {"file": (io.BytesIO(content), filename), **fields}
+    return client.post("/files/upload", headers=headers, data=data, content_type="multipart/form-data")
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the Redis commands the app's Redis backends use:
+    strings with expiry, key scans, and Lua scripts, each of which runs as the
+    Python function given for its source in `scripts` (called with the
+    FakeRedis, keys and args).
+    """
+
+    def __init__(self, scripts=None):
+        self.store = {}  # key -> (value, expires_at or None)
+        self.scripts = scripts or {}
+        self.registered = []
+
+    def _live(self, key):
+        entry = self.store.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.store[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and self._live(key) is not None:
+            return None
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        self.store[key] = (value, time.time() + ttl if ttl is not None else None)
+        return True
+
+    def exists(self, key):
+        return int(self._live(key) is not None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in list(self.store) if key.startswith(prefix) and self._live(key) is not None]
+
+    def register_script(self, source):
+        self.registered.append(source)
+        return lambda keys, args: self.scripts[source](self, keys, args)
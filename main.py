@@ -7,14 +7,23 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_limiter.errors import RateLimitExceeded
 from flask_migrate import Migrate
+from werkzeug.exceptions import RequestEntityTooLarge
 from app.routes.user import user_bp
 from app.routes.file_upload import file_bp
 from app.routes.scheduler import manual_bp
 from app.routes.roles import role_bp
+from app.routes.metrics import metrics_bp
+from app.routes.auth import auth_bp
 from app.db import db
-from app.extentions import mail
+from app.extentions import mail, user_cache, token_revocations, token_cache
 from app.utils.logger import logger
 from app.utils.decorators import get_user_id_for_limiter
+from app.utils.passwords import password_hasher, PasswordHasherBusy
+from app.utils.login_activity import login_activity
+from app.utils.role import role_registry
+from app.utils.route_limits import route_limiter, RateLimited
+from app.utils.concurrency import concurrency_limits, Overloaded
+from app.services.file_upload import UploadTooLarge
 from app.utils.scheduler import start_scheduler  # <-- import here
 
 migrate = Migrate()
@@ -27,16 +36,25 @@ def create_app():
     db.init_app(app)
     mail.init_app(app)
     migrate.init_app(app, db)
+    user_cache.init_app(app)
+    token_revocations.init_app(app)
+    token_cache.init_app(app)
+    password_hasher.init_app(app)
+    login_activity.init_app(app)
+    role_registry.init_app(app)
+    concurrency_limits.init_app(app)
 
     # ------------------ Upload Folder -----------------
-    if not os.path.exists("uploads"):
-        os.makedirs("uploads")
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
     # ------------------ Flask-Limiter -----------------
     # Create limiter WITHOUT app
+    # Route limits are counted by route_limiter in the shared RATE_LIMIT_BACKEND
+    # store; this Limiter only carries the on/off switch, so memory:// is enough
     limiter = Limiter(
     key_func=get_user_id_for_limiter,
-    default_limits=[]
+    default_limits=[],
+    storage_uri="memory://"
     )
 
 # Later, bind to app
@@ -51,15 +69,23 @@ def create_app():
     app.register_blueprint(file_bp)
     app.register_blueprint(manual_bp)
     app.register_blueprint(role_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(auth_bp)
+
+    # Resolve @rate_limit defaults + ROUTE_LIMITS into one table, once
+    route_limiter.init_app(app)
 
     # ------------------ Logger -----------------
     @app.before_request
     def log_request_info():
         body = None
         try:
-            if request.is_json:  # ✅ only parse JSON if Content-Type is application/json
+            if request.path == "/auth/introspect":  # batches of bearer tokens stay out of the logs
+               body = None
+            elif request.is_json:  # ✅ only parse JSON if Content-Type is application/json
                body = request.get_json()
-            elif request.form:  # ✅ handle form data (like file uploads)
+            elif request.mimetype == "application/x-www-form-urlencoded":
+               # multipart bodies are left unread: uploads stream to disk in the view
                body = dict(request.form)
             else:
                body = None
@@ -84,9 +110,51 @@ def create_app():
             "data": None
         }), 429
 
+    @app.errorhandler(RateLimited)
+    def handle_route_rate_limited(e):
+        response = jsonify({
+            "status": False,
+            "message": f"Rate limit exceeded: {e.limit}",
+            "data": None
+        })
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 429
+
+    # ------------------ Body Too Large -----------------
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_too_large(e):
+        return jsonify({
+            "status": False,
+            "message": e.description if isinstance(e, UploadTooLarge)
+            else f"Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes",
+            "data": None
+        }), 413
+
+    # ------------------ Overload (503) -----------------
+    @app.errorhandler(PasswordHasherBusy)
+    def handle_hasher_busy(e):
+        response = jsonify({
+            "status": False,
+            "message": "Server busy, please retry shortly",
+            "data": None
+        })
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+
+    @app.errorhandler(Overloaded)
+    def handle_overloaded(e):
+        response = jsonify({
+            "status": False,
+            "message": "Server busy, please retry shortly",
+            "data": None
+        })
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+
     # ------------------ Create DB Tables -----------------
     with app.app_context():
         db.create_all()
+        role_registry.reload()  # roles are served from memory from the first request on
         start_scheduler(app)  # <-- start scheduler safely within app context
 
     @app.route("/health", methods=["GET"])
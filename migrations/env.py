@@ -7,6 +7,12 @@ from alembic import context
 from app.db import db
 from app.models.user import User
 from app.models.role import Role
+from app.models.user_search import UserSearchGram
+from app.models.user_stats import UserStat
+from app.models.cache_version import CacheVersion
+from app.models.uploaded_file import UploadedFile
+from app.models.upload_session import UploadSession, UploadChunk
+from app.models.file_blob import FileBlob
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,38 @@
+"""add users.updated_at row version for ETags
+
+Revision ID: 3c5e1f7a9b2d
+Revises: aee2da1e6dce
+Create Date: 2026-10-18 10:12:31.482113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e1f7a9b2d'
+down_revision: Union[str, None] = 'aee2da1e6dce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PreciseDateTime = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('updated_at', PreciseDateTime, nullable=True))
+    op.execute("UPDATE users SET updated_at = COALESCE(last_login, created_at)")
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'], unique=False)
+    with op.batch_alter_table('roles') as batch_op:
+        batch_op.alter_column('updated_at', type_=PreciseDateTime,
+                              existing_type=sa.DateTime(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('roles') as batch_op:
+        batch_op.alter_column('updated_at', type_=sa.DateTime(),
+                              existing_type=PreciseDateTime, existing_nullable=True)
+    op.drop_index('ix_users_updated_at', table_name='users')
+    op.drop_column('users', 'updated_at')
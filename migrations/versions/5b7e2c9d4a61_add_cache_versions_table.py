@@ -0,0 +1,31 @@
+"""add cache_versions table
+
+Revision ID: 5b7e2c9d4a61
+Revises: e4c97a1d5f30
+Create Date: 2026-10-18 15:02:47.531204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c9d4a61'
+down_revision: Union[str, None] = 'e4c97a1d5f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('roles', 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
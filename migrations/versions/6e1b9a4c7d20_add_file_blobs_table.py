@@ -0,0 +1,42 @@
+"""add file_blobs table for content-addressed uploads
+
+Revision ID: 6e1b9a4c7d20
+Revises: 2f8a6c3d9e14
+Create Date: 2026-10-18 21:37:12.845196
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b9a4c7d20'
+down_revision: Union[str, None] = '2f8a6c3d9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('file_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('path', sa.String(length=512), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_file_blobs_refcount', 'file_blobs', ['refcount'], unique=False)
+    op.create_index('ix_uploaded_files_sha256', 'uploaded_files', ['sha256'], unique=False)
+    # Uploads stored before this revision become blobs where they already are
+    op.execute("INSERT INTO file_blobs (sha256, size, path, refcount, created_at) "
+               "SELECT sha256, MIN(size), MIN(path), COUNT(*), MIN(created_at) FROM uploaded_files GROUP BY sha256")
+    op.execute("UPDATE uploaded_files SET path = "
+               "(SELECT path FROM file_blobs WHERE file_blobs.sha256 = uploaded_files.sha256)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_uploaded_files_sha256', table_name='uploaded_files')
+    op.drop_index('ix_file_blobs_refcount', table_name='file_blobs')
+    op.drop_table('file_blobs')
@@ -0,0 +1,35 @@
+"""add composite indexes for hot users access paths
+
+Revision ID: 7d2a4b9e1c08
+Revises: 3c5e1f7a9b2d
+Create Date: 2026-10-18 11:03:57.920344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a4b9e1c08'
+down_revision: Union[str, None] = '3c5e1f7a9b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keyset listing / export: ORDER BY created_at, id
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    # listing filtered by status, same ordering
+    op.create_index('ix_users_status_created_at', 'users', ['status', 'created_at', 'id'], unique=False)
+    # reports and listing filtered by role_id
+    op.create_index('ix_users_role_id_created_at', 'users', ['role_id', 'created_at', 'id'], unique=False)
+    # inactive-user sweep: status = 'Active' AND last_login < :threshold
+    op.create_index('ix_users_status_last_login', 'users', ['status', 'last_login'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_status_last_login', table_name='users')
+    op.drop_index('ix_users_role_id_created_at', table_name='users')
+    op.drop_index('ix_users_status_created_at', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
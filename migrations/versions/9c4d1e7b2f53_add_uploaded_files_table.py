@@ -0,0 +1,39 @@
+"""add uploaded_files table
+
+Revision ID: 9c4d1e7b2f53
+Revises: 5b7e2c9d4a61
+Create Date: 2026-10-18 17:21:09.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1e7b2f53'
+down_revision: Union[str, None] = '5b7e2c9d4a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('uploaded_files',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('path', sa.String(length=512), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_uploaded_files_user_id', 'uploaded_files', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_uploaded_files_user_id', table_name='uploaded_files')
+    op.drop_table('uploaded_files')
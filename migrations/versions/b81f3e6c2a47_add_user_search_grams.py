@@ -0,0 +1,36 @@
+"""add user_search_grams n-gram index table
+
+Revision ID: b81f3e6c2a47
+Revises: 7d2a4b9e1c08
+Create Date: 2026-10-18 12:21:08.604519
+
+The table starts empty; populate it with POST /manual/rebuild-search-index
+after upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f3e6c2a47'
+down_revision: Union[str, None] = '7d2a4b9e1c08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_search_grams',
+    sa.Column('gram', sa.String(length=4), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('gram', 'user_id')
+    )
+    op.create_index(op.f('ix_user_search_grams_user_id'), 'user_search_grams', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_search_grams_user_id'), table_name='user_search_grams')
+    op.drop_table('user_search_grams')
@@ -0,0 +1,38 @@
+"""add user_stats summary table
+
+Revision ID: e4c97a1d5f30
+Revises: b81f3e6c2a47
+Create Date: 2026-10-18 13:40:22.117905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c97a1d5f30'
+down_revision: Union[str, None] = 'b81f3e6c2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_stats',
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('bucket', sa.String(length=64), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'bucket')
+    )
+    # Seed from the current users table; the periodic rebuild job keeps it honest afterwards
+    op.execute("INSERT INTO user_stats (dimension, bucket, count) "
+               "SELECT 'status', COALESCE(status, ''), COUNT(*) FROM users GROUP BY status")
+    op.execute("INSERT INTO user_stats (dimension, bucket, count) "
+               "SELECT 'role', COALESCE(role_id, ''), COUNT(*) FROM users GROUP BY role_id")
+    op.execute("INSERT INTO user_stats (dimension, bucket, count) "
+               "SELECT 'signup_day', COALESCE(DATE(created_at), ''), COUNT(*) FROM users GROUP BY DATE(created_at)")
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
@@ -1,17 +1,15 @@
 # test_scheduler.py
-from datetime import datetime, timedelta
-from app.services.auth import reset_tokens
+# Reset tokens are signed and self-expiring now, so there is nothing left for
+# the scheduler to sweep; this just shows an expired and a valid token.
+from flask import Flask
+from app.utils.jwt import create_reset_token, decode_reset_token
 
-# Add an expired token
-reset_tokens['test-token-expired'] = {
-    "user_id": "user-001",
-    "expires": datetime.utcnow() - timedelta(minutes=1)  # already expired
-}
+app = Flask(__name__)
+app.config["SECRET_KEY"] = "test-secret"
 
-# Add a valid token
-reset_tokens['test-token-valid'] = {
-    "user_id": "user-002",
-    "expires": datetime.utcnow() + timedelta(minutes=5)
-}
+with app.app_context():
+    expired = create_reset_token("user-001", expires_in_minutes=-1)  # already expired
+    valid = create_reset_token("user-002", expires_in_minutes=5)
 
-print("Before scheduler:", reset_tokens)
+    print("Expired token:", decode_reset_token(expired))
+    print("Valid token:", decode_reset_token(valid))
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from conftest import make_role, make_users, auth_headers, TEST_PASSWORD
+from app.utils.concurrency import ConcurrencyPool, Overloaded, concurrency_limits
+
+
+@pytest.fixture
+def pools():
+    """Fresh pools from the configured sizes, discarded afterwards."""
+    concurrency_limits.pools = {}
+    yield concurrency_limits
+    concurrency_limits.pools = {}
+
+
+def test_pool_admits_queues_and_sheds():
+    pool = ConcurrencyPool("test", limit=1, queue=1, timeout=5)
+    pool.acquire()
+
+    admitted = threading.Event()
+
+    def waiter():
+        pool.acquire()
+        admitted.set()
+        pool.release()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while pool.waiting == 0:
+        threading.Event().wait(0.001)
+
+    with pytest.raises(Overloaded):  # slot taken and queue full
+        pool.acquire()
+
+    pool.release()
+    thread.join(5)
+    assert admitted.is_set()
+    assert pool.stats() | {"timeout_seconds": None} == {
+        "limit": 1, "queue": 1, "timeout_seconds": None, "in_flight": 0, "waiting": 0,
+        "peak_in_flight": 1, "peak_waiting": 1, "admitted": 2, "queued": 1, "rejected": 1, "timed_out": 0,
+    }
+
+
+def test_queued_request_times_out():
+    pool = ConcurrencyPool("test", limit=1, queue=1, timeout=0.05, retry_after=3)
+    pool.acquire()
+    with pytest.raises(Overloaded) as excinfo:
+        pool.acquire()
+    assert excinfo.value.retry_after == 3
+    assert pool.timed_out == 1 and pool.waiting == 0 and pool.in_flight == 1
+
+
+def test_full_route_pool_returns_503(client, pools, admin_headers):
+    busy = pools.pool("user_listing")
+    for _ in range(busy.limit):
+        busy.acquire()
+    busy.queue = 0
+    try:
+        resp = client.get("/users/", headers=admin_headers)
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+        # Cheap routes outside the pool are unaffected
+        assert client.get("/health").status_code == 200
+    finally:
+        for _ in range(busy.limit):
+            busy.release()
+
+    assert client.get("/users/", headers=admin_headers).status_code == 200
+    stats = client.get("/metrics/concurrency", headers=admin_headers).json
+    assert stats["user_listing"]["rejected"] == 1
+    assert stats["user_listing"]["admitted"] == busy.limit + 1
+    assert stats["user_listing"]["in_flight"] == 0
+
+
+def test_manual_jobs_pool_only_admits_admins(client, pools, admin_headers):
+    for _ in range(3):
+        assert client.post("/manual/reload-rate-limits", headers=admin_headers).status_code == 200
+    # Rejected by auth before the pool: never takes the slot
+    assert client.post("/manual/reload-rate-limits").status_code == 401
+    role = make_role("user")
+    user_headers = auth_headers(make_users(1, role=role)[0], role)
+    assert client.post("/manual/reload-rate-limits", headers=user_headers).status_code == 403
+
+    manual = pools.pool("manual_jobs")
+    assert manual.in_flight == 0 and manual.admitted == 3
+
+    manual.acquire()
+    try:
+        assert client.post("/manual/reload-rate-limits", headers=admin_headers).status_code == 503
+        assert client.post("/manual/reload-rate-limits").status_code == 401
+    finally:
+        manual.release()
+
+
+def test_login_runs_in_hashing_pool(client, pools):
+    make_users(1, email="pooled@example.com")
+    resp = client.post("/users/login", json={"email": "pooled@example.com", "password": TEST_PASSWORD})
+    assert resp.status_code == 200
+    assert pools.stats()["password_hashing"]["admitted"] == 1
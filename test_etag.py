@@ -0,0 +1,51 @@
+from conftest import make_users, make_role, count_statements
+
+
+def _get(client, url, headers, etag=None, **query):
+    if etag:
+        headers = {**headers, "If-None-Match": f'"{etag}"'}
+    return client.get(url, headers=headers, query_string=query)
+
+
+def test_user_etag_roundtrip(client, admin_headers):
+    [user_id] = make_users(1)
+    url = f"/users/{user_id}"
+
+    first = _get(client, url, admin_headers)
+    etag = first.headers["ETag"].strip('"')
+    assert _get(client, url, admin_headers, etag).status_code == 304
+
+    # A sparse fieldset is a different representation
+    assert _get(client, url, admin_headers, etag, fields="id").status_code == 200
+
+    client.put(url, json={"first_name": "Changed"}, headers=admin_headers)
+    resp = _get(client, url, admin_headers, etag)
+    assert resp.status_code == 200
+    assert resp.json["data"]["first_name"] == "Changed"
+
+
+def test_list_etag_tracks_the_page(client, admin_headers):
+    ids = make_users(3)
+
+    with count_statements() as statements:
+        etag = _get(client, "/users/", admin_headers, limit=2).headers["ETag"].strip('"')
+    assert not any("count(" in statement.lower() for statement in statements)  # no aggregate over the set
+    assert _get(client, "/users/", admin_headers, etag, limit=2).status_code == 304
+    assert _get(client, "/users/", admin_headers, etag, limit=1).status_code == 200
+
+    # A change past the page leaves it cached; one on the page does not
+    client.patch("/users/bulk", json={"ids": ids[2:], "data": {"status": "Inactive"}}, headers=admin_headers)
+    assert _get(client, "/users/", admin_headers, etag, limit=2).status_code == 304
+    client.patch("/users/bulk", json={"ids": ids[:1], "data": {"status": "Inactive"}}, headers=admin_headers)
+    assert _get(client, "/users/", admin_headers, etag, limit=2).status_code == 200
+
+    sparse = _get(client, "/users/", admin_headers, fields="id,email").headers["ETag"].strip('"')
+    assert _get(client, "/users/", admin_headers, sparse, fields="id,email").status_code == 304
+
+
+def test_roles_list_etag(client, admin_headers):
+    etag = _get(client, "/roles/", admin_headers).headers["ETag"].strip('"')
+    assert _get(client, "/roles/", admin_headers, etag).status_code == 304
+
+    make_role("user")
+    assert _get(client, "/roles/", admin_headers, etag).status_code == 200
@@ -0,0 +1,128 @@
+import os
+import time
+import hashlib
+
+import pytest
+
+from conftest import make_users, make_role, auth_headers, upload_file
+from app.db import db
+from app.models.file_blob import FileBlob
+from app.models.uploaded_file import UploadedFile
+from app.services.file_upload import blob_path, collect_garbage_blobs
+
+CONTENT = os.urandom(100 * 1024)
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def users(client):
+    role = make_role("user")
+    first, second = make_users(2, role=role)
+    return auth_headers(first, role), auth_headers(second, role)
+
+
+def staged_files(app):
+    return os.listdir(os.path.join(app.config["UPLOAD_FOLDER"], ".incoming"))
+
+
+def test_duplicates_share_one_blob(client, app, users):
+    alice, bob = users
+    first = upload_file(client, alice, CONTENT).json["data"]
+    second = upload_file(client, bob, CONTENT, filename="copy.csv").json["data"]
+    # Same name again no longer overwrites the first upload
+    third = upload_file(client, alice, b"other content").json["data"]
+
+    assert first["sha256"] == second["sha256"] == SHA256
+    assert len({first["id"], second["id"], third["id"]}) == 3
+    blob = db.session.get(FileBlob, SHA256)
+    assert blob.refcount == 2 and blob.size == len(CONTENT)
+    assert {r.path for r in db.session.query(UploadedFile).filter_by(sha256=SHA256)} == {blob.path}
+    with open(blob.path, "rb") as fh:
+        assert fh.read() == CONTENT
+    assert db.session.query(FileBlob).count() == 2
+    assert staged_files(app) == []
+
+
+def test_declared_duplicate_is_never_written(client, app, users, monkeypatch):
+    alice, bob = users
+    upload_file(client, alice, CONTENT)
+
+    # Files opened by the upload service (module-level name shadows the builtin)
+    opened = []
+    monkeypatch.setattr("app.services.file_upload.open", lambda *args, **kw: opened.append(args), raising=False)
+    resp = upload_file(client, bob, CONTENT, sha256=SHA256)
+    monkeypatch.undo()
+
+    assert resp.status_code == 200
+    assert opened == []
+    assert db.session.get(FileBlob, SHA256).refcount == 2
+
+    # The body still has to match the declared hash
+    resp = upload_file(client, bob, CONTENT[:-1] + b"!", sha256=SHA256)
+    assert resp.status_code == 400
+    assert resp.json["error"] == "File content does not match X-Content-SHA256"
+    assert db.session.get(FileBlob, SHA256).refcount == 2
+
+
+def test_resumable_upload_of_stored_content_is_deduplicated_at_finalize(client, app, users):
+    alice, bob = users
+    upload_file(client, alice, CONTENT)
+
+    session = client.post("/files/uploads", headers=bob,
+                          json={"filename": "again.csv", "size": len(CONTENT), "sha256": SHA256}).json["data"]
+    url = f"/files/uploads/{session['id']}"
+    whole = {**bob, "Content-Range": f"bytes 0-{len(CONTENT) - 1}/{len(CONTENT)}"}
+    # Chunks are never compared with the stored blob (that would leak its bytes one range at a time);
+    # only the whole file's hash is checked, at finalize
+    assert client.put(url, data=b"x" + CONTENT[1:], headers=whole).status_code == 200
+    assert client.post(f"{url}/complete", headers=bob).status_code == 400
+
+    assert client.put(url, data=CONTENT, headers=whole).status_code == 200
+    assert client.post(f"{url}/complete", headers=bob).status_code == 200
+    assert db.session.get(FileBlob, SHA256).refcount == 2
+    assert staged_files(app) == []
+
+
+def test_delete_and_garbage_collection(client, app, users):
+    alice, bob = users
+    first = upload_file(client, alice, CONTENT).json["data"]
+    second = upload_file(client, bob, CONTENT).json["data"]
+    path = db.session.get(FileBlob, SHA256).path
+
+    assert client.delete(f"/files/{first['id']}", headers=bob).status_code == 403
+    assert client.delete(f"/files/{first['id']}", headers=alice).status_code == 200
+    with app.app_context():
+        assert collect_garbage_blobs() == (0, 0)  # bob still references it
+    assert os.path.exists(path)
+
+    assert client.delete(f"/files/{second['id']}", headers=bob).status_code == 200
+    assert client.delete(f"/files/{second['id']}", headers=bob).status_code == 404
+    with app.app_context():
+        assert collect_garbage_blobs() == (1, len(CONTENT))
+    assert not os.path.exists(path)
+    assert db.session.get(FileBlob, SHA256) is None
+
+    # Uploading the content again stores a fresh blob
+    assert upload_file(client, alice, CONTENT).status_code == 200
+    assert os.path.exists(path)
+
+
+def test_garbage_collection_reclaims_blob_files_without_a_row(client, app, users):
+    alice, _ = users
+    kept = upload_file(client, alice, CONTENT).json["data"]
+    old = time.time() - app.config["UPLOAD_SESSION_TTL_SECONDS"] - 60
+
+    with app.app_context():
+        # Left behind by an upload whose transaction failed after the rename
+        orphan = blob_path(hashlib.sha256(b"rolled back").hexdigest())
+        young = blob_path(hashlib.sha256(b"still committing").hexdigest())
+        for path in (orphan, young):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(b"x" * 10)
+        os.utime(orphan, (old, old))
+        os.utime(db.session.get(FileBlob, kept["sha256"]).path, (old, old))
+
+        assert collect_garbage_blobs() == (1, 10)
+    assert not os.path.exists(orphan) and os.path.exists(young)
+    assert os.path.exists(db.session.get(FileBlob, kept["sha256"]).path)
@@ -0,0 +1,105 @@
+import os
+import hashlib
+
+import pytest
+
+from conftest import make_users, make_role, auth_headers, upload_file
+from app.db import db
+from app.models.uploaded_file import UploadedFile
+
+CONTENT = os.urandom(64 * 1024)
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def stored(client):
+    role = make_role("user")
+    owner, stranger = make_users(2, role=role)
+    headers = auth_headers(owner, role)
+    resp = upload_file(client, headers, CONTENT, filename="scan.pdf")
+    return resp.json["data"]["id"], headers, auth_headers(stranger, role)
+
+
+def test_download_full_file(client, stored):
+    file_id, headers, _ = stored
+    resp = client.get(f"/files/{file_id}", headers=headers)
+    assert resp.status_code == 200
+    assert resp.data == CONTENT
+    assert resp.headers["ETag"] == f'"{SHA256}"'
+    assert resp.headers["Accept-Ranges"] == "bytes"
+    assert resp.headers["Content-Type"] == "application/pdf"
+    assert resp.headers["Content-Disposition"] == "attachment; filename=scan.pdf"
+    assert resp.last_modified is not None
+    assert "private" in resp.headers["Cache-Control"]
+
+
+def test_relative_upload_folder_is_stored_absolute(app, client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", "uploads")
+    role = make_role("user")
+    headers = auth_headers(make_users(1, role=role)[0], role)
+    file_id = upload_file(client, headers, CONTENT, filename="scan.pdf").json["data"]["id"]
+    assert db.session.get(UploadedFile, file_id).path == str(tmp_path / "uploads" / "blobs" / SHA256[:2] / SHA256)
+    assert client.get(f"/files/{file_id}", headers=headers).data == CONTENT
+
+
+def test_conditional_requests_return_304(client, stored):
+    file_id, headers, _ = stored
+    first = client.get(f"/files/{file_id}", headers=headers)
+
+    resp = client.get(f"/files/{file_id}", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert resp.status_code == 304 and resp.data == b""
+    resp = client.get(f"/files/{file_id}", headers={**headers, "If-Modified-Since": first.headers["Last-Modified"]})
+    assert resp.status_code == 304
+    assert client.get(f"/files/{file_id}", headers={**headers, "If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_range_requests(client, stored):
+    file_id, headers, _ = stored
+    resp = client.get(f"/files/{file_id}", headers={**headers, "Range": "bytes=100-199"})
+    assert resp.status_code == 206
+    assert resp.data == CONTENT[100:200]
+    assert resp.headers["Content-Range"] == f"bytes 100-199/{len(CONTENT)}"
+
+    # Resuming with a matching If-Range gets the tail; a stale one gets the whole file
+    resp = client.get(f"/files/{file_id}", headers={**headers, "Range": "bytes=60000-", "If-Range": f'"{SHA256}"'})
+    assert resp.status_code == 206 and resp.data == CONTENT[60000:]
+    resp = client.get(f"/files/{file_id}", headers={**headers, "Range": "bytes=60000-", "If-Range": '"other"'})
+    assert resp.status_code == 200 and resp.data == CONTENT
+
+    resp = client.get(f"/files/{file_id}", headers={**headers, "Range": f"bytes={len(CONTENT)}-"})
+    assert resp.status_code == 416
+
+
+def test_range_goes_to_server_file_wrapper(client, stored):
+    """With wsgi.file_wrapper the range is handed over as a positioned file, not read by the app."""
+    file_id, headers, _ = stored
+    handed = []
+
+    class FileWrapper:
+        def __init__(self, filelike, block_size=8192):
+            handed.append((filelike, filelike.tell()))
+            self.filelike = filelike
+
+        def __iter__(self):
+            return iter([self.filelike.read(100)])
+
+        def close(self):
+            self.filelike.close()
+
+    resp = client.get(f"/files/{file_id}", headers={**headers, "Range": "bytes=100-199"},
+                      environ_overrides={"wsgi.file_wrapper": FileWrapper})
+    assert resp.status_code == 206
+    assert resp.headers["Content-Length"] == "100"
+    assert resp.data == CONTENT[100:200]
+    assert handed[-1][1] == 100
+
+
+def test_only_owner_or_admin_can_download(client, stored):
+    file_id, _, stranger = stored
+    assert client.get(f"/files/{file_id}", headers=stranger).status_code == 403
+    assert client.get("/files/does-not-exist", headers=stranger).status_code == 404
+
+    admin = make_role("admin")
+    admin_id = make_users(1, role=admin)[0]
+    assert client.get(f"/files/{file_id}", headers=auth_headers(admin_id, admin)).data == CONTENT
@@ -0,0 +1,110 @@
+import os
+import hashlib
+
+import pytest
+
+from conftest import make_users, make_role, auth_headers, upload_file
+from app.db import db
+from app.models.uploaded_file import UploadedFile
+from app.services import file_upload
+
+
+@pytest.fixture
+def uploader(client):
+    role = make_role("user")
+    user_id = make_users(1, role=role)[0]
+    return user_id, auth_headers(user_id, role)
+
+
+def test_upload_streams_to_disk_with_hash_and_size(client, app, uploader):
+    user_id, headers = uploader
+    content = os.urandom(300 * 1024)  # several parser chunks
+
+    resp = upload_file(client, headers, content, filename="../../Q3 report.csv", description="quarterly")
+    assert resp.status_code == 200
+    data = resp.json["data"]
+    assert data["filename"] == "Q3_report.csv"
+    assert data["size"] == len(content)
+    assert data["sha256"] == hashlib.sha256(content).hexdigest()
+    assert data["description"] == "quarterly"
+
+    record = db.session.get(UploadedFile, data["id"])
+    assert record.user_id == user_id
+    assert record.path == os.path.join(app.config["UPLOAD_FOLDER"], "blobs", data["sha256"][:2], data["sha256"])
+    with open(record.path, "rb") as fh:
+        assert fh.read() == content
+    # Nothing is left behind in the staging directory
+    assert os.listdir(os.path.join(app.config["UPLOAD_FOLDER"], ".incoming")) == []
+
+
+def test_disallowed_extension_is_not_stored(client, app, uploader):
+    _, headers = uploader
+    resp = upload_file(client, headers, b"#!/bin/sh", filename="run.sh")
+    assert resp.status_code == 400
+    assert resp.json["error"] == "File type not allowed"
+    assert db.session.query(UploadedFile).count() == 0
+
+
+def test_body_over_max_content_length_is_rejected(client, app, uploader):
+    _, headers = uploader
+    limit = app.config["MAX_CONTENT_LENGTH"]
+    app.config["MAX_CONTENT_LENGTH"] = 64 * 1024
+    try:
+        resp = upload_file(client, headers, b"x" * (128 * 1024))
+    finally:
+        app.config["MAX_CONTENT_LENGTH"] = limit
+    assert resp.status_code == 413
+    assert resp.json["status"] is False
+    assert db.session.query(UploadedFile).count() == 0
+
+
+def test_user_quota_is_enforced_mid_stream(client, app, uploader):
+    _, headers = uploader
+    quota = app.config["UPLOAD_USER_QUOTA_BYTES"]
+    app.config["UPLOAD_USER_QUOTA_BYTES"] = 200 * 1024
+    try:
+        assert upload_file(client, headers, b"a" * (150 * 1024)).status_code == 200
+
+        resp = upload_file(client, headers, b"b" * (100 * 1024), filename="second.csv")
+        assert resp.status_code == 413
+        assert resp.json["message"] == "Upload would exceed your storage quota"
+
+        assert upload_file(client, headers, b"c" * (50 * 1024), filename="third.csv").status_code == 200
+        resp = upload_file(client, headers, b"d", filename="fourth.csv")
+        assert resp.json["message"] == "Upload quota exhausted"
+    finally:
+        app.config["UPLOAD_USER_QUOTA_BYTES"] = quota
+
+    assert os.listdir(os.path.join(app.config["UPLOAD_FOLDER"], ".incoming")) == []
+    assert sorted(f.filename for f in db.session.query(UploadedFile)) == ["report.csv", "third.csv"]
+
+
+def test_quota_is_rechecked_when_storing(client, app, uploader, monkeypatch):
+    _, headers = uploader
+    monkeypatch.setitem(app.config, "UPLOAD_USER_QUOTA_BYTES", 200 * 1024)
+    assert upload_file(client, headers, b"a" * (150 * 1024)).status_code == 200
+
+    # A concurrent upload that passed the pre-stream check before the first one was stored
+    real_used_bytes = file_upload.used_bytes
+    checks = []
+
+    def used_bytes(user_id):
+        checks.append(user_id)
+        return 0 if len(checks) == 1 else real_used_bytes(user_id)
+
+    monkeypatch.setattr(file_upload, "used_bytes", used_bytes)
+
+    resp = upload_file(client, headers, b"b" * (100 * 1024), filename="second.csv")
+    assert resp.status_code == 413
+    assert resp.json["message"] == "Upload would exceed your storage quota"
+    assert len(checks) == 2
+    assert os.listdir(os.path.join(app.config["UPLOAD_FOLDER"], ".incoming")) == []
+    assert [f.filename for f in db.session.query(UploadedFile)] == ["report.csv"]
+
+
+def test_missing_file_part(client, uploader):
+    _, headers = uploader
+    resp = client.post("/files/upload", headers=headers, data={"description": "x"},
+                       content_type="multipart/form-data")
+    assert resp.status_code == 400
+    assert resp.json["error"] == "No file uploaded"
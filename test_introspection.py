@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from conftest import make_users, make_role, auth_headers
+from app.utils.jwt import create_refresh_token
+
+GATEWAY = {"X-Gateway-Key": "gw-secret"}
+
+
+@pytest.fixture
+def gateway_key(app, monkeypatch):
+    monkeypatch.setitem(app.config, "GATEWAY_API_KEY", "gw-secret")
+
+
+def _introspect(client, tokens, headers=GATEWAY):
+    return client.post("/auth/introspect", json={"tokens": tokens}, headers=headers)
+
+
+def test_batch_reports_each_token_in_order(client, gateway_key):
+    role = make_role("user")
+    [user_id] = make_users(1, role=role)
+    access = auth_headers(user_id, role)["Authorization"].split(" ")[1]
+    refresh = create_refresh_token({"user_id": user_id})
+    revoked = auth_headers(user_id, role)
+    assert client.post("/users/logout", headers=revoked).status_code == 200
+
+    resp = _introspect(client, [access, "garbage", refresh, revoked["Authorization"].split(" ")[1], access])
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == "no-store"
+    first, bad, ref, gone, again = resp.json["results"]
+
+    assert first["active"] and first["type"] == "access" and first["sub"] == user_id
+    assert first["data"]["role_name"] == "user"
+    assert first["cache_until"] <= min(first["exp"], int(time.time()) + 60)
+    assert again == first
+    assert not bad["active"] and "Invalid token" in bad["error"]
+    assert ref["active"] and ref["type"] == "refresh" and ref["data"] is None
+    assert not gone["active"] and "invalidated" in gone["error"]
+
+
+def test_requires_gateway_key(client, gateway_key):
+    assert _introspect(client, ["x"], headers={}).status_code == 403
+    assert _introspect(client, ["x"], headers={"X-Gateway-Key": "wrong"}).status_code == 403
+
+
+def test_disabled_without_configured_key(client):
+    assert _introspect(client, ["x"], headers={"X-Gateway-Key": ""}).status_code == 403
+
+
+def test_rejects_malformed_and_oversized_batches(app, client, gateway_key, monkeypatch):
+    assert _introspect(client, []).status_code == 400
+    assert _introspect(client, [1, 2]).status_code == 400
+    monkeypatch.setitem(app.config, "INTROSPECTION_MAX_TOKENS", 2)
+    assert _introspect(client, ["a", "b", "c"]).status_code == 400
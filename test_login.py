@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from conftest import make_users, make_role, TEST_PASSWORD
+from app.db import db
+from app.extentions import user_cache
+from app.models.user import User
+from app.utils.login_activity import LoginActivityWriter
+
+
+def _login(client, email):
+    return client.post("/users/login", json={"email": email, "password": TEST_PASSWORD})
+
+
+def test_login_returns_role_from_joined_query(client):
+    role = make_role("admin")
+    [user_id] = make_users(1, role=role, email="joined@example.com")
+
+    resp = _login(client, "joined@example.com")
+    assert resp.status_code == 200
+    assert resp.json["user"]["role_name"] == "admin"
+    assert resp.json["user"]["id"] == user_id
+
+    refreshed = client.post("/users/refresh", json={"refresh_token": resp.json["refresh_token"]})
+    assert refreshed.status_code == 200
+
+
+def test_login_without_role_defaults_to_user(client):
+    make_users(1, email="norole@example.com")
+    resp = _login(client, "norole@example.com")
+    assert resp.status_code == 200
+    assert resp.json["user"]["role_name"] == "user"
+
+
+def test_deferred_writer_coalesces_until_flush(app, client):
+    [a, b] = make_users(2)
+    user_cache.backend.set(a, {"version": "stale", "profile": {}})
+    version = User.query.get(a).updated_at
+    writer = LoginActivityWriter()
+    writer.app = app
+    writer.interval = 3600
+
+    first, second = datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 10)
+    writer.record(a, first)
+    writer.record(a, second)
+    writer.record(b, first, password="pbkdf2:sha256:1$x$y", replaces=User.query.get(b).password)
+    assert User.query.get(a).last_login is None
+
+    assert writer.flush() == 2
+    db.session.expire_all()
+    assert User.query.get(a).last_login == second
+    assert User.query.get(a).updated_at > version  # ETags see the change
+    assert User.query.get(b).password == "pbkdf2:sha256:1$x$y"
+    assert user_cache.peek(a) is None
+    assert writer.flush() == 0
+
+
+def test_deferred_rehash_never_overwrites_a_newer_password(app, client):
+    [user_id] = make_users(1)
+    verified = User.query.get(user_id).password
+    writer = LoginActivityWriter()
+    writer.app = app
+    writer.interval = 3600
+
+    writer.record(user_id, datetime(2030, 1, 1), password="pbkdf2:sha256:1$old$rehash", replaces=verified)
+    User.query.get(user_id).password = "pbkdf2:sha256:1$new$reset"  # reset lands inside the flush window
+    db.session.commit()
+
+    assert writer.flush() == 1
+    db.session.expire_all()
+    user = User.query.get(user_id)
+    assert user.password == "pbkdf2:sha256:1$new$reset"
+    assert user.last_login == datetime(2030, 1, 1)
+
+
+def test_failed_flush_is_retried(app, client, monkeypatch):
+    [user_id] = make_users(1)
+    writer = LoginActivityWriter()
+    writer.app = app
+    writer.interval = 3600
+    writer.record(user_id, datetime(2030, 1, 1))
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(db.session, "execute", unavailable)
+    assert writer.flush() == 0
+    monkeypatch.undo()
+
+    assert writer.flush() == 1
+    db.session.expire_all()
+    assert User.query.get(user_id).last_login == datetime(2030, 1, 1)
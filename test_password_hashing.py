@@ -0,0 +1,46 @@
+import threading
+
+from conftest import make_users, TEST_PASSWORD
+from app.models.user import User
+from app.utils.passwords import password_hasher
+
+
+def _login(client):
+    return client.post("/users/login", json={"email": "login@example.com", "password": TEST_PASSWORD})
+
+
+def test_login_upgrades_outdated_hash(client):
+    [user_id] = make_users(1, email="login@example.com")
+    assert password_hasher.needs_rehash(User.query.get(user_id).password)
+
+    assert _login(client).status_code == 200
+    upgraded = User.query.get(user_id).password
+    assert upgraded.startswith(password_hasher.prefix + "$")
+    assert not password_hasher.needs_rehash(upgraded)
+    assert _login(client).status_code == 200
+
+
+def test_full_queue_sheds_login_with_503(client, monkeypatch):
+    make_users(1, email="login@example.com")
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_hasher, "_slots", slots)
+
+    resp = _login(client)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert password_hasher.rejected >= 1
+
+
+def test_hash_timeout_sheds_login_with_503(client, monkeypatch):
+    make_users(1, email="login@example.com")
+    release = threading.Event()
+    monkeypatch.setattr("app.utils.passwords.check_password_hash", lambda *args: release.wait(5))
+    monkeypatch.setattr(password_hasher, "timeout", 0.05)
+
+    try:
+        resp = _login(client)
+    finally:
+        release.set()
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from conftest import make_users, TEST_PASSWORD
+from app.db import db
+from app.models.user import User
+from app.utils.jwt import create_reset_token, create_access_token
+from app.utils.passwords import password_hasher
+
+NEW_PASSWORD = "N3w-Passw0rd!"
+
+
+@pytest.fixture
+def sent_emails(monkeypatch):
+    sent = []
+    monkeypatch.setattr("app.services.auth.send_email_async", lambda to, subject, body: sent.append(body))
+    return sent
+
+
+def _reset(client, token, password=NEW_PASSWORD):
+    return client.post("/users/reset-password", json={"token": token, "new_password": password})
+
+
+def test_reset_link_works_once(client, sent_emails):
+    [user_id] = make_users(1, email="reset@example.com")
+    assert client.post("/users/forgot-password", json={"email": "reset@example.com"}).status_code == 200
+    token = re.search(r"token=(\S+)", sent_emails[0]).group(1)
+
+    assert _reset(client, token).status_code == 200
+    assert password_hasher.verify(User.query.get(user_id).password, NEW_PASSWORD)
+
+    reused = _reset(client, token, "An0ther-Passw0rd!")
+    assert reused.status_code == 400
+    assert reused.json["error"] == "Token already used"
+    assert password_hasher.verify(User.query.get(user_id).password, NEW_PASSWORD)
+
+
+def test_rejected_password_does_not_burn_token(client):
+    [user_id] = make_users(1)
+    token = create_reset_token(user_id)
+    assert _reset(client, token, "short").status_code == 400
+    assert _reset(client, token).status_code == 200
+
+
+def test_failed_commit_does_not_burn_token(client, monkeypatch):
+    [user_id] = make_users(1)
+    token = create_reset_token(user_id)
+
+    def failing_commit():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(db.session, "commit", failing_commit)
+    assert _reset(client, token).status_code == 500
+    monkeypatch.undo()
+    assert password_hasher.verify(User.query.get(user_id).password, TEST_PASSWORD)
+
+    assert _reset(client, token).status_code == 200
+    assert password_hasher.verify(User.query.get(user_id).password, NEW_PASSWORD)
+    assert _reset(client, token).json["error"] == "Token already used"
+
+
+def test_expired_and_foreign_tokens_are_rejected(client):
+    [user_id] = make_users(1)
+    assert _reset(client, create_reset_token(user_id, expires_in_minutes=-1)).json["error"] == "Token expired"
+
+    access = create_access_token({"user_id": user_id, "email": "x@example.com", "role_id": None, "role_name": "user"})
+    assert _reset(client, access).json["error"] == "Invalid token type"
+    assert password_hasher.verify(User.query.get(user_id).password, TEST_PASSWORD)
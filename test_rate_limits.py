@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from conftest import make_users, make_role, auth_headers, TEST_PASSWORD
+from app.utils.route_limits import route_limiter, normalize_rule
+
+
+@pytest.fixture
+def limited(app):
+    """Rate limiting on, fresh counters, and the compiled table restored afterwards."""
+    table, config = route_limiter.table, dict(app.config)
+    app.limiter.enabled = True
+    route_limiter.store.clear()
+    yield app
+    app.limiter.enabled = False
+    route_limiter.store.clear()
+    app.config.update(config)
+    route_limiter.table = table
+
+
+def test_normalize_rule():
+    assert normalize_rule("/users/<string:user_id>") == "/users/<id>"
+    assert normalize_rule("/roles/<role_id>") == "/roles/<id>"
+
+
+def test_route_limits_entry_is_enforced(client, limited):
+    make_users(1, email="limited@example.com")
+    body = {"email": "limited@example.com", "password": TEST_PASSWORD}
+    statuses = [client.post("/users/login", json=body).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+
+    resp = client.post("/users/login", json=body)
+    assert resp.json["message"].startswith("Rate limit exceeded: 5 per 60 second")
+    assert 0 < int(resp.headers["Retry-After"]) <= 60
+
+
+def test_per_method_override_and_per_user_keys(client, limited):
+    limited.config["ROUTE_LIMITS"] = {"/users/<id>": {"GET": {"limit": 2, "window_seconds": 60}}}
+    route_limiter.reload()
+
+    role = make_role("user")
+    [alice, bob] = make_users(2, role=role)
+    alice_headers, bob_headers = auth_headers(alice, role), auth_headers(bob, role)
+    assert [client.get(f"/users/{alice}", headers=alice_headers).status_code for _ in range(3)] == [200, 200, 429]
+    assert client.get(f"/users/{bob}", headers=bob_headers).status_code == 200
+    # PUT has no override, so it keeps its @rate_limit default
+    assert client.put(f"/users/{alice}", json={"first_name": "Al"}, headers=alice_headers).status_code == 200
+
+
+def test_limits_file_is_picked_up_without_restart(client, limited, tmp_path, admin_headers):
+    path = tmp_path / "limits.json"
+    limited.config["ROUTE_LIMITS_FILE"] = str(path)
+    route_limiter.check_interval = 0
+    try:
+        path.write_text(json.dumps({"/users/search": "1 per minute"}))
+        statuses = [client.get("/users/search", query_string={"q": "abc"}, headers=admin_headers).status_code
+                    for _ in range(2)]
+        assert statuses == [200, 429]
+
+        resp = client.post("/manual/reload-rate-limits", headers=admin_headers)
+        assert resp.json["data"]["GET user_bp.search_users_route"] == ["1 per 1 minute"]
+    finally:
+        route_limiter.check_interval = 5
@@ -0,0 +1,71 @@
+import pytest
+
+from conftest import make_users, make_role, count_statements, TEST_PASSWORD
+from app.db import db
+from app.models.cache_version import CacheVersion
+from app.models.role import Role
+from app.utils.role import RoleRegistry, role_registry
+
+
+def test_role_reads_cost_no_queries(client, admin_headers):
+    role = make_role("user")
+    make_users(1, role=role, email="roles@example.com")
+    url = f"/roles/{role.id}"
+
+    with count_statements() as statements:
+        resp = client.get(url, headers=admin_headers)
+    assert resp.status_code == 200 and resp.json["role_name"] == "user"
+    assert statements == []
+
+    with count_statements() as statements:
+        resp = client.post("/users/login", json={"email": "roles@example.com", "password": TEST_PASSWORD})
+    assert resp.json["user"]["role_name"] == "user"
+    assert not any("roles" in statement for statement in statements)
+
+
+def test_role_writes_swap_the_snapshot(client, admin_headers):
+    before = role_registry.snapshot()
+    created = client.post("/roles/", json={"role_name": "user"}).json["role"]
+    after = role_registry.snapshot()
+    assert after is not before and after.version == before.version + 1
+    assert after.by_name["user"].id == created["id"]
+    with pytest.raises(TypeError):
+        after.by_id["x"] = None
+
+    assert client.delete(f"/roles/{created['id']}", headers=admin_headers).status_code == 200
+    assert client.get(f"/roles/{created['id']}", headers=admin_headers).status_code == 404
+
+
+def test_other_workers_reload_on_version_change(client):
+    other_worker = RoleRegistry()
+    other_worker.check_interval = 3600
+    assert other_worker.snapshot().by_name.get("user") is None
+
+    role = make_role("user")  # bumps cache_versions, as a role write in this worker would
+    assert other_worker.get(role.id) is None  # still inside its check interval
+
+    other_worker.check_interval = 0
+    other_worker._next_check = 0
+    assert other_worker.role_name(role.id) == "user"
+
+
+def test_bump_survives_a_concurrent_first_insert(client, monkeypatch):
+    make_role("user")
+    version = db.session.get(CacheVersion, "roles").version
+
+    # Another worker inserts the row between this one's update and insert
+    calls = []
+    increment = RoleRegistry._increment
+
+    def racing_increment(self):
+        calls.append(self)
+        return 0 if len(calls) == 1 else increment(self)
+
+    monkeypatch.setattr(RoleRegistry, "_increment", racing_increment)
+    db.session.add(Role(id="racing-role", role_name="admin"))
+    role_registry.bump()
+    db.session.commit()  # the role write goes through
+
+    assert len(calls) == 2
+    assert db.session.get(CacheVersion, "roles").version == version + 1
+    assert db.session.get(Role, "racing-role") is not None
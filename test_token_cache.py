@@ -0,0 +1,44 @@
+import time
+
+from conftest import make_users, make_role, auth_headers
+from app.extentions import token_cache
+from app.utils.cache import TokenCache, LRUCache
+
+
+def test_repeated_token_is_verified_once_and_purged_on_logout(app, client):
+    role = make_role("user")
+    [user_id] = make_users(1, role=role)
+    headers = auth_headers(user_id, role)
+    token = headers["Authorization"].split(" ")[1]
+
+    hits = token_cache.hits
+    for _ in range(3):
+        assert client.get(f"/users/{user_id}", headers=headers).status_code == 200
+    assert token_cache.hits - hits >= 2
+    assert token_cache.backend.get(TokenCache.key(token)) is not None
+
+    assert client.post("/users/logout", headers=headers).status_code == 200
+    assert token_cache.backend.get(TokenCache.key(token)) is None
+    assert client.get(f"/users/{user_id}", headers=headers).status_code == 401
+
+
+def test_invalid_tokens_are_not_cached(app, client):
+    role = make_role("user")
+    [user_id] = make_users(1, role=role)
+    token = auth_headers(user_id, role)["Authorization"].split(" ")[1]
+    forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+    resp = client.get(f"/users/{user_id}", headers={"Authorization": f"Bearer {forged}"})
+    assert resp.status_code == 401
+    assert token_cache.backend.get(TokenCache.key(forged)) is None
+
+
+def test_entries_expire_with_the_token():
+    cache = TokenCache()
+    cache.backend = LRUCache(10, ttl=0)
+    cache.put("expired", {"exp": time.time() - 1})
+    cache.put("short", {"exp": time.time() + 0.05})
+    assert cache.get("expired") is None
+    assert cache.get("short") is not None
+    time.sleep(0.06)
+    assert cache.get("short") is None
@@ -0,0 +1,211 @@
+import os
+import time
+import fcntl
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import make_users, make_role, auth_headers
+from app.db import db
+from app.models.upload_session import UploadSession, UploadChunk
+from app.models.uploaded_file import UploadedFile
+from app.services.upload_sessions import finalize_upload_session, sweep_upload_sessions, write_chunk
+
+CONTENT = os.urandom(250 * 1024)
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def headers(client):
+    role = make_role("user")
+    user_id = make_users(1, role=role)[0]
+    return auth_headers(user_id, role)
+
+
+def create(client, headers, size=len(CONTENT), **extra):
+    body = {"filename": "big export.csv", "size": size, **extra}
+    return client.post("/files/uploads", headers=headers, json=body)
+
+
+def put_chunk(client, headers, session_id, start, end, data=None, size=len(CONTENT)):
+    data = CONTENT[start:end] if data is None else data
+    return client.put(f"/files/uploads/{session_id}", data=data, headers={
+        **headers, "Content-Range": f"bytes {start}-{end - 1}/{size}",
+    })
+
+
+def test_chunks_in_any_order_then_finalize(client, app, headers):
+    resp = create(client, headers, description="nightly")
+    assert resp.status_code == 201
+    session = resp.json["data"]
+    assert session["offset"] == 0 and session["ranges"] == []
+    staged = db.session.get(UploadSession, session["id"]).path
+    assert os.path.getsize(staged) == len(CONTENT)  # preallocated
+
+    third = len(CONTENT) // 3
+    assert put_chunk(client, headers, session["id"], 2 * third, len(CONTENT)).status_code == 200
+    resp = put_chunk(client, headers, session["id"], 0, third)
+    assert resp.json["data"]["offset"] == third
+    assert resp.json["data"]["ranges"] == [[0, third], [2 * third, len(CONTENT)]]
+
+    # A client that lost track asks where to resume
+    status = client.get(f"/files/uploads/{session['id']}", headers=headers).json["data"]
+    assert status["offset"] == third and status["received"] == len(CONTENT) - third
+
+    assert put_chunk(client, headers, session["id"], third, 2 * third).status_code == 200
+    resp = client.post(f"/files/uploads/{session['id']}/complete", headers=headers, json={"sha256": SHA256})
+    assert resp.status_code == 200
+    data = resp.json["data"]
+    assert data["filename"] == "big_export.csv"
+    assert data["sha256"] == SHA256 and data["size"] == len(CONTENT)
+    assert data["description"] == "nightly"
+
+    with open(db.session.get(UploadedFile, data["id"]).path, "rb") as fh:
+        assert fh.read() == CONTENT
+    assert not os.path.exists(staged)
+    assert db.session.query(UploadSession).count() == 0
+    assert db.session.query(UploadChunk).count() == 0
+
+
+def test_finalize_checks_completeness_and_checksum(client, headers):
+    session_id = create(client, headers, sha256=SHA256).json["data"]["id"]
+    put_chunk(client, headers, session_id, 0, 1000)
+
+    resp = client.post(f"/files/uploads/{session_id}/complete", headers=headers)
+    assert resp.status_code == 409
+    assert resp.json["data"]["offset"] == 1000
+
+    corrupt = b"\0" * (len(CONTENT) - 1000)
+    put_chunk(client, headers, session_id, 1000, len(CONTENT), data=corrupt)
+    # sha256 declared at creation is used when finalize doesn't send one
+    resp = client.post(f"/files/uploads/{session_id}/complete", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json["data"]["received"] == 0 and resp.json["data"]["status"] == "open"
+
+    put_chunk(client, headers, session_id, 0, len(CONTENT))
+    assert client.post(f"/files/uploads/{session_id}/complete", headers=headers).status_code == 200
+
+
+def test_chunk_validation(client, headers):
+    session_id = create(client, headers).json["data"]["id"]
+    url = f"/files/uploads/{session_id}"
+
+    assert client.put(url, data=b"abc", headers=headers).status_code == 400
+    assert put_chunk(client, headers, session_id, 0, 10, size=len(CONTENT) + 1).status_code == 416
+    resp = client.put(url, data=b"abc", headers={**headers, "Content-Range": "bytes 0-9/*"})
+    assert resp.json["error"] == "Content-Length does not match Content-Range"
+    assert client.get(url, headers=headers).json["data"]["received"] == 0
+
+
+def test_sessions_are_private_and_reserve_quota(client, app, headers):
+    session_id = create(client, headers).json["data"]["id"]
+
+    role = make_role("admin")
+    other_id = make_users(1, role=role)[0]
+    other = auth_headers(other_id, role)
+    assert client.get(f"/files/uploads/{session_id}", headers=other).status_code == 404
+    assert put_chunk(client, other, session_id, 0, 10).status_code == 404
+
+    quota = app.config["UPLOAD_USER_QUOTA_BYTES"]
+    app.config["UPLOAD_USER_QUOTA_BYTES"] = len(CONTENT) + 100
+    try:
+        assert create(client, headers, size=200).status_code == 413  # the open session holds its space
+        assert client.delete(f"/files/uploads/{session_id}", headers=headers).status_code == 200
+        assert create(client, headers, size=200).status_code == 201
+    finally:
+        app.config["UPLOAD_USER_QUOTA_BYTES"] = quota
+
+
+def test_sweeper_reclaims_expired_sessions_and_orphans(client, app, headers):
+    expired_id = create(client, headers).json["data"]["id"]
+    live_id = create(client, headers, size=10).json["data"]["id"]
+    put_chunk(client, headers, expired_id, 0, 1000)
+    expired = db.session.get(UploadSession, expired_id)
+    expired_path = expired.path
+    expired.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    staging = os.path.dirname(expired_path)
+    orphan = os.path.join(staging, "dead-worker.part")
+    with open(orphan, "wb") as fh:
+        fh.write(b"x" * 10)
+    old = time.time() - app.config["UPLOAD_SESSION_TTL_SECONDS"] - 60
+    os.utime(orphan, (old, old))
+
+    with app.app_context():
+        assert sweep_upload_sessions() == (1, len(CONTENT) + 10)
+
+    assert not os.path.exists(expired_path) and not os.path.exists(orphan)
+    assert db.session.get(UploadSession, live_id) is not None
+    assert db.session.query(UploadChunk).count() == 0
+    assert client.get(f"/files/uploads/{expired_id}", headers=headers).status_code == 404
+
+
+def test_finalize_waits_for_chunks_in_flight(client, app, headers):
+    """A chunk still streaming in must not land in the file after finalize has hashed and stored it."""
+    session_id = create(client, headers, size=16).json["data"]["id"]
+    put_chunk(client, headers, session_id, 0, 16, data=b"A" * 16, size=16)
+    good = hashlib.sha256(b"A" * 16).hexdigest()
+    attempts = []
+
+    class SlowBody:
+        """Chunk body whose sender is still uploading when the client asks to finalize."""
+        def __init__(self):
+            self.sent = False
+
+        def read(self, size):
+            if self.sent:
+                return b""
+            self.sent = True
+            attempts.append(finalize_upload_session(db.session.get(UploadSession, session_id), good))
+            return b"B" * 8
+
+    with app.test_request_context():
+        session = db.session.get(UploadSession, session_id)
+        result, status = write_chunk(session, "bytes 0-7/16", 8, SlowBody())
+        assert status == 200
+        assert attempts[0][1] == 409 and "still being written" in attempts[0][0]["error"]
+        assert db.session.get(UploadSession, session_id).status == "open"
+
+        # Once the writer is done, finalize sees the file as it really is
+        result, status = finalize_upload_session(db.session.get(UploadSession, session_id), good)
+        assert status == 400 and result["error"].startswith("Checksum mismatch")
+    assert db.session.query(UploadedFile).count() == 0
+
+
+def test_writer_that_died_does_not_block_finalize(client, app, headers):
+    session_id = create(client, headers, size=16).json["data"]["id"]
+    put_chunk(client, headers, session_id, 0, 16, data=b"A" * 16, size=16)
+    path = db.session.get(UploadSession, session_id).path
+
+    # A worker killed mid-chunk: its lock goes with the process
+    pid = os.fork()
+    if pid == 0:
+        fd = os.open(path, os.O_WRONLY)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    resp = client.post(f"/files/uploads/{session_id}/complete", headers=headers,
+                       json={"sha256": hashlib.sha256(b"A" * 16).hexdigest()})
+    assert resp.status_code == 200
+
+
+def test_failed_store_hands_the_session_back(client, app, headers, monkeypatch):
+    session_id = create(client, headers, size=16).json["data"]["id"]
+    put_chunk(client, headers, session_id, 0, 16, data=b"A" * 16, size=16)
+
+    def failing_store(*args):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr("app.services.upload_sessions.store_file", failing_store)
+    with app.test_request_context(), pytest.raises(RuntimeError):
+        finalize_upload_session(db.session.get(UploadSession, session_id), hashlib.sha256(b"A" * 16).hexdigest())
+    monkeypatch.undo()
+
+    db.session.expire_all()
+    assert db.session.get(UploadSession, session_id).status == "open"
+    resp = client.post(f"/files/uploads/{session_id}/complete", headers=headers,
+                       json={"sha256": hashlib.sha256(b"A" * 16).hexdigest()})
+    assert resp.status_code == 200
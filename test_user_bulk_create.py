@@ -0,0 +1,68 @@
+from werkzeug.security import check_password_hash
+
+from conftest import make_users, TEST_PASSWORD
+from app.models.user import User
+
+
+def _user(i, **extra):
+    data = {"first_name": f"Bulk{i}", "last_name": "User", "email": f"bulk{i}@example.com",
+            "password": TEST_PASSWORD}
+    data.update(extra)
+    return data
+
+
+def test_bulk_create_reports_each_item(client, admin_headers):
+    make_users(1, email="taken@example.com")
+    payload = [
+        _user(1, date_of_birth="1990-01-31"),
+        _user(2),
+        _user(3, email="taken@example.com"),
+        _user(4, email="BULK1@example.com"),
+        _user(5, status="Nope"),
+    ]
+
+    resp = client.post("/users/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 207
+
+    results = resp.json["data"]
+    assert [r["status"] for r in results] == [True, True, False, False, False]
+    assert results[2]["message"] == "Email already exists"
+    assert results[3]["message"] == "Duplicate email in request"
+
+    created = User.query.filter_by(email="bulk1@example.com").one()
+    assert created.id == results[0]["data"]["id"]
+    assert check_password_hash(created.password, TEST_PASSWORD)
+
+
+def test_bulk_create_rejects_non_array(client, admin_headers):
+    resp = client.post("/users/bulk", json={"users": []}, headers=admin_headers)
+    assert resp.status_code == 400
+
+
+def test_bulk_create_rejects_overlong_columns(client, admin_headers):
+    payload = [_user(1, first_name="x" * 51), _user(2)]
+
+    resp = client.post("/users/bulk", json=payload, headers=admin_headers)
+    results = resp.json["data"]
+    assert [r["status"] for r in results] == [False, True]
+    assert results[0]["message"] == "first_name must be at most 50 characters"
+
+
+def test_bulk_create_isolates_database_errors(client, admin_headers, monkeypatch):
+    from sqlalchemy.exc import DataError
+    from app.services import user as user_service
+
+    real_gram_rows = user_service._batch_gram_rows
+
+    def gram_rows(batch):
+        if any(row["first_name"] == "Bulk2" for _, row in batch):
+            raise DataError("INSERT", {}, Exception("value too long"))
+        return real_gram_rows(batch)
+
+    monkeypatch.setattr(user_service, "_batch_gram_rows", gram_rows)
+    resp = client.post("/users/bulk", json=[_user(1), _user(2), _user(3)], headers=admin_headers)
+
+    results = resp.json["data"]
+    assert [r["status"] for r in results] == [True, False, True]
+    assert results[1]["message"] == "Database error: value too long"
+    assert User.query.filter_by(email="bulk2@example.com").first() is None
@@ -0,0 +1,39 @@
+from conftest import make_users
+from app.models.user import User
+
+
+def test_bulk_update_by_filter_in_chunks(app, client, admin_headers, monkeypatch):
+    monkeypatch.setitem(app.config, "BULK_CHUNK_SIZE", 2)
+    make_users(5)
+    make_users(2, status="Onboarding")
+
+    resp = client.patch(
+        "/users/bulk",
+        json={"filter": {"status": "Active"}, "data": {"status": "Under Review"}},
+        headers=admin_headers,
+    )
+    assert resp.status_code == 200
+    assert resp.json["data"]["affected"] == 5
+    assert User.query.filter_by(status="Under Review").count() == 5
+    assert User.query.filter_by(status="Onboarding").count() == 2
+
+
+def test_bulk_update_applies_user_validation(client, admin_headers):
+    ids = make_users(2)
+    for data in ({"status": "Nope"}, {"password": "x"}, {"email": "new@example.com"}):
+        resp = client.patch("/users/bulk", json={"ids": ids, "data": data}, headers=admin_headers)
+        assert resp.status_code == 400
+
+
+def test_bulk_delete_by_ids(client, admin_headers):
+    ids = make_users(4)
+
+    resp = client.delete("/users/bulk", json={"ids": ids[:3] + ["missing"]}, headers=admin_headers)
+    assert resp.json["data"]["affected"] == 3
+    assert [u.id for u in User.query.all()] == ids[3:]
+
+
+def test_bulk_delete_requires_a_condition(client, admin_headers):
+    make_users(1)
+    for body in ({}, {"filter": {}}, {"ids": []}, {"ids": ["a"], "filter": {"status": "Active"}}):
+        assert client.delete("/users/bulk", json=body, headers=admin_headers).status_code == 400
@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import make_users, FakeRedis
+from app.extentions import user_cache
+from app.utils.cache import LRUCache, RedisCache
+
+
+def set_if_current_script(redis, keys, args):
+    """RedisCache.SET_IF_CURRENT in Python, for FakeRedis."""
+    if str(redis.get(keys[1]) or "0") != str(args[0]):
+        return 0
+    redis.set(keys[0], args[1], ex=int(args[2]))
+    return 1
+
+
+def invalidate_script(redis, keys, args):
+    """RedisCache.INVALIDATE in Python, for FakeRedis."""
+    for key, generation in zip(keys[::2], keys[1::2]):
+        redis.delete(key)
+        redis.set(generation, str(int(redis.get(generation) or 0) + 1), ex=int(args[0]))
+    return 1
+
+
+def fake_redis():
+    return FakeRedis(scripts={RedisCache.SET_IF_CURRENT: set_if_current_script,
+                              RedisCache.INVALIDATE: invalidate_script})
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache_backend(request, client):
+    backend = LRUCache(max_entries=100, ttl=60) if request.param == "memory" else RedisCache(fake_redis(), prefix="user:")
+    user_cache.use_backend(backend)
+    yield backend
+    user_cache.use_backend(LRUCache())
+
+
+def test_profile_reads_through_and_invalidates_on_update(client, admin_headers, cache_backend):
+    [user_id] = make_users(1)
+
+    assert client.get(f"/users/{user_id}", headers=admin_headers).json["data"]["first_name"] == "First0"
+    client.get(f"/users/{user_id}", headers=admin_headers)
+    assert (user_cache.hits, user_cache.misses) == (1, 1)
+
+    client.put(f"/users/{user_id}", json={"first_name": "Renamed"}, headers=admin_headers)
+    assert client.get(f"/users/{user_id}", headers=admin_headers).json["data"]["first_name"] == "Renamed"
+
+    client.patch("/users/bulk", json={"ids": [user_id], "data": {"status": "Inactive"}}, headers=admin_headers)
+    assert client.get(f"/users/{user_id}", headers=admin_headers).json["data"]["status"] == "Inactive"
+
+    client.delete("/users/bulk", json={"ids": [user_id]}, headers=admin_headers)
+    assert client.get(f"/users/{user_id}", headers=admin_headers).status_code == 404
+
+
+def test_invalidation_during_load_is_not_overwritten(client, cache_backend):
+    def stale_loader():
+        # update_user commits and invalidates while this load holds the old row
+        user_cache.invalidate("u1")
+        return {"version": "old"}
+
+    assert user_cache.get_or_load("u1", stale_loader) == {"version": "old"}
+    assert user_cache.peek("u1") is None
+
+    assert user_cache.get_or_load("u1", lambda: {"version": "new"}) == {"version": "new"}
+    assert user_cache.peek("u1") == {"version": "new"}
+
+
+def test_failed_load_caches_nothing(client, cache_backend):
+    def broken_loader():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        user_cache.get_or_load("u1", broken_loader)
+    assert user_cache.peek("u1") is None
+    assert user_cache.get_or_load("u1", lambda: {"version": "v1"}) == {"version": "v1"}
+    assert len(cache_backend) == 1
+
+
+def test_lru_evicts_and_expires():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.evictions) == (1, None, 1)
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
@@ -0,0 +1,35 @@
+import csv
+import io
+import json
+
+from conftest import make_users
+from app.services import user as user_service
+
+
+def test_ndjson_export_streams_in_batches(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(user_service, "EXPORT_BATCH_SIZE", 2)
+    ids = make_users(5)
+    make_users(2, status="Terminated")
+
+    resp = client.get("/users/export", query_string={"status": "Active"}, headers=admin_headers)
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    assert resp.is_streamed
+
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [r["id"] for r in rows] == ids
+    assert "password" not in rows[0]
+
+
+def test_csv_export_has_format_user_columns(client, admin_headers):
+    make_users(3)
+
+    resp = client.get("/users/export", query_string={"format": "csv"}, headers=admin_headers)
+    rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+    assert rows[0] == user_service.USER_FIELDS
+    assert len(rows) == 4
+
+
+def test_unknown_format_is_rejected(client, admin_headers):
+    resp = client.get("/users/export", query_string={"format": "xml"}, headers=admin_headers)
+    assert resp.status_code == 400
@@ -0,0 +1,32 @@
+from conftest import make_users
+
+
+def test_sparse_fieldset_on_list(client, admin_headers):
+    ids = make_users(3)
+
+    resp = client.get("/users/", query_string={"fields": "id,email", "limit": 2}, headers=admin_headers)
+    assert resp.status_code == 200
+    assert [set(u) for u in resp.json["data"]] == [{"id", "email"}] * 2
+
+    resp = client.get(
+        "/users/",
+        query_string={"fields": "id", "cursor": resp.json["next_cursor"]},
+        headers=admin_headers,
+    )
+    assert resp.json["data"] == [{"id": ids[2]}]
+
+
+def test_sparse_fieldset_on_single_user(client, admin_headers):
+    [user_id] = make_users(1)
+
+    resp = client.get(f"/users/{user_id}", query_string={"fields": "status,email"}, headers=admin_headers)
+    assert resp.status_code == 200
+    assert set(resp.json["data"]) == {"status", "email"}
+
+    resp = client.get(f"/users/{user_id}", query_string={"fields": "password"}, headers=admin_headers)
+    assert resp.status_code == 400
+
+
+def test_missing_user_is_404(client, admin_headers):
+    resp = client.get("/users/does-not-exist", headers=admin_headers)
+    assert resp.status_code == 404
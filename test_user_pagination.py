@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from conftest import make_role, make_users
+
+
+def test_keyset_pages_cover_every_user_once(client, admin_headers):
+    ids = make_users(7)
+
+    seen, cursor = [], None
+    while True:
+        query = {"limit": 3}
+        if cursor:
+            query["cursor"] = cursor
+        resp = client.get("/users/", query_string=query, headers=admin_headers)
+        assert resp.status_code == 200
+        seen += [u["id"] for u in resp.json["data"]]
+        cursor = resp.json["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ids
+
+
+def test_filters_are_applied_in_sql(client, admin_headers):
+    user_role = make_role("user")
+    recent = datetime.utcnow() - timedelta(days=1)
+    stale = datetime.utcnow() - timedelta(days=90)
+    make_users(2, role=user_role, last_login=recent)
+    make_users(3, role=user_role, status="Inactive", last_login=stale)
+
+    resp = client.get("/users/", query_string={"status": "Inactive"}, headers=admin_headers)
+    assert len(resp.json["data"]) == 3
+
+    cutoff = (datetime.utcnow() - timedelta(days=30)).date().isoformat()
+    resp = client.get(
+        "/users/",
+        query_string={"role_id": user_role.id, "last_login_after": cutoff},
+        headers=admin_headers,
+    )
+    assert len(resp.json["data"]) == 2
+
+
+def test_invalid_parameters_are_rejected(client, admin_headers):
+    for query in ({"limit": 0}, {"limit": "abc"}, {"cursor": "garbage"}, {"status": "Nope"}):
+        resp = client.get("/users/", query_string=query, headers=admin_headers)
+        assert resp.status_code == 400
@@ -0,0 +1,70 @@
+from conftest import TEST_PASSWORD
+
+
+def _create(client, headers, first, last, email):
+    resp = client.post("/users/", json={"first_name": first, "last_name": last, "email": email,
+                                        "password": TEST_PASSWORD}, headers=headers)
+    assert resp.status_code == 201
+    return resp.json["data"]["id"]
+
+
+def _search(client, headers, q, **params):
+    resp = client.get("/users/search", query_string={"q": q, **params}, headers=headers)
+    assert resp.status_code == 200
+    return resp
+
+
+def test_prefix_and_substring_search_is_ranked(client, admin_headers):
+    _create(client, admin_headers, "Mandy", "Rose", "mrose@example.com")
+    andrew = _create(client, admin_headers, "Andrew", "Smith", "asmith@example.com")
+    _create(client, admin_headers, "Bob", "Jones", "bjones@example.com")
+
+    ids = [u["id"] for u in _search(client, admin_headers, "and").json["data"]]
+    assert ids[0] == andrew and len(ids) == 2
+
+    assert [u["id"] for u in _search(client, admin_headers, "an").json["data"]] == [andrew]
+    assert [u["last_name"] for u in _search(client, admin_headers, "ith").json["data"]] == ["Smith"]
+    assert [u["email"] for u in _search(client, admin_headers, "bjon").json["data"]] == ["bjones@example.com"]
+    assert _search(client, admin_headers, "andrew smi").json["data"][0]["id"] == andrew
+    assert _search(client, admin_headers, "example").json["data"] == []
+
+
+def test_index_follows_writes_and_paginates(client, admin_headers):
+    user_id = _create(client, admin_headers, "Carla", "Diaz", "cdiaz@example.com")
+    for i in range(3):
+        _create(client, admin_headers, "Carl", f"Page{i}", f"carl{i}@example.com")
+
+    first = _search(client, admin_headers, "carl", limit=2)
+    assert first.json["next_offset"] == 2
+    assert len(_search(client, admin_headers, "carl", offset=2, limit=2).json["data"]) == 2
+
+    client.put(f"/users/{user_id}", json={"first_name": "Zed"}, headers=admin_headers)
+    assert [u["id"] for u in _search(client, admin_headers, "zed").json["data"]] == [user_id]
+    assert len(_search(client, admin_headers, "carl").json["data"]) == 3
+
+    client.delete(f"/users/{user_id}", headers=admin_headers)
+    assert _search(client, admin_headers, "zed").json["data"] == []
+
+
+def test_bulk_writes_keep_index_in_sync(client, admin_headers):
+    payload = [{"first_name": "Bulk", "last_name": f"Person{i}", "email": f"bp{i}@example.com",
+                "password": TEST_PASSWORD} for i in range(3)]
+    ids = [r["data"]["id"] for r in client.post("/users/bulk", json=payload, headers=admin_headers).json["data"]]
+    assert len(_search(client, admin_headers, "person").json["data"]) == 3
+
+    client.patch("/users/bulk", json={"ids": ids[:1], "data": {"last_name": "Renamed"}}, headers=admin_headers)
+    assert len(_search(client, admin_headers, "person").json["data"]) == 2
+
+    client.delete("/users/bulk", json={"ids": ids}, headers=admin_headers)
+    assert _search(client, admin_headers, "bulk").json["data"] == []
+
+
+def test_full_email_search(client, admin_headers):
+    andrew = _create(client, admin_headers, "Andrew", "Smith", "asmith@example.com")
+    _create(client, admin_headers, "Amy", "Smith", "asmith@example.org")
+
+    for q in ("asmith@example.com", "ASmith@Example.com", "smith@example.c", "ith@example.com"):
+        assert [u["id"] for u in _search(client, admin_headers, q).json["data"]] == [andrew], q
+    assert len(_search(client, admin_headers, "asmith@").json["data"]) == 2
+    assert len(_search(client, admin_headers, "as").json["data"]) == 2
+    assert _search(client, admin_headers, "@example.com").json["data"] == []